@@ -15,11 +15,11 @@
 
 from .ui.uiAddDialog import Ui_AddDialog
 from .edit import ErrorProxyModel
+from .validation import nameerror, headingerror
 from PyQt5.QtWidgets import QDialog, QMenu
 from PyQt5.QtGui import QStandardItemModel, QStandardItem, QPalette, QBrush
 from PyQt5.QtCore import Qt
 from functools import partial
-import re
 
 class Headings(QStandardItemModel):
     def __init__(self):
@@ -128,21 +128,9 @@ class AddDialog(QDialog):
             self.ui.lineName.setBackgroundRole(QPalette.Mid)
             self.validateresult("name", False)
 
-        if self.tableName() == "":
-            return fail("No table name")
-
-        if self.tableName().startswith("_"):
-            return fail("Tablename starts with underscore")
-
-        # The table name needs to be constrained, otherwise QSqlTableModel
-        # will fail to load the table.
-        for c in self.tableName():
-            if not c.isalnum() and not c in "_":
-                return fail("Invalid char in table name")
-
-        for tbl in self.existingtables:
-            if tbl == self.tableName():
-                return fail("Duplicate table name")
+        err = nameerror(self.tableName(), self.existingtables)
+        if err:
+            return fail(err)
 
         if self.headings.rowCount() < 2:
             return fail("Not enough row headers")
@@ -170,10 +158,10 @@ class AddDialog(QDialog):
                     self.headings.setData(seen.get(val),
                                           QBrush(Qt.red),
                                           Qt.BackgroundRole)
-                elif re.match(r"^[a-zA-Z0-9_\- ]+$", val):
-                    self.headings.setData(idx, None, Qt.BackgroundRole)
+                elif headingerror(val):
+                    fail(headingerror(val))
                 else:
-                    fail("Invalid chars in heading")
+                    self.headings.setData(idx, None, Qt.BackgroundRole)
                 seen[val] = idx
             self.validateresult("headings", ok)
         if tl and tl.column() == 1 and Qt.CheckStateRole in role:
@@ -0,0 +1,225 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks of the storage and quiz generation hot paths on a
+synthetic database. Runs headless and writes its results as JSON, so
+that runs on different commits can be compared:
+
+    python3 -m memorise.benchmark --tests 1000 --output before.json
+
+"""
+
+from .storage import Storage
+from . import engine
+from .normalise import Grader
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+def generate(storage, sets=10, rows=50, columns=4, revisions=3, tests=100,
+             answers=20, seed=0):
+    """Fill storage with memory sets of random values. Each set gets
+revisions revisions, and tests tests of answers answers each spread
+over the revisions. Values of the first column, the key of the table,
+end with the row number so that they are unique. Returns the names of
+the sets.
+
+    """
+    rnd = random.Random(seed)
+    word = lambda: "".join(rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+                           for i in range(rnd.randint(2, 8)))
+    names = ["Set{:04d}".format(i) for i in range(sets)]
+    headings = ["Column{}".format(c) for c in range(columns)]
+    for name in names:
+        table = [[word() + (str(r) if c == 0 else "")
+                  for c in range(columns)] for r in range(rows)]
+        storage.createtable(name, headings)
+        storage.writetable(name, table)
+        for t in range(tests):
+            ## Start a new revision at evenly spaced tests
+            if revisions > 1 and t > 0 and \
+               t % max(1, tests // revisions) == 0:
+                table[rnd.randrange(rows)][rnd.randrange(1, columns)] = word()
+                storage.writetable(name, table)
+            storage.saveresults(name, quizresults(rnd, headings, table,
+                                                  answers))
+    return names
+
+def quizresults(rnd, headings, table, count):
+    "Results of a test of count random questions in the form of QuizDialog."
+    results = []
+    for i in range(count):
+        row = rnd.choice(table)
+        (c1, c2) = rnd.sample(range(len(headings)), 2)
+        correct = [row[c2]]
+        ok = rnd.random() < 0.8
+        answer = correct if ok else [rnd.choice(table)[c2]]
+        results.append((headings[c1], row[c1], headings[c2], correct,
+                        [r[c2] for r in table], correct, answer, ok))
+    return results
+
+def timeit(fn, repeat):
+    "Returns the min, median and max seconds of repeat calls of fn."
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times),
+            "median": statistics.median(times),
+            "max": max(times),
+            "repeat": repeat}
+
+def storagebenchmarks(storage, names, repeat, seed=0):
+    "Returns a dict of the timings of the storage operations."
+    rnd = random.Random(seed)
+    name = names[len(names) // 2]
+    (headings, table) = storage.table(name)
+    tests = storage.reviewtests(name)[1]
+    testid = tests[len(tests) // 2][0]
+    answers = storage.reviewanswers(testid)[1]
+    questionid = answers[len(answers) // 2][1]
+    results = quizresults(rnd, headings, [list(r) for r in table],
+                          len(answers))
+    def revision():
+        storage.saveresults(name, results)
+        storage.createtable(name)
+
+    return {
+        "mainwindowquery": timeit(lambda: storage.roottable(10), repeat),
+        "loadreviewtests": timeit(
+            lambda: storage.reviewtests(name, None, 100), repeat),
+        "loadreviewtests_all": timeit(
+            lambda: storage.reviewtests(name), repeat),
+        "loadreviewanswers": timeit(
+            lambda: storage.reviewanswers(testid), repeat),
+        "loadreviewanswersdetail": timeit(
+            lambda: storage.reviewanswersdetail(testid, questionid, None, 100),
+            repeat),
+        "loadtable": timeit(lambda: storage.table(name), repeat),
+        "saveresults": timeit(lambda: storage.saveresults(name, results),
+                              repeat),
+        "createtable_revision": timeit(revision, repeat),
+    }
+
+def quizbenchmarks(storage, names, repeat):
+    """Returns a dict of the timings of building a quiz, normalise,
+grading the correct answer of every question and sampling the choices
+of every question.
+
+    """
+    name = names[len(names) // 2]
+    (headings, rows) = storage.table(name)
+    values = [v for row in rows for v in row]
+    questions = engine.buildquestions(headings, rows)
+    def grading():
+        grader = Grader(headings)
+        for q in questions:
+            grader.grade(q, q[3])
+    def choosing():
+        choices = engine.ChoiceIndex()
+        for q in questions:
+            choices.choices(q)
+    return {
+        "buildquestions": timeit(
+            lambda: engine.buildquestions(headings, rows), repeat),
+        "questionstream_first": timeit(
+            lambda: engine.QuestionStream(headings, rows).pop(), repeat),
+        "loadquestions": timeit(
+            lambda: engine.loadquestions(storage, name), repeat),
+        "normalise": timeit(lambda: [engine.normalise(v) for v in values],
+                            repeat),
+        "grade": timeit(lambda: [engine.grade(q[3], q[3]) for q in questions],
+                        repeat),
+        "grader": timeit(grading, repeat),
+        "choices": timeit(choosing, repeat),
+    }
+
+def run(dbase, repeat=10, **options):
+    "Generate a database at dbase and return the benchmark results."
+    with Storage(dbase) as storage:
+        start = time.perf_counter()
+        names = generate(storage, **options)
+        generated = time.perf_counter() - start
+        return {
+            "options": dict(options, repeat=repeat),
+            "environment": {
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "generate": generated,
+            "storage": storagebenchmarks(storage, names, repeat,
+                                         options.get("seed", 0)),
+            "quiz": quizbenchmarks(storage, names, repeat),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m memorise.benchmark",
+        description="Time the storage and quiz generation hot paths on a "
+        "synthetic database.")
+    parser.add_argument("--sets", type=int, default=10,
+                        help="number of memory sets")
+    parser.add_argument("--rows", type=int, default=50,
+                        help="rows per memory set")
+    parser.add_argument("--columns", type=int, default=4,
+                        help="columns per memory set")
+    parser.add_argument("--revisions", type=int, default=3,
+                        help="revisions per memory set")
+    parser.add_argument("--tests", type=int, default=100,
+                        help="tests per memory set")
+    parser.add_argument("--answers", type=int, default=20,
+                        help="answers per test")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the random data")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="times each operation is timed")
+    parser.add_argument("--memory", action="store_true",
+                        help="use an in memory database instead of a "
+                        "temporary file")
+    parser.add_argument("--output", "-o",
+                        help="write the results to file instead of stdout")
+    args = parser.parse_args(argv)
+
+    options = {k: getattr(args, k) for k in
+               ["sets", "rows", "columns", "revisions", "tests", "answers",
+                "seed"]}
+    if args.columns < 2:
+        parser.error("at least 2 columns are needed to ask questions")
+
+    if args.memory:
+        results = run(":memory:", args.repeat, **options)
+    else:
+        with tempfile.TemporaryDirectory() as d:
+            results = run(os.path.join(d, "benchmark.db"), args.repeat,
+                          **options)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -13,534 +13,379 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from PyQt5 import QtSql
-from PyQt5.QtCore import Qt, QIdentityProxyModel
-import sys
-
-dbschema = ["""
-CREATE TABLE `memtableroot` (
-        `Memory Set`    text NOT NULL,
-        `Created`       INTEGER NOT NULL DEFAULT 0,
-        `Archived`      TEXT,
-        `Revision`      INTEGER NOT NULL,
-        PRIMARY KEY(`Memory Set`)
-)""","""
-CREATE TABLE `tests` (
-        `TestID`        INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-        `Memory Set`    TEXT NOT NULL,
-        `Revision`      INTEGER NOT NULL,
-        `TimeStamp`     INTEGER NOT NULL
-)""","""
-CREATE TABLE `answers` (
-        `TestID`        INTEGER NOT NULL,
-        `QuestionID`    INTEGER NOT NULL,
-        `Column1`       TEXT NOT NULL,
-        `Value1`        TEXT NOT NULL,
-        `Column2`       TEXT NOT NULL,
-        `UserAnswer`    TEXT NOT NULL,
-        `CorrectAnswer` TEXT NOT NULL,
-        PRIMARY KEY(`TestID`,`QuestionID`,`Column1`,`Value1`)
-)""","""
-CREATE VIEW `results` as
-  SELECT t.`Memory Set`,
-         a.TestID,
-         a.Column1,
-         a.Value1,
-         a.Column2,
-         a.UserAnswer,
-         a.CorrectAnswer
-  FROM answers AS a
-  LEFT JOIN tests AS t ON a.TestID == t.TestID
-"""
-]
-
-mainwindowquery = """
-SELECT r.`Memory Set`,
-(
-  SELECT `TimeStamp`
-  FROM
-  (
-    SELECT MAX(`TestID`),`TimeStamp`
-        FROM `tests`
-        WHERE `Memory Set` == r.`Memory Set`
-  )
-) AS `Last Used`,
-(
-  SELECT COUNT(`TestID`)
-  FROM `tests`
-  WHERE `tests`.`Memory Set` == r.`Memory Set`
-) AS `Times Used`,
-r.`Created`,
-r.`Revision`,
-(
-  /* Need to place SUM outside below SELECT as it ignores the LIMIT clause */
-  SELECT COALESCE(SUM(`X`.`x`), 0) FROM
-  (
-    SELECT (
-      SELECT CASE WHEN COUNT(`A`.`TestID`) == 0 THEN 1 ELSE 0 END
-      FROM `answers` as `A`
-      WHERE `A`.`TestID` == `T`.`TestID` AND
-            `A`.`UserAnswer` != `A`.`CorrectAnswer`
-    ) as `x`
-    FROM `tests` AS `T`
-    WHERE `T`.`Memory Set` == `r`.`Memory Set`
-    ORDER BY `T`.`TimeStamp`
-    DESC LIMIT :limit
-  ) AS `X`
-) AS `Perfect Runs in Window`,
-(
-  SELECT COALESCE(COUNT(`A`.`TestID`), 0)
-  FROM
-  (
-    SELECT `T1`.`TestID`
-    FROM `tests` as `T1`
-    WHERE `T1`.`Memory Set` == `r`.`Memory Set`
-    ORDER BY `T1`.`TimeStamp`
-    DESC LIMIT :limit
-  ) AS `T2`
-  LEFT JOIN `answers` AS `A` ON `A`.`TestID` == `T2`.`TestID`
-  WHERE `A`.`UserAnswer` == `A`.`CorrectAnswer`
-) AS `Correct Answers in Window`,
-(
-  SELECT COALESCE(COUNT(`A`.`TestID`), 0)
-  FROM
-  (
-    SELECT `T1`.`TestID`
-    FROM `tests` as `T1`
-    WHERE `T1`.`Memory Set` == `r`.`Memory Set`
-    ORDER BY `T1`.`TimeStamp`
-    DESC LIMIT :limit
-  ) AS `T2`
-  LEFT JOIN `answers` AS `A` ON `A`.`TestID` == `T2`.`TestID`
-  WHERE `A`.`UserAnswer` != `A`.`CorrectAnswer`
-) AS `Incorrect Answers in Window`
-FROM `memtableroot` AS r ORDER BY r.`Archived`
-"""
+"""Qt item models over the storage core. The Datastore exposes the
+results of Storage queries as models that can be set on Qt views.
+Slow queries are run on a worker thread, see worker.Requests.
 
-reviewdialogquery_tests = """
-SELECT T.TestID, T.Revision, T.TimeStamp as `Time`,
-(
-  SELECT COUNT(TestID)
-  FROM answers as A
-  WHERE A.TestID == T.TestID AND A.UserAnswer == A.CorrectAnswer
-) AS `Correct`,
-(
-  SELECT COUNT(TestID)
-  FROM answers as A
-  WHERE A.TestID == T.TestID AND A.UserAnswer != A.CorrectAnswer
-) AS `Wrong`
-FROM tests as T
-WHERE T.`Memory Set` == :name
-ORDER BY T.TimeStamp DESC
 """
 
-reviewdialogquery_answers = """
-SELECT
-A.TestID,
-A.QuestionID,
-A.Column1 AS `Question Column`,
-A.Value1 AS `Question Value`,
-A.Column2 AS `Answer Column`,
-(
-  CASE WHEN A.CorrectAnswer == A.UserAnswer
-  THEN "PASS"
-  ELSE "FAIL" END
-) AS Result,
-(
-  SELECT COUNT(*)
-  FROM answers AS B
-  WHERE B.Column1 == A.Column1 AND
-        B.Value1 == A.Value1 AND
-        B.Column2 == A.Column2 AND
-        B.CorrectAnswer == A.CorrectAnswer
-) AS `Times Asked`,
-(
-  SELECT COUNT(*)
-  FROM answers AS B
-  WHERE B.Column1 == A.Column1 AND
-        B.Value1 == A.Value1 AND
-        B.Column2 == A.Column2 AND
-        B.CorrectAnswer == A.CorrectAnswer AND
-        B.CorrectAnswer != B.UserAnswer
-) AS `Times Failed`
-FROM `answers` as A WHERE TestID == :testid
-"""
+from .storage import Storage
+from .worker import Requests
+from . import engine
+from . import importer
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
 
-reviewquestiondialogquery = """
-SELECT
-A.Column1,
-A.Value1,
-A.Column2,
-A.CorrectAnswer,
-A.UserAnswer,
-A.TestID,
-A.QuestionID,
-T.TimeStamp AS Time,
-(
-  CASE WHEN A.CorrectAnswer == A.UserAnswer
-  THEN "PASS"
-  ELSE "FAIL" END
-) AS Result
-FROM answers AS A INNER JOIN tests AS T ON A.TestID == T.TestID
-WHERE (A.Column1, A.Value1, A.Column2, A.CorrectAnswer) IN
-(
-  SELECT B.Column1, B.Value1, B.Column2, B.CorrectAnswer
-  FROM answers AS B
-  WHERE B.TestID == :testid AND B.QuestionID == :questionid
-)
-ORDER BY T.TimeStamp DESC
-"""
+# Number of rows fetched at a time by a PagedModel.
+pagesize = 100
+
+class Record:
+    "Minimal read only equivalent of QSqlRecord."
+    def __init__(self, headings, row=None):
+        self.headings = headings
+        self.row = row
+
+    def count(self):
+        return len(self.headings)
+
+    def fieldName(self, i):
+        return self.headings[i]
+
+    def value(self, name):
+        if self.row == None:
+            return None
+        if isinstance(name, str):
+            name = self.headings.index(name)
+        return self.row[name]
+
+def showloading(view, model):
+    "Show a busy cursor over view while model is loading rows."
+    def loading(busy):
+        if busy:
+            view.setCursor(Qt.BusyCursor)
+        else:
+            view.unsetCursor()
+    model.loading.connect(loading)
+
+class RowModel(QAbstractTableModel):
+    "Read only model over the column names and rows of a query."
+    loading = pyqtSignal(bool)
+
+    def __init__(self, headings=(), rows=()):
+        super().__init__()
+        self.headings = list(headings)
+        self.rows = list(rows)
+
+    def setRows(self, headings, rows):
+        self.beginResetModel()
+        self.headings = list(headings)
+        self.rows = list(rows)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headings)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return self.rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and \
+           section < len(self.headings):
+            return self.headings[section]
+        return super().headerData(section, orientation, role)
+
+    def record(self, row=None):
+        if row == None:
+            return Record(self.headings)
+        return Record(self.headings, self.rows[row])
+
+class RootModel(RowModel):
+    """Model of the main window. The windowed statistics of each memory
+set are held for every window size, so changing the window size only
+swaps the statistics shown.
+
+    """
+    def __init__(self, window_size, headings, rows, windows):
+        super().__init__()
+        self.window_size = window_size
+        self.setTable(headings, rows, windows)
+
+    def setTable(self, headings, rows, windows):
+        self.base = rows
+        self.windows = windows
+        self.setRows(headings, self._rows())
+
+    def setWindowSize(self, window_size):
+        self.window_size = window_size
+        self.rows = self._rows()
+        if self.rows:
+            self.dataChanged.emit(
+                self.index(0, len(self.base[0])),
+                self.index(len(self.rows) - 1, len(self.headings) - 1))
+
+    def _rows(self):
+        return [row + self.windows[row[0]][self.window_size - 1]
+                for row in self.base]
+
+class PagedModel(RowModel):
+    """Read only model that fetches its rows a page at a time as the view
+scrolls. fetch(storage, after, limit) returns the next page of headings
+and rows, where after is key applied to the last row already fetched
+(or None for the first page).
+
+The headings are read when the model is created, the pages are fetched
+on the worker thread when requested by the view.
+
+    """
+    def __init__(self, datastore, fetch, key):
+        result = fetch(datastore.storage, None, 0)
+        super().__init__(*(result or ()))
+        self.requests = datastore.requests
+        self.fetch = fetch
+        self.key = key
+        self.more = result != None
+        self.fetching = False
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.more and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after = self.key(self.rows[-1]) if self.rows else None
+        self.fetching = True
+        self.loading.emit(True)
+        self.requests.request(
+            lambda storage: self.fetch(storage, after, pagesize),
+            self._fetched)
+
+    def _fetched(self, result):
+        self.fetching = False
+        self.loading.emit(False)
+        if result == None:
+            self.more = False
+            return
+        rows = result[1]
+        self.more = len(rows) == pagesize
+        if rows:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+class TableModel(RowModel):
+    """Editable model over the current revision of a memory set. Changes
+are held until submitAll, at which point a new revision is started if
+needed.
+
+    """
+    def __init__(self, datastore, name, headings, rows):
+        super().__init__(headings, [list(row) for row in rows])
+        self.datastore = datastore
+        self.name = name
+        self.dirty = False
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        self.rows[index.row()][index.column()] = value
+        self.dirty = True
+        self.dataChanged.emit(index, index)
+        return True
+
+    def insertRows(self, row, count, parent=QModelIndex()):
+        if row < 0 or row > len(self.rows):
+            row = len(self.rows)
+        self.beginInsertRows(parent, row, row + count - 1)
+        for i in range(count):
+            self.rows.insert(row, [""] * len(self.headings))
+        self.endInsertRows()
+        self.dirty = True
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        self.beginRemoveRows(parent, row, row + count - 1)
+        del self.rows[row:row + count]
+        self.endRemoveRows()
+        self.dirty = True
+        return True
+
+    def isDirty(self):
+        return self.dirty
+
+    def submitAll(self):
+        if not self.dirty:
+            return True
+        result = self.datastore.storage.writetable(self.name, self.rows)
+        self.datastore._reselectroottable()
+        if result:
+            self.dirty = False
+        return bool(result)
 
 class Datastore:
-    def __init__(self, dbase='pymem.db'):
-        self.dbase = dbase
+    def __init__(self, dbase='pymem.db', profile='safe', querylog=None):
+        self.storage = Storage(dbase, profile, querylog)
+        self.requests = Requests(dbase, profile, querylog)
         self.roottable = None
 
     def __enter__(self):
-        self.db = QtSql.QSqlDatabase.addDatabase('QSQLITE')
-        self.db.setDatabaseName(self.dbase)
-        if not self.db.open():
-            print("Error: Unable to open database.")
-            sys.exit(1)
-        query = QtSql.QSqlQuery(self.db)
-        if not query.exec_("SELECT `Memory Set` FROM `memtableroot`"):
-            print("Warning: Initilising database.")
-            if any([not query.exec_(q) for q in dbschema]):
-                print("Error: Unable to initilise database")
-                sys.exit(1)
+        self.storage.__enter__()
+        self.requests.__enter__()
         return self
 
     def __exit__(self, type, value, tb):
-        self.db.close()
+        self.requests.__exit__(type, value, tb)
+        self.storage.__exit__(type, value, tb)
         self.roottable = None
 
-    def loadroottable(self, window_size = 5):
-        if not self.roottable:
-            self.roottable = QtSql.QSqlQueryModel()
+    def _model(self, result):
+        if result == None:
+            return None
+        return RowModel(*result)
 
-        if not hasattr(self, 'window_size') or self.window_size != window_size:
-            self.window_size = window_size
-            return self._reselectroottable()
+    def loadroottable(self, window_size = 5, maxwindow = 10):
+        """Returns the model of the main window. It is loaded when first
+requested with the statistics of every window size up to maxwindow, so
+later changes of window_size do not query the database.
+
+        """
+        if not self.roottable:
+            result = self.storage.roottable(maxwindow)
+            if result == None:
+                return None
+            self.maxwindow = maxwindow
+            self.roottable = RootModel(window_size, *result)
+        elif self.roottable.window_size != window_size:
+            self.roottable.setWindowSize(window_size)
 
         return self.roottable
 
     def _reselectroottable(self):
-        query = QtSql.QSqlQuery(self.db)
-        if query.prepare(mainwindowquery):
-            query.bindValue(":limit", self.window_size)
-            if not query.exec_():
-                print("Error: could not load main table query")
-                return None
-            self.roottable.setQuery(query)
-            return self.roottable
-        else:
-            print("Error: could not prepare query to load "
-                  "test data for {}".format(name))
+        "Reload the main window model, superseding any pending reload."
+        if not self.roottable:
             return None
+        maxwindow = self.maxwindow
+        self.requests.request(
+            lambda storage: storage.roottable(maxwindow),
+            self._roottableloaded,
+            key="roottable")
+        return self.roottable
+
+    def _roottableloaded(self, result):
+        if result != None and self.roottable:
+            self.roottable.setTable(*result)
 
     def loadreviewtests(self, name):
-        query = QtSql.QSqlQuery(self.db)
-        if query.prepare(reviewdialogquery_tests):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Error: could not load test data for {}".format(name))
-                return None
-            table = QtSql.QSqlQueryModel()
-            table.setQuery(query)
-            return table
-        else:
-            print("Error: could not prepare query to load "
-                  "test data for {}".format(name))
-            return None
+        "Tests of memory set name, newest first, fetched as needed."
+        return PagedModel(
+            self,
+            lambda storage, after, limit: storage.reviewtests(name,
+                                                              after,
+                                                              limit),
+            lambda row: (row[2], row[0]))
 
     def loadreviewanswers(self, testid):
-        query = QtSql.QSqlQuery(self.db)
-        if query.prepare(reviewdialogquery_answers):
-            query.bindValue(":testid", testid)
-            if not query.exec_():
-                print("Error: could not load answers for "
-                      "testid {}".format(testid))
-                return None
-            table = QtSql.QSqlQueryModel()
-            table.setQuery(query)
-            return table
-        else:
-            print("Error: could not prepare query to load "
-                  "answers for testid {}".format(testid))
-            return None
+        return self._model(self.storage.reviewanswers(testid))
 
     def loadreviewanswersdetail(self, testid, questionid):
-        query = QtSql.QSqlQuery(self.db)
-        if query.prepare(reviewquestiondialogquery):
-            query.bindValue(":testid", testid)
-            query.bindValue(":questionid", questionid)
-            if not query.exec_():
-                print("Error: could not load answers for "
-                      "testid {}, questionid {}".format(testid, questionid))
-                return None
-            table = QtSql.QSqlQueryModel()
-            table.setQuery(query)
-            return table
-        else:
-            print("Error: could not prepare query to load "
-                  "answers for testid {}, questionid {}"
-                  "".format(testid, questionid))
-            return None
-
-    def loadtable(self, name, editable=True):
+        "Every answer given to a question, newest first, fetched as needed."
+        return PagedModel(
+            self,
+            lambda storage, after, limit: storage.reviewanswersdetail(
+                testid, questionid, after, limit),
+            lambda row: (row[5], row[7]))
+
+    def loadtable(self, name, editable=True, revision=None, callback=None):
         """Load a datatable from the database into an item model. If editable,
-is selected and a test has already been run against the revision a
-copy of the table is taken and revision incremented.
-
-In the background, either QSqlQueryModel or QSqlTabelModel is used.
+is selected the current revision is edited in place until changes are
+submitted. Then, if a test has already been run against the revision,
+it is recorded and the revision incremented before the changes are
+written. Thus, opening and cancelling an edit does not create a new
+revision.
 
-        """
-        query = QtSql.QSqlQuery(self.db)
-        ## First: Identify whether revision is used
-        if query.prepare(
-                "SELECT COUNT(t.`Revision`) > 0 AS Used,r.`Revision` "
-                "FROM memtableroot AS r "
-                "  LEFT JOIN tests AS t ON "
-                "    r.`Memory Set` == t.`Memory Set` AND "
-                "    r.`Revision` == t.`Revision` "
-                "WHERE r.`Memory Set` == :name"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Error: Failed to check if table {} "
-                      "is registered".format(name))
-                return None
-            if query.first():
-                used = int(query.value(0)) > 0
-                if query.value(1) == None:
-                    print("Error: Table {} does not exist".format(name))
-                    return None
-                revision = int(query.value(1))
-            else:
-                # Should not occour due to use of COUNT
-                print("Error: Failed to retreive result.")
-                return None
-        else:
-            print("Error: Failed to prepare statment to check if "
-                  "table {} is registerd.".format(name))
-            return None
+When not editable, an earlier revision can be selected with revision.
 
-        ## Second: If revision used and edit is requested, create new
-        ## table.
-        if used and editable:
-            return self.createtable(name)
+If callback is given, the table is loaded in the background and the
+model passed to callback, superseding any pending load.
 
-        ## Third: Load the data
+        """
         if editable:
-            model = QtSql.QSqlTableModel(db = self.db)
-            model.setTable("_{}_{}".format(name, str(revision)))
-            model.setEditStrategy(QtSql.QSqlTableModel.OnManualSubmit)
-            if not model.select():
-                print("Warning: Failed to select table {}".format(name))
-                model.setHeaderData(0, Qt.Horizontal, "First")
-                model.setHeaderData(1, Qt.Horizontal, "Second")
-            return model
-        else:
-            model = QtSql.QSqlQueryModel()
-            model.setQuery("SELECT * FROM _{}_{}".format(name, revision))
-            return model
+            revision = None
+        if callback:
+            self.requests.request(
+                lambda storage: storage.table(name, revision),
+                lambda result: callback(self._tablemodel(name,
+                                                         editable,
+                                                         result)),
+                key="table")
+            return None
+        return self._tablemodel(name, editable,
+                                self.storage.table(name, revision))
 
-    def createtable(self, name, headings=None):
-        """Creates a database table and returns it loaded into a
-QSqlTableModel.
+    def loadsession(self, name, size, callback):
+        """Load a spaced repetition session of up to size questions of table
+name in the background, and pass a tuple of its Grader and list of
+questions to callback. See engine.loadquiz.
 
-If the table already exits, a new table is created with an incremented
-revision.
+        """
+        self.requests.request(
+            lambda storage: engine.loadquiz(storage, name, size),
+            callback,
+            key="table")
 
-If table does not exist, table is created from the headings specified
-in headings.
+    def _tablemodel(self, name, editable, result):
+        if result == None or not editable:
+            return self._model(result)
+        return TableModel(self, name, *result)
 
-        """
-        query = QtSql.QSqlQuery(self.db)
-
-        ## First: Check if table is already registerd and determine
-        ## revision of table.
-        if query.prepare("SELECT Revision "
-                         "FROM memtableroot "
-                         "WHERE `Memory Set` == :name"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Error: Failed to check if table {} "
-                      "is registered".format(name))
-                return None
-            revision = 1
-            if query.first():
-                revision = int(query.value(0)) + 1
-            if revision == 1 and headings == None:
-                print("Error: Table and headings are undefined")
-                return None
-        else:
-            print("Error: Failed to prepare statment to check if "
-                  "table {} is registerd.".format(name))
-            return None
+    def createtable(self, name, headings=None):
+        """Creates a database table and returns it loaded into an editable
+model. See Storage.createtable.
 
-        ## Second: Register table revision
-        registersql = """
-            INSERT INTO memtableroot (`Memory Set`, `Created`, `Revision`)
-            VALUES (:name, DATETIME(), :rev)
         """
-        if revision != 1:
-            registersql = """
-                UPDATE memtableroot SET `Revision` = :rev
-                WHERE `Memory Set` == :name
-            """
-
-        if query.prepare(registersql):
-            query.bindValue(":name", name)
-            query.bindValue(":rev", revision)
-
-            if not query.exec_():
-                print("Error: Failed to register table {}".format(name))
-                return None
-        else:
-            print("Error: Failed to prepare query to"
-                  " register table {}".format(name))
+        if not self.storage.createtable(name, headings):
             return None
         self._reselectroottable()
+        return self.loadtable(name)
 
-        ## Third: Create table
-        if revision != 1:
-            if not query.exec_("PRAGMA table_info(_{}_1)".format(name)):
-                print("Error: Unable to read table info for _{}_1"
-                      "".format(name))
-                return None
-            headings = []
-            while query.next():
-                headings.append(query.value("name"))
-
-        q = ("CREATE TABLE `_{}_{}` ("
-             "  `{}` TEXT PRIMARY KEY NOT NULL"
-             "".format(name, revision, headings[0]))
-        for hd in headings[1:]:
-            q = q + ", `{}` TEXT".format(hd)
-        q = q + ")"
-        if not query.exec_(q):
-            print("Error: Unable to create table {}".format(name))
-            return None
+    def importfile(self, path, name=None, callback=None):
+        """Import a CSV or TSV file as a new table in the background, see
+importer.importfile. If given, callback is passed the result.
 
-        ## Forth: Copy values into new table
-        if revision > 1:
-            if not query.exec_(
-                    "INSERT INTO _{name}_{r2} "
-                    "SELECT * FROM _{name}_{r1}"
-                    "".format(name=name, r1=revision-1, r2=revision)):
-                print("Error: Unable to copy values into table")
-                return None
-        return self.loadtable(name)
+        """
+        def imported(result):
+            self._reselectroottable()
+            if callback:
+                callback(result)
+        self.requests.request(
+            lambda storage: importer.importfile(storage, path, name),
+            imported)
 
     def droptable(self, name):
         "Drops and unregisters a table and all its revisions."
-        query = QtSql.QSqlQuery(self.db)
-
-        ## First: Check if table is registerd and determine revision
-        ## of table.
-        if query.prepare("SELECT Revision "
-                         "FROM memtableroot "
-                         "WHERE `Memory Set` == :name"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Error: Failed to check if table {} "
-                      "is registered".format(name))
-                return None
-            if not query.first():
-                print("Error: Can not drop unregistered table {}".format(name))
-                return None
-            revision = int(query.value(0))
-        else:
-            print("Error: Failed to prepare statment to check if "
-                  "table {} is registerd.".format(name))
-            return None
-
-        ## Second: Unregister table
-        if query.prepare("DELETE FROM memtableroot "
-                         "WHERE `Memory Set` == :name"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Error: Unable to unregister table {}".format(name))
-                return None
-        else:
-            print("Error: Unable to prepare query to "
-                  "unregister table {}".format(name))
-            return None
+        result = self.storage.droptable(name)
         self._reselectroottable()
+        return result
 
-        ## Third: Drop all revisions
-        for rev in range(1,revision+1):
-            if not query.exec_("DROP TABLE `_{}_{}`".format(name, rev)):
-                print("Warning: Unable to drop table _{}_{}".format(name, rev))
-
-        ## Forth: Clear tests
-        if query.prepare(
-                "DELETE FROM answers "
-                "WHERE answers.TestID IN ( "
-                "    SELECT TestID "
-                "    FROM tests "
-                "    WHERE tests.`Memory Set` == :name "
-                ")"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Warning: Unable to delete answers for {}".format(name))
-        else:
-            print("Error: Unable to prepare query to "
-                  "delete answers for {}".format(name))
-            return None
-        if query.prepare(
-                "DELETE FROM tests "
-                "WHERE `Memory Set` == :name"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Warning: Unable to delete tests for {}".format(name))
-        else:
-            print("Error: Unable to prepare query to "
-                  "delete tests for {}".format(name))
-            return None
+    def compact(self, keep, callback=None):
+        """Compact the test history in the background, see Storage.compact.
+If given, callback is passed the result.
 
-        return True
+        """
+        def compacted(result):
+            self._reselectroottable()
+            if callback:
+                callback(result)
+        self.requests.request(lambda storage: storage.compact(keep),
+                              compacted)
 
-    def saveresults(self, name, results):
-        query = QtSql.QSqlQuery(self.db)
-        if query.prepare("INSERT INTO TESTS (`Memory Set`, "
-                         "                   `TimeStamp`, "
-                         "                   `Revision`) "
-                         "SELECT r.`Memory Set`, "
-                         "       DATETIME() AS TimeStamp, "
-                         "       r.`Revision` "
-                         "FROM memtableroot AS r "
-                         "WHERE r.`Memory Set` == :name"):
-            query.bindValue(":name", name)
-            if not query.exec_():
-                print("Error: Failed to create test entry.")
-                return False
-            if not query.exec("SELECT MAX(TestId) FROM tests") or \
-               not query.first():
-                print("Error: Failed to get test entry.")
-                return False
-            testId = int(query.value(0))
-            for i in range(0,len(results)):
-                if query.prepare("INSERT INTO `answers` "
-                                 "(`TestID`, `QuestionID`, `Column1`, `Value1`,"
-                                 " `Column2`, `UserAnswer`, `CorrectAnswer`) "
-                                 "VALUES (:id, :qid, :c1, :v1, :c2, :ua, :ca)"):
-                    result = results[i]
-                    query.bindValue(":id", testId)
-                    query.bindValue(":qid", i)
-                    query.bindValue(":c1", result[0])
-                    query.bindValue(":v1", result[1])
-                    query.bindValue(":c2", result[2])
-                    query.bindValue(":ua", "\n".join(result[6]))
-                    query.bindValue(":ca", "\n".join(result[5]))
-                    if not query.exec_():
-                        print("Error: Failed to create answer entry.")
-                        return False
-                else:
-                    print("Error: Failed to prepare answer entry.")
-                    return False
-        else:
-            print("Error: Failed to prepare test entry.")
-            return False
-        self._reselectroottable()
-        return True
+    def saveresults(self, name, results, callback=None):
+        """Save the results of a test in the background. If given, callback
+is passed whether the results were saved.
+
+        """
+        def saved(result):
+            if result:
+                self._reselectroottable()
+            if callback:
+                callback(bool(result))
+        self.requests.request(
+            lambda storage: storage.saveresults(name, results),
+            saved)
@@ -19,7 +19,6 @@ from functools import partial
 
 from PyQt5.QtCore import Qt, QIdentityProxyModel
 from PyQt5.QtGui import QBrush
-from PyQt5.QtSql import QSqlField
 
 class ErrorProxyModel(QIdentityProxyModel):
     def __init__(self):
@@ -107,7 +106,7 @@ class EditDialog(QDialog):
                 seen[val] = idx
 
     def add(self, qi):
-        self.ui.table.model().sourceModel().insertRecord(qi.row(),self.ui.table.model().sourceModel().record())
+        self.ui.table.model().sourceModel().insertRow(qi.row())
 
     def remove(self, qi):
         self.ui.table.model().sourceModel().removeRow(qi.row())
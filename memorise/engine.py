@@ -0,0 +1,371 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Quiz generation and answer checking, independent of Qt so that it
+is shared by the quiz dialog, the quiz server and the benchmarks.
+
+A question is a tuple of the question column, the question value, the
+answer column, the list of correct answers and the list of all values
+of the answer column that are offered as choices.
+
+"""
+
+from .storage import fingerprint
+from .normalise import Grader, Normaliser, natural_keys
+import bisect
+import random
+
+# Normaliser of the default rules, used when the headings are not known.
+defaultnormaliser = Normaliser()
+
+# Number of questions that may be new looked up in the schedule at once
+# while drawing a session.
+sessionbatch = 256
+
+def normalise(s):
+    "normalise string to simplify comparison"
+    return list(defaultnormaliser.normalise(s))
+
+def grade(answers, correct):
+    """Compare the answers given to a question with the correct answers,
+ignoring order, case and separators. Returns whether the answers are
+correct, and both lists normalised and joined back into strings. See
+Grader for the rules chosen by the headings of a table.
+
+    """
+    return defaultnormaliser.grade(answers, correct)[:3]
+
+def parseheadings(headings):
+    "Returns the name of each column and whether it is AnswerOnly."
+    columns = []
+    for hd in headings:
+        attrs = hd.split("|")
+        columns.append((attrs.pop(0), "AnswerOnly" in attrs))
+    return columns
+
+def buildquestions(headings, rows):
+    """Returns every question that can be asked of a table, in the order
+of the columns and then the rows in which the question value first
+appears. Columns with the AnswerOnly attribute (e.g. "Name|AnswerOnly")
+are only used for answers. Empty cells are ignored.
+
+Values are collected in dicts, used as insertion ordered sets, so the
+table is indexed in a single pass over the rows of each column.
+
+    """
+    columns = parseheadings(headings)
+
+    # holds possible values by column { c |-> { v } }
+    values = {}
+    # holds map of questions { c1 |-> { v1 |-> { c2 |-> { v2 } } } }
+    quiz = {}
+    for (c1, (c1name, answeronly)) in enumerate(columns):
+        others = [(c2, c2name) for (c2, (c2name, _)) in enumerate(columns)
+                  if c2 != c1]
+        for row in rows:
+            v1 = row[c1]
+            if v1 == "" or v1 == None:
+                continue
+            values.setdefault(c1name, {})[v1] = None
+            if answeronly:
+                continue
+            question = None
+            for (c2, c2name) in others:
+                v2 = row[c2]
+                if v2 != "" and v2 != None:
+                    if question == None:
+                        question = quiz.setdefault(c1name, {}) \
+                                       .setdefault(v1, {})
+                    question.setdefault(c2name, {})[v2] = None
+
+    ## Questions of the same answer column share the list of choices
+    choices = {c: list(vs) for (c, vs) in values.items()}
+    return [(c1, v1, c2, list(answers), choices[c2])
+            for (c1, v1s) in quiz.items()
+            for (v1, c2s) in v1s.items()
+            for (c2, answers) in c2s.items()]
+
+class QuestionStream:
+    """The questions of buildquestions drawn lazily in a random order.
+len gives the number of questions left and pop draws the next one, so
+it can be used in place of a shuffled list of questions.
+
+Only the rows of each question value and the answer columns that have
+values in them (as a bit mask) are indexed. The questions are numbered
+by their position in this index, and the numbers are shuffled with an
+incremental Fisher-Yates shuffle that only records the positions it
+has swapped. A question is built when it is drawn.
+
+    """
+    def __init__(self, headings, rows, rnd=random):
+        self.columns = parseheadings(headings)
+        self.rows = rows
+        self.rnd = rnd
+        self.choices = {}
+
+        ## Columns with a value in each row
+        masks = [sum(1 << c for (c, v) in enumerate(row)
+                     if v != "" and v != None)
+                 for row in rows]
+
+        # (c1, v1, rows with v1 in c1, answer columns) of each question
+        # value and the number of questions before it
+        self.index = []
+        self.offsets = []
+        self.total = 0
+        for (c1, (c1name, answeronly)) in enumerate(self.columns):
+            if answeronly:
+                continue
+            groups = {}
+            for (r, row) in enumerate(rows):
+                if masks[r] >> c1 & 1:
+                    groups.setdefault(row[c1], []).append(r)
+            for (v1, group) in groups.items():
+                mask = 0
+                for r in group:
+                    mask |= masks[r]
+                mask &= ~(1 << c1)
+                if mask:
+                    self.index.append((c1, v1, group, mask))
+                    self.offsets.append(self.total)
+                    self.total += bin(mask).count("1")
+
+        self.drawn = 0
+        self.swapped = {}
+
+    def __len__(self):
+        return self.total - self.drawn
+
+    def __iter__(self):
+        while len(self) > 0:
+            yield self.pop()
+
+    def pop(self):
+        "Draw the next question."
+        if len(self) == 0:
+            raise IndexError("pop from empty question stream")
+        k = self.drawn
+        j = self.rnd.randrange(k, self.total)
+        i = self.swapped.get(j, j)
+        if j != k:
+            self.swapped[j] = self.swapped.pop(k, k)
+        else:
+            self.swapped.pop(k, None)
+        self.drawn += 1
+        return self.question(i)
+
+    def question(self, i):
+        "Build question number i of the index."
+        g = bisect.bisect_right(self.offsets, i) - 1
+        (c1, v1, group, mask) = self.index[g]
+        ## Find the (i - offset)th answer column of the question value
+        n = i - self.offsets[g]
+        c2 = 0
+        while True:
+            if mask >> c2 & 1:
+                if n == 0:
+                    break
+                n -= 1
+            c2 += 1
+        answers = {}
+        for r in group:
+            v2 = self.rows[r][c2]
+            if v2 != "" and v2 != None:
+                answers[v2] = None
+        return (self.columns[c1][0], v1, self.columns[c2][0], list(answers),
+                self.values(c2))
+
+    def values(self, c):
+        "All values of column c, shared by the questions of the column."
+        if c not in self.choices:
+            self.choices[c] = list(dict.fromkeys(
+                row[c] for row in self.rows
+                if row[c] != "" and row[c] != None))
+        return self.choices[c]
+
+class ChoiceIndex:
+    def __init__(self, distractors=10, rnd=random):
+        """Choices offered for the questions of a quiz: the correct answers
+and up to distractors other values of the answer column sampled at
+random, or every value if distractors is 0. The values of each column
+are sorted once, along with the position of each value, so that the
+choices of a question are found in the same order without sorting.
+
+        """
+        self.distractors = distractors
+        self.rnd = rnd
+        # column |-> (sorted values, { value |-> position })
+        self.columns = {}
+
+    def column(self, question):
+        "The sorted values of the answer column of question."
+        c = question[2]
+        if c not in self.columns:
+            values = sorted(question[4], key=natural_keys)
+            self.columns[c] = (values,
+                               {v: i for (i, v) in enumerate(values)})
+        return self.columns[c]
+
+    def choices(self, question):
+        "Returns the sorted choices of question."
+        (values, position) = self.column(question)
+        correct = question[3]
+        if self.distractors <= 0 or \
+           len(values) <= len(correct) + self.distractors:
+            return values
+
+        ## Sample positions, giving up on columns of mostly correct answers
+        picked = {position[v] for v in correct}
+        wanted = len(picked) + self.distractors
+        for attempt in range(4 * self.distractors):
+            if len(picked) >= wanted:
+                break
+            picked.add(self.rnd.randrange(len(values)))
+        return [values[i] for i in sorted(picked)]
+
+def loadquestions(storage, name):
+    """Returns the questions of the current revision of memory set name,
+or None if it can not be loaded.
+
+    """
+    result = storage.table(name)
+    if result == None:
+        return None
+    return buildquestions(*result)
+
+def questionfingerprint(name, question, grader=None):
+    """Fingerprint of a question of memory set name, as recorded with its
+answers by Storage.saveresults. The correct answers are normalised by
+grader, or the default rules if not given.
+
+    """
+    if grader == None:
+        correct = "\n".join(grade([], question[3])[2])
+    else:
+        correct = "\n".join(grader.grade(question, [])[2])
+    return fingerprint(name, question[0], question[1], question[2], correct)
+
+def buildsession(storage, name, headings, rows, size, rnd=random,
+                 grader=None, now="now"):
+    """Returns a shuffled list of up to size questions of a table for a
+spaced repetition session: the questions that are due, most overdue
+first, then questions that have never been answered, then the weakest
+questions that are not due yet, lowest ease first. Returns None if the
+schedule can not be loaded.
+
+Only size due and weakest questions are read from the schedule, more are
+read only when some of them are no longer in the table.
+
+    """
+    if grader == None:
+        grader = Grader(headings)
+    limit = size
+    while True:
+        due = storage.duequestions(name, limit, now)
+        weakest = storage.weakestquestions(name, limit, now)
+        if due == None or weakest == None:
+            return None
+        result = _drawsession(storage, name, headings, rows, size, rnd,
+                              grader, due, weakest)
+        if result == None:
+            return None
+        (found, new, weak) = result
+
+        ## Widen the limit if questions that are no longer in the table
+        ## left out due or weakest questions that may still be
+        if len(due) == limit and len(found) < size:
+            limit *= 2
+        elif len(weakest) == limit and \
+             len(found) + len(new) + len(weak) < size:
+            limit *= 2
+        else:
+            break
+
+    ## The most overdue questions that are still in the table come first
+    session = [found[i] for i in sorted(found)] + new + \
+        [weak[i] for i in sorted(weak)]
+    session = session[:size]
+    rnd.shuffle(session)
+    return session
+
+def _drawsession(storage, name, headings, rows, size, rnd, grader, due,
+                 weakest):
+    """Draws the questions of a session from a table, see buildsession.
+Returns a tuple of the due questions found by their position in due, up
+to size questions that have never been answered and the weakest
+questions found by their position in weakest, or None if the schedule
+can not be loaded.
+
+    """
+    duepriority = {f: i for (i, f) in enumerate(due)}
+    weakpriority = {f: i for (i, f) in enumerate(weakest)}
+    found = {}
+    weak = {}
+    new = []
+    ## Questions that may be new, looked up in the schedule in batches
+    pending = []
+    ## Number of the size most overdue questions found
+    top = min(size, len(due))
+    foundtop = 0
+
+    def lookup():
+        unscheduled = storage.unscheduled([f for (f, q) in pending])
+        if unscheduled == None:
+            return False
+        new.extend([q for (f, q) in pending if f in unscheduled]
+                   [:size - len(new)])
+        pending.clear()
+        return True
+
+    ## Draw in random order until the most overdue and new questions are
+    ## found, due questions that are no longer in the table mean a full scan
+    for question in QuestionStream(headings, rows, rnd):
+        f = questionfingerprint(name, question, grader)
+        i = duepriority.get(f)
+        if i != None:
+            found[i] = question
+            if i < top:
+                foundtop += 1
+        elif f in weakpriority:
+            weak[weakpriority[f]] = question
+        elif len(new) < size:
+            pending.append((f, question))
+            if len(pending) >= sessionbatch and not lookup():
+                return None
+        if foundtop == top and top + len(new) >= size:
+            break
+    if pending and not lookup():
+        return None
+    return (found, new, weak)
+
+def loadquiz(storage, name, session=None, rnd=random):
+    """Returns a Grader of the answers and the shuffled questions of the
+current revision of memory set name, or None if it can not be loaded.
+If session is given, only a spaced repetition session of up to session
+questions is returned, see buildsession.
+
+    """
+    result = storage.table(name)
+    if result == None:
+        return None
+    grader = Grader(result[0])
+    if session:
+        questions = buildsession(storage, name, *result, session, rnd, grader)
+        if questions == None:
+            return None
+    else:
+        questions = buildquestions(*result)
+        rnd.shuffle(questions)
+    return (grader, questions)
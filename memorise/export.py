@@ -0,0 +1,216 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Export test history to CSV, JSON Lines or NumPy .npz files.
+
+Rows are streamed from a database cursor to the output file, so the
+export runs in bounded memory regardless of the size of the history.
+Writing .npz files requires numpy.
+
+"""
+
+from pathlib import Path
+import csv
+import json
+import zipfile
+import sys
+
+# Exportable data, each selects from tests as T so they can share the
+# same filters. The daily totals of compacted answers have no test, so
+# they are selected as T with the start of their day as the TimeStamp.
+sources = {
+    "results": """
+SELECT R.`Memory Set`, T.TimeStamp, R.TestID, R.Column1, R.Value1,
+       R.Column2, R.UserAnswer, R.CorrectAnswer
+FROM results AS R
+INNER JOIN tests AS T ON T.TestID == R.TestID
+""",
+    "tests": """
+SELECT T.* FROM tests AS T
+""",
+    "answers": """
+SELECT A.* FROM answers AS A
+INNER JOIN tests AS T ON T.TestID == A.TestID
+""",
+    "daily": """
+SELECT T.`Memory Set`, T.Day, T.Fingerprint, T.Column1, T.Value1, T.Column2,
+       T.CorrectAnswer, T.Asked, T.Failed
+FROM
+(
+  SELECT D.*, Q.Column1, Q.Value1, Q.Column2, Q.CorrectAnswer,
+         DATETIME(D.Day) AS TimeStamp
+  FROM dailystats AS D
+  INNER JOIN questionstats AS Q ON Q.Fingerprint == D.Fingerprint
+) AS T
+""",
+}
+
+# Order of the exported rows of each source, by default the order the
+# tests were taken in.
+orders = {
+    "daily": "T.Day, T.Fingerprint",
+}
+
+formats = ["csv", "jsonl", "npz"]
+
+def exportformat(path):
+    "Guess the export format from the file extension."
+    ext = Path(path).suffix.lower().lstrip(".")
+    if ext in ["json", "jsonl", "ndjson"]:
+        return "jsonl"
+    if ext == "npz":
+        return "npz"
+    return "csv"
+
+def query(source, name=None, start=None, end=None):
+    """Returns the query and parameters to export source. The rows can be
+restricted to the memory set name and to tests taken between the dates
+start and end inclusive.
+
+    """
+    sql = sources[source]
+    where = []
+    params = {}
+    if name != None:
+        where.append("T.`Memory Set` == :name")
+        params["name"] = name
+    if start != None:
+        where.append("T.TimeStamp >= DATETIME(:start)")
+        params["start"] = start
+    if end != None:
+        where.append("T.TimeStamp < DATETIME(:end, '+1 day')")
+        params["end"] = end
+    if where:
+        sql = sql + "WHERE " + " AND ".join(where) + "\n"
+    return (sql + "ORDER BY " + orders.get(source, "T.TestID"), params)
+
+def writecsv(f, headings, rows):
+    writer = csv.writer(f)
+    writer.writerow(headings)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def writejsonl(f, headings, rows):
+    count = 0
+    for row in rows:
+        f.write(json.dumps(dict(zip(headings, row))))
+        f.write("\n")
+        count += 1
+    return count
+
+def writenpz(storage, path, source, sql, params, size=1000):
+    """Write a structured array with one field per column into an .npz
+file. The number of rows and the width of the text columns are found
+first so that the array can be written in batches.
+
+    """
+    import numpy
+
+    result = storage.stream(sql, params, "Unable to export {}".format(source))
+    if result == None:
+        return None
+    (headings, rows) = result
+
+    # Find the shape and type of every column
+    cols = ["`{}`".format(hd) for hd in headings]
+    info = storage.stream(
+        "SELECT COUNT(*), {} FROM ({})".format(
+            ", ".join("SUM(typeof({0}) NOT IN ('integer', 'null')), "
+                      "MAX(LENGTH({0}))".format(c) for c in cols),
+            sql),
+        params,
+        "Unable to size export of {}".format(source))
+    if info == None:
+        return None
+    info = next(info[1])
+    count = info[0]
+    fields = []
+    blank = []
+    for (i, hd) in enumerate(headings):
+        if info[1 + 2 * i]:
+            fields.append((hd, "U{}".format(max(1, info[2 + 2 * i] or 1))))
+            blank.append("")
+        else:
+            fields.append((hd, "i8"))
+            blank.append(-1)
+    dtype = numpy.dtype(fields)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("{}.npy".format(source), "w", force_zip64=True) as f:
+            numpy.lib.format.write_array_header_2_0(
+                f, {"descr": numpy.lib.format.dtype_to_descr(dtype),
+                    "fortran_order": False,
+                    "shape": (count,)})
+            written = 0
+            batch = []
+            for row in rows:
+                if written + len(batch) == count:
+                    # Rows added since the size was taken
+                    break
+                batch.append(tuple(blank[i] if v == None else v
+                                   for (i, v) in enumerate(row)))
+                if len(batch) == size:
+                    f.write(numpy.array(batch, dtype=dtype).tobytes())
+                    written += len(batch)
+                    batch = []
+            if batch:
+                f.write(numpy.array(batch, dtype=dtype).tobytes())
+                written += len(batch)
+    return written
+
+def exportfile(storage, path, source="results", fmt=None, name=None,
+               start=None, end=None):
+    """Export source (one of sources) to the file path in format fmt (one
+of formats, guessed from the extension by default). Returns the number
+of rows written or None on failure.
+
+    """
+    if source not in sources:
+        print("Error: Unknown export source {}".format(source),
+              file=sys.stderr)
+        return None
+    if fmt == None:
+        fmt = exportformat(path)
+    if fmt not in formats:
+        print("Error: Unknown export format {}".format(fmt), file=sys.stderr)
+        return None
+
+    (sql, params) = query(source, name, start, end)
+
+    def run():
+        try:
+            if fmt == "npz":
+                return writenpz(storage, path, source, sql, params)
+            result = storage.stream(sql, params,
+                                    "Unable to export {}".format(source))
+            if result == None:
+                return None
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                if fmt == "csv":
+                    return writecsv(f, *result)
+                return writejsonl(f, *result)
+        except ImportError:
+            print("Error: numpy is required to export to npz", file=sys.stderr)
+            return None
+        except OSError as e:
+            print("Error: Unable to write {}: {}".format(path, e),
+                  file=sys.stderr)
+            return None
+
+    # Read everything from one snapshot of the database
+    return storage.transaction(run)
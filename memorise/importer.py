@@ -0,0 +1,95 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Import memory sets from CSV or TSV files.
+
+The first line of the file holds the column headings, a heading can be
+marked as only used for answers by appending |AnswerOnly. Each further
+line is a row of the table. The file is streamed, so large files can
+be imported without holding them in memory.
+
+"""
+
+from .validation import nameerror, headingserror
+from pathlib import Path
+import csv
+import sys
+
+def tablename(path):
+    "Default memory set name for a file."
+    return Path(path).stem.strip().replace(" ", "_")
+
+def delimiter(path):
+    "Guess the delimiter of a file from its extension."
+    if Path(path).suffix.lower() in [".tsv", ".tab"]:
+        return "\t"
+    return ","
+
+def readrows(reader, width):
+    "Yields the rows of reader, checking each against the headings."
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if len(row) > width:
+            raise ValueError("Line {}: too many values"
+                             "".format(reader.line_num))
+        row = [cell.strip() for cell in row] + [""] * (width - len(row))
+        if row[0] == "":
+            raise ValueError("Line {}: no value in first column"
+                             "".format(reader.line_num))
+        yield row
+
+def importfile(storage, path, name=None, sep=None, existing=None,
+               chunksize=1000, progress=None):
+    """Import the file at path into a new memory set. The name defaults
+to the file name and the delimiter is guessed from the extension.
+Returns the number of rows imported or None on failure.
+
+    """
+    if name == None:
+        name = tablename(path)
+    if sep == None:
+        sep = delimiter(path)
+    if existing == None:
+        existing = storage.tablenames()
+        if existing == None:
+            return None
+
+    err = nameerror(name, existing)
+    if err:
+        print("Error: Invalid table name {}: {}".format(name, err),
+              file=sys.stderr)
+        return None
+
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f, delimiter=sep)
+            headings = next(reader, [])
+            headings = ["|".join(attr.strip() for attr in hd.split("|"))
+                        for hd in headings]
+            err = headingserror(headings)
+            if err:
+                print("Error: Invalid headings in {}: {}".format(path, err),
+                      file=sys.stderr)
+                return None
+            return storage.importtable(name,
+                                       headings,
+                                       readrows(reader, len(headings)),
+                                       chunksize,
+                                       progress)
+    except (OSError, ValueError, csv.Error) as e:
+        print("Error: Unable to import {}: {}".format(path, e),
+              file=sys.stderr)
+        return None
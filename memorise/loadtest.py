@@ -0,0 +1,182 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Load test of the quiz server. Each client repeatedly lists the
+memory sets, starts a quiz, answers its questions and saves the
+results, over a kept alive connection:
+
+    pymemorise --serve 8080 &
+    python3 -m memorise.loadtest --port 8080 --clients 50 --duration 30
+
+The requests per second and latency percentiles of each endpoint are
+written as JSON.
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+class Client:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        "Returns the status and decoded JSON response of a request."
+        if self.writer == None:
+            (self.reader, self.writer) = await asyncio.open_connection(
+                self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body != None else b""
+        self.writer.write("{} {} HTTP/1.1\r\n"
+                          "Host: {}:{}\r\n"
+                          "Content-Type: application/json\r\n"
+                          "Content-Length: {}\r\n"
+                          "\r\n".format(method, path, self.host, self.port,
+                                        len(data)).encode("latin-1"))
+        self.writer.write(data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            (key, _, value) = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        result = json.loads(await self.reader.readexactly(
+            int(headers["content-length"])))
+        if headers.get("connection") == "close":
+            self.close()
+        return (status, result)
+
+    def close(self):
+        if self.writer != None:
+            self.writer.close()
+        self.writer = None
+
+def percentile(values, p):
+    "Returns the pth percentile of the sorted list values."
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def client(host, port, names, end, latencies, errors, questions, rnd):
+    c = Client(host, port)
+    async def timed(endpoint, method, path, body=None):
+        start = time.perf_counter()
+        try:
+            (status, result) = await c.request(method, path, body)
+        except (OSError, ValueError, IndexError,
+                asyncio.IncompleteReadError) as e:
+            c.close()
+            (status, result) = (None, str(e))
+        latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+        if status != 200:
+            errors[endpoint] = errors.get(endpoint, 0) + 1
+            return None
+        return result
+
+    try:
+        while time.perf_counter() < end:
+            sets = await timed("sets", "GET", "/sets")
+            if not sets and not names:
+                await asyncio.sleep(0.1)
+                continue
+            name = rnd.choice(names or [s["Memory Set"] for s in sets])
+            quiz = await timed("quiz", "POST", "/quiz", {"name": name})
+            if not quiz:
+                continue
+            for q in quiz["questions"][:questions]:
+                ## Pick one of the choices at random, so most answers are
+                ## wrong as the choices include distractors
+                answer = [rnd.choice(q["choices"])] if q["choices"] else []
+                await timed("answer", "POST",
+                            "/quiz/{}/answer".format(quiz["quiz"]),
+                            {"question": q["question"], "answer": answer})
+            await timed("results", "POST",
+                        "/quiz/{}/results".format(quiz["quiz"]))
+    finally:
+        c.close()
+
+async def run(host, port, clients, duration, names, questions, seed):
+    latencies = {}
+    errors = {}
+    start = time.perf_counter()
+    end = start + duration
+    await asyncio.gather(*[
+        client(host, port, names, end, latencies, errors, questions,
+               random.Random(seed + i))
+        for i in range(clients)])
+    elapsed = time.perf_counter() - start
+
+    report = {"clients": clients, "seconds": elapsed, "endpoints": {}}
+    total = 0
+    for (endpoint, times) in sorted(latencies.items()):
+        times.sort()
+        total += len(times)
+        report["endpoints"][endpoint] = {
+            "requests": len(times),
+            "errors": errors.get(endpoint, 0),
+            "requests_per_second": len(times) / elapsed,
+            "p50_ms": percentile(times, 50) * 1000,
+            "p99_ms": percentile(times, 99) * 1000,
+            "max_ms": times[-1] * 1000,
+        }
+    alltimes = sorted(t for times in latencies.values() for t in times)
+    report["requests"] = total
+    report["errors"] = sum(errors.values())
+    report["requests_per_second"] = total / elapsed
+    report["p99_ms"] = (percentile(alltimes, 99) or 0) * 1000
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m memorise.loadtest",
+        description="Load test a running quiz server.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address of the server")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="port of the server")
+    parser.add_argument("--clients", type=int, default=20,
+                        help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="seconds to run for")
+    parser.add_argument("--name", action="append", default=[],
+                        help="memory set to take quizzes of, may be given "
+                        "more than once. Defaults to all sets")
+    parser.add_argument("--questions", type=int, default=20,
+                        help="questions answered per quiz")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the random answers")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.host, args.port, args.clients,
+                             args.duration, args.name, args.questions,
+                             args.seed))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if report["requests"] == 0:
+        print("Error: No requests completed, is the server running?",
+              file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
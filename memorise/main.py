@@ -16,15 +16,18 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import memorise
-from memorise import Memorise, datastore, icon
+from memorise import datastore, storage, importer, export, querylog, icon
+from memorise import server, normalise
+from memorise.mainwindow import Memorise
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import QSize, QCommandLineParser, QCommandLineOption
+from PyQt5.QtCore import QCoreApplication
 from pathlib import Path
 import sys
 import os.path
 
-def process_args(app):
+def process_args(argv):
     args = {}
 
     parser = QCommandLineParser()
@@ -41,9 +44,200 @@ def process_args(app):
         str(Path.home().joinpath(".pymem.db")))
     parser.addOption(dbOption)
 
-    parser.process(app)
+    profileOption = QCommandLineOption(
+        ["db-profile"],
+        "database tuning profile, one of: {}. The fast profile uses a "
+        "write ahead log which is not supported on network file systems"
+        "".format(", ".join(storage.dbprofiles.keys())),
+        "profile",
+        "safe")
+    parser.addOption(profileOption)
+
+    importOption = QCommandLineOption(
+        ["import"],
+        "import a CSV or TSV file as a new memory set and exit. The first "
+        "line holds the headings, append |AnswerOnly to a heading to only "
+        "use it for answers",
+        "file")
+    parser.addOption(importOption)
+
+    exportOption = QCommandLineOption(
+        ["export"],
+        "export the test history to a CSV, JSON Lines (.jsonl) or NumPy "
+        "(.npz) file and exit",
+        "file")
+    parser.addOption(exportOption)
+
+    formatOption = QCommandLineOption(
+        ["format"],
+        "export format, one of: {}. Defaults to the file extension"
+        "".format(", ".join(export.formats)),
+        "format")
+    parser.addOption(formatOption)
+
+    sourceOption = QCommandLineOption(
+        ["source"],
+        "data to export, one of: {}".format(", ".join(export.sources)),
+        "source",
+        "results")
+    parser.addOption(sourceOption)
+
+    fromOption = QCommandLineOption(
+        ["from"],
+        "only export tests taken on or after date (YYYY-MM-DD)",
+        "date")
+    parser.addOption(fromOption)
+
+    toOption = QCommandLineOption(
+        ["to"],
+        "only export tests taken on or before date (YYYY-MM-DD)",
+        "date")
+    parser.addOption(toOption)
+
+    nameOption = QCommandLineOption(
+        ["name"],
+        "name of the memory set to import, defaults to the file name. "
+        "When exporting, only export tests of this memory set",
+        "name")
+    parser.addOption(nameOption)
+
+    compactOption = QCommandLineOption(
+        ["compact"],
+        "keep the answers of the last n tests of each memory set, fold "
+        "older answers into daily totals and exit",
+        "n")
+    parser.addOption(compactOption)
+
+    serveOption = QCommandLineOption(
+        ["serve"],
+        "serve quizzes over HTTP/JSON on [host:]port instead of opening "
+        "the main window. The host defaults to 127.0.0.1",
+        "address")
+    parser.addOption(serveOption)
+
+    readersOption = QCommandLineOption(
+        ["readers"],
+        "number of read connections used when serving quizzes",
+        "n",
+        "4")
+    parser.addOption(readersOption)
+
+    sessionOption = QCommandLineOption(
+        ["session-size"],
+        "number of questions in a review session, which asks the questions "
+        "that are due by their spaced repetition schedule",
+        "n",
+        "20")
+    parser.addOption(sessionOption)
+
+    fuzzyOption = QCommandLineOption(
+        ["fuzzy"],
+        "accept answers with up to n typing mistakes as near misses, at "
+        "most one every {} characters. Defaults to 0, only exact answers"
+        "".format(normalise.charsperedit),
+        "n",
+        "0")
+    parser.addOption(fuzzyOption)
+
+    choicesOption = QCommandLineOption(
+        ["choices"],
+        "number of wrong choices offered with the correct answers when "
+        "answering from a list, 0 offers every value of the column",
+        "n",
+        "10")
+    parser.addOption(choicesOption)
+
+    slowLogOption = QCommandLineOption(
+        ["slow-query-log"],
+        "write queries slower than --slow-query-ms and their query plans "
+        "to file, which is rotated when it grows over 1MB",
+        "file")
+    parser.addOption(slowLogOption)
+
+    slowMsOption = QCommandLineOption(
+        ["slow-query-ms"],
+        "threshold in milliseconds of the slow query log",
+        "ms",
+        "100")
+    parser.addOption(slowMsOption)
+
+    parser.process(argv)
 
     args["database"] = parser.value(dbOption)
+    args["profile"] = parser.value(profileOption)
+    if args["profile"] not in storage.dbprofiles:
+        print("Error: Unknown database profile {}".format(args["profile"]),
+              file=sys.stderr)
+        parser.showHelp(1)
+
+    args["import"] = parser.value(importOption)
+    args["name"] = parser.value(nameOption) or None
+    args["export"] = parser.value(exportOption)
+    args["format"] = parser.value(formatOption) or None
+    args["source"] = parser.value(sourceOption)
+    args["from"] = parser.value(fromOption) or None
+    args["to"] = parser.value(toOption) or None
+
+    args["compact"] = None
+    if parser.value(compactOption):
+        try:
+            args["compact"] = int(parser.value(compactOption))
+        except ValueError:
+            args["compact"] = -1
+        if args["compact"] < 0:
+            print("Error: Invalid number of tests to keep {}".format(
+                parser.value(compactOption)), file=sys.stderr)
+            parser.showHelp(1)
+
+    args["serve"] = None
+    if parser.value(serveOption):
+        (host, _, port) = parser.value(serveOption).rpartition(":")
+        try:
+            args["serve"] = (host or "127.0.0.1", int(port))
+            args["readers"] = int(parser.value(readersOption))
+        except ValueError:
+            print("Error: Invalid address {} or readers {}".format(
+                parser.value(serveOption), parser.value(readersOption)),
+                  file=sys.stderr)
+            parser.showHelp(1)
+
+    try:
+        args["session"] = int(parser.value(sessionOption))
+    except ValueError:
+        args["session"] = 0
+    if args["session"] < 1:
+        print("Error: Invalid session size {}".format(
+            parser.value(sessionOption)), file=sys.stderr)
+        parser.showHelp(1)
+
+    try:
+        args["fuzzy"] = int(parser.value(fuzzyOption))
+    except ValueError:
+        args["fuzzy"] = -1
+    if args["fuzzy"] < 0:
+        print("Error: Invalid number of typing mistakes {}".format(
+            parser.value(fuzzyOption)), file=sys.stderr)
+        parser.showHelp(1)
+
+    try:
+        args["choices"] = int(parser.value(choicesOption))
+    except ValueError:
+        args["choices"] = -1
+    if args["choices"] < 0:
+        print("Error: Invalid number of choices {}".format(
+            parser.value(choicesOption)), file=sys.stderr)
+        parser.showHelp(1)
+
+    args["querylog"] = None
+    if parser.value(slowLogOption):
+        try:
+            threshold = float(parser.value(slowMsOption)) / 1000
+        except ValueError:
+            print("Error: Invalid slow query threshold {}".format(
+                parser.value(slowMsOption)), file=sys.stderr)
+            parser.showHelp(1)
+        args["querylog"] = querylog.QueryLog(threshold,
+                                             parser.value(slowLogOption))
 
     if parser.positionalArguments():
         print(parser.positionalArguments())
@@ -52,17 +246,72 @@ def process_args(app):
     return args
 
 def main():
-    app = QApplication(sys.argv)
-    app.setApplicationName(memorise.name)
-    app.setApplicationVersion(memorise.version)
+    QCoreApplication.setApplicationName(memorise.name)
+    QCoreApplication.setApplicationVersion(memorise.version)
 
-    args = process_args(app)
+    args = process_args(sys.argv)
 
     print('''{} {}
 Copyright (C) 2019 Karim Kanso. All Rights Reserved.'''.format(
     memorise.name,
     memorise.version))
+    print("Database profile: {} ({})".format(
+        args["profile"],
+        ", ".join("{}={}".format(p, v)
+                  for (p, v) in storage.dbprofiles[args["profile"]])))
+
+    if args["import"]:
+        with storage.Storage(args['database'],
+                             args['profile'],
+                             args['querylog']) as st:
+            count = importer.importfile(st, args["import"], args["name"])
+        if count == None:
+            sys.exit(1)
+        print("Imported {} rows".format(count))
+        return
+
+    if args["export"]:
+        with storage.Storage(args['database'],
+                             args['profile'],
+                             args['querylog']) as st:
+            count = export.exportfile(st,
+                                      args["export"],
+                                      args["source"],
+                                      args["format"],
+                                      args["name"],
+                                      args["from"],
+                                      args["to"])
+        if count == None:
+            sys.exit(1)
+        print("Exported {} rows".format(count))
+        return
 
+    if args["compact"] != None:
+        with storage.Storage(args['database'],
+                             args['profile'],
+                             args['querylog']) as st:
+            result = st.compact(
+                args["compact"],
+                progress=lambda done, total: print(
+                    "Compacted {} of {} tests".format(done, total)))
+        if result == None:
+            sys.exit(1)
+        print("Compacted {} tests, deleted {} answers and freed {} bytes"
+              "".format(*result))
+        return
+
+    if args["serve"]:
+        server.serve(args["database"],
+                     args["profile"],
+                     args["serve"][0],
+                     args["serve"][1],
+                     args["readers"],
+                     args["querylog"],
+                     args["fuzzy"],
+                     args["choices"])
+        return
+
+    app = QApplication(sys.argv)
     icon_dir = os.path.dirname(icon.__file__)
     app_icon = QIcon()
     for size in [70, 144, 150, 310]:
@@ -70,8 +319,13 @@ Copyright (C) 2019 Karim Kanso. All Rights Reserved.'''.format(
                          QSize(size, size))
     app.setWindowIcon(app_icon)
 
-    with datastore.Datastore(args['database']) as ds:
-        m = Memorise(datastore=ds)
+    with datastore.Datastore(args['database'],
+                             args['profile'],
+                             args['querylog']) as ds:
+        m = Memorise(datastore=ds,
+                     sessionsize=args["session"],
+                     distance=args["fuzzy"],
+                     distractors=args["choices"])
         m.show()
         app.exec_()
 
@@ -0,0 +1,258 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Normalisation of answers, so that answers can be compared ignoring
+differences that do not matter such as case or separators.
+
+By default letters are compared ignoring case, tokens are compared
+ignoring the spaces, hyphens and commas between them and lists of
+numbers are compared in numeric order. Each answer column can change
+these rules with attributes of its heading, e.g. "Code|CaseSensitive":
+
+    CaseSensitive   compare letters including their case
+    ExactSpacing    compare the spaces, hyphens and commas of an answer
+    NoNumericLists  do not compare lists of numbers in numeric order
+
+Optionally, answers with a few typing mistakes can be accepted as near
+misses, see Grader.
+
+"""
+
+import functools
+import re
+
+# Heading attributes that select the rules of an answer column.
+attributes = ["CaseSensitive", "ExactSpacing", "NoNumericLists"]
+
+# Number of normalised answers typed by the user that are cached by each
+# Normaliser. Values of the table are always cached, see prepare.
+cachesize = 4096
+
+numericlist = re.compile(r' *-?\d+(\.\d+)? *(, *-?\d+(\.\d+)? *)*')
+numbersplit = re.compile(r'[ ,]')
+tokensplit = re.compile(r'[ \-,]+')
+naturalsplit = re.compile(r'[+-]?([0-9]+(?:[.][0-9]*)?|[.][0-9]+)')
+digits = re.compile(r'[0-9]+')
+
+# A near miss has at most one edit for each this many characters of the
+# correct answer, so short answers must be exact.
+charsperedit = 4
+
+def atof(text):
+    try:
+        retval = float(text)
+    except ValueError:
+        retval = text
+    return retval
+
+def natural_keys(text):
+    '''
+    alist.sort(key=natural_keys) sorts in human order
+    basd on: https://stackoverflow.com/a/5967539/5660642
+    modified to ignore changes
+    '''
+    return [ atof(c.upper()) for c in naturalsplit.split(text) ]
+
+def editdistance(a, b, limit=None):
+    """Levenshtein distance between strings a and b, computed a character
+of b at a time with the bit-parallel algorithm of Myers (1999) over the
+characters of a. If limit is given and the distance is larger, stops as
+soon as this is known and returns limit + 1.
+
+    """
+    if len(a) > len(b):
+        (a, b) = (b, a)
+    if limit != None and len(b) - len(a) > limit:
+        return limit + 1
+    if len(a) == 0:
+        return len(b)
+
+    ## Bit i of peq[c] is set when a[i] == c
+    peq = {}
+    for (i, c) in enumerate(a):
+        peq[c] = peq.get(c, 0) | 1 << i
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    vp = mask
+    vn = 0
+    score = len(a)
+    for (j, c) in enumerate(b):
+        eq = peq.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        ph = vn | ~(xh | vp) & mask
+        mh = vp & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ## The remaining characters can lower the distance by one each
+        if limit != None and score - (len(b) - j - 1) > limit:
+            return limit + 1
+        ph = (ph << 1 | 1) & mask
+        mh = (mh << 1) & mask
+        vp = mh | ~(xv | ph) & mask
+        vn = ph & xv
+    return score
+
+def nearmiss(answer, correct, distance):
+    """Whether answer is within distance edits of correct, but at most
+one edit every charsperedit characters of correct. The numbers in
+both must be the same.
+
+    """
+    limit = min(distance, len(correct) // charsperedit)
+    if limit == 0 or digits.findall(answer) != digits.findall(correct):
+        return False
+    return editdistance(answer, correct, limit) <= limit
+
+class Normaliser:
+    def __init__(self, attrs=(), size=cachesize):
+        """Normalises answers with the rules selected by the heading
+attributes attrs. The canonical form of each answer is cached, the
+values of the table without limit and other answers in a least
+recently used cache of size entries.
+
+        """
+        self.case = "CaseSensitive" not in attrs
+        self.spacing = "ExactSpacing" not in attrs
+        self.numeric = "NoNumericLists" not in attrs
+        self.known = {}
+        self.cached = functools.lru_cache(maxsize=size)(self._form)
+
+    def prepare(self, values):
+        "Compute the canonical forms of values, e.g. a column of the table."
+        for v in values:
+            if v not in self.known:
+                self.known[v] = self._form(v)
+
+    def form(self, s):
+        """Returns the tokens of s along with them joined for comparing
+and for display.
+
+        """
+        form = self.known.get(s)
+        if form == None:
+            form = self.cached(s)
+        return form
+
+    def normalise(self, s):
+        "normalise string to simplify comparison"
+        return self.form(s)[0]
+
+    def _form(self, s):
+        tokens = self._tokens(s)
+        # collapse tokens so that "10 MBPS" == "10MBPS"
+        return (tokens, "".join(tokens), " ".join(tokens))
+
+    def _tokens(self, s):
+        if self.numeric:
+            m = numericlist.match(s)
+            if m != None and m.end() == len(s):
+                # numeric list found
+                numbers = [ x for x in numbersplit.split(s) if x != '' ]
+                numbers.sort(key=natural_keys)
+                return tuple(numbers)
+        if self.case:
+            s = s.upper()
+        if self.spacing:
+            # assume list of tokens
+            return tuple(x for x in tokensplit.split(s) if x != '')
+        s = s.strip()
+        return (s,) if s != '' else ()
+
+    def grade(self, answers, correct, distance=0):
+        """Compare the answers given to a question with the correct answers,
+ignoring their order. Returns whether the answers are correct, both
+lists normalised and joined back into strings and whether the answers
+were only accepted as a near miss.
+
+If distance is above 0, answers that are not correct are accepted as a
+near miss when each is within distance edits of a different correct
+answer, see nearmiss.
+
+        """
+        answer = [ self.form(x) for x in answers if x.strip() != '' ]
+        answer.sort()
+        correctanswers = [ self.form(x) for x in correct ]
+        correctanswers.sort()
+
+        ok = len(answer) == len(correctanswers) and \
+             all(a[1] == c[1] for (a, c) in zip(answer, correctanswers))
+        nearmiss = not ok and distance > 0 and \
+            len(answer) == len(correctanswers) and \
+            self._nearmisses([ a[1] for a in answer ],
+                             [ c[1] for c in correctanswers ],
+                             distance)
+
+        return (ok or nearmiss,
+                [ x[2] for x in answer ],
+                [ x[2] for x in correctanswers ],
+                nearmiss)
+
+    def _nearmisses(self, answer, correct, distance):
+        """Match each answer to a different correct answer it nearly misses.
+Answers that are exactly correct are matched first, so a near miss never
+takes the correct answer that another answer gives exactly.
+
+        """
+        remaining = list(correct)
+        missed = []
+        for a in answer:
+            if a in remaining:
+                remaining.remove(a)
+            else:
+                missed.append(a)
+
+        ## Pair the rest, moving an earlier pairing to another correct
+        ## answer it nearly misses when that frees one for this answer
+        pairs = {}
+        def pair(a, seen):
+            for (i, c) in enumerate(remaining):
+                if i in seen or not nearmiss(a, c, distance):
+                    continue
+                seen.add(i)
+                if i not in pairs or pair(pairs[i], seen):
+                    pairs[i] = a
+                    return True
+            return False
+        return all(pair(a, set()) for a in missed)
+
+class Grader:
+    def __init__(self, headings=(), distance=0):
+        """Grades the answers to the questions of a table with headings,
+using a Normaliser with the rules of each answer column. If distance is
+above 0, answers within distance edits of the correct answers are
+accepted as near misses.
+
+        """
+        self.distance = distance
+        self.normalisers = {}
+        for hd in headings:
+            attrs = hd.split("|")
+            self.normalisers[attrs.pop(0)] = Normaliser(attrs)
+        self.default = Normaliser()
+        self.prepared = set()
+
+    def grade(self, question, answers):
+        """Grade answers to question, see Normaliser.grade. The first time
+a column is graded the canonical forms of all its values are computed.
+
+        """
+        normaliser = self.normalisers.get(question[2], self.default)
+        if question[2] not in self.prepared:
+            normaliser.prepare(question[4])
+            self.prepared.add(question[2])
+        return normaliser.grade(answers, question[3], self.distance)
@@ -0,0 +1,75 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Timing of the queries run by Storage. A QueryLog given to a Storage
+records every query it runs, and can write the queries slower than a
+threshold along with their query plan to a rotating log file.
+
+"""
+
+import collections
+import logging
+import logging.handlers
+
+QueryRecord = collections.namedtuple(
+    "QueryRecord", ["name", "params", "seconds", "rows"])
+
+class QueryLog:
+    def __init__(self, threshold=0.1, path=None, explain=True,
+                 size=1000, maxbytes=1048576, backups=3):
+        """Keep the last size queries. If path is given, queries that take
+at least threshold seconds are written to it, with the query plan when
+explain is set. The file is rotated after maxbytes, keeping backups old
+files.
+
+        """
+        self.threshold = threshold
+        self.explain = explain
+        self.records = collections.deque(maxlen=size)
+        self.logger = None
+        if path:
+            self.logger = logging.Logger("memorise.slowquery")
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=maxbytes, backupCount=backups)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+
+    def record(self, storage, name, sql, params, seconds, rows):
+        "Record a query run by storage, logging it if it was slow."
+        self.records.append(QueryRecord(name, params, seconds, rows))
+        if self.logger == None or seconds < self.threshold:
+            return
+        message = "{} took {:.1f} ms, {} rows, params {!r}".format(
+            name, seconds * 1000, rows, params)
+        if self.explain:
+            plan = storage.queryplan(sql, params)
+            if plan:
+                message += "".join("\n    " + step for step in plan)
+        self.logger.info(message)
+
+    def summary(self):
+        """Returns a list of (name, count, total seconds, max seconds) of
+the recorded queries, slowest total first.
+
+        """
+        totals = {}
+        for r in self.records:
+            (count, total, slowest) = totals.get(r.name, (0, 0, 0))
+            totals[r.name] = (count + 1,
+                              total + r.seconds,
+                              max(slowest, r.seconds))
+        return sorted(((name,) + t for (name, t) in totals.items()),
+                      key=lambda t: t[2],
+                      reverse=True)
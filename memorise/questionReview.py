@@ -16,6 +16,7 @@
 from .ui.uiQuestionReviewDialog import Ui_QuestionReviewDialog
 from PyQt5.QtWidgets import QDialog, QHeaderView
 from PyQt5.QtCore import QSortFilterProxyModel
+from .datastore import showloading
 
 class QuestionReviewDialog(QDialog):
     def __init__(self, model):
@@ -26,6 +27,7 @@ class QuestionReviewDialog(QDialog):
 
         self.ui.questions.header().setSectionResizeMode(
             QHeaderView.ResizeToContents)
+        showloading(self.ui.questions, model)
         self.ui.questions.setModel(model)
         self.ui.questions.selectionModel().selectionChanged.connect(self.select)
         self.ui.questions.hideColumn(0)
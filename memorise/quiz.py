@@ -17,45 +17,18 @@ from .ui.uiQuizDialog import Ui_QuizDialog
 from PyQt5.QtWidgets import QDialog, QMessageBox
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 from PyQt5.QtCore import Qt
+from .engine import ChoiceIndex, QuestionStream
+from .normalise import Grader
 from functools import partial
-import random
-import re
 
 def _adds(n):
     return "" if n == 1 else "s"
 
-def atof(text):
-    try:
-        retval = float(text)
-    except ValueError:
-        retval = text
-    return retval
-
-def natural_keys(text):
-    '''
-    alist.sort(key=natural_keys) sorts in human order
-    basd on: https://stackoverflow.com/a/5967539/5660642
-    modified to ignore changes
-    '''
-    return [ atof(c.upper()) for c in
-             re.split(r'[+-]?([0-9]+(?:[.][0-9]*)?|[.][0-9]+)', text) ]
-
-def normalise(s):
-    "normalise string to simplify comparison"
-    m = re.match(r' *-?\d+(\.\d+)? *(, *-?\d+(\.\d+)? *)*', s)
-    if m != None and m.end() == len(s):
-        # numeric list found
-        numbers = [ x for x in re.split(r'[ ,]', s) if x != '' ]
-        numbers.sort(key=natural_keys)
-        return numbers
-    # assume list of tokens
-    return [ x for x in re.split(r'[ \-,]+', s.upper()) if x != '' ]
-
 class ChoiceModel(QStandardItemModel):
     def __init__(self, data):
+        "Checkable list of the choices data, which are already sorted."
         super().__init__(len(data),1)
         self.setHorizontalHeaderItem(0, QStandardItem("Choice"))
-        data.sort(key=natural_keys)
         for i in range(0,len(data)):
             item = QStandardItem(data[i])
             item.setCheckable(True)
@@ -71,7 +44,8 @@ class ChoiceModel(QStandardItemModel):
         return items
 
 class QuizDialog(QDialog):
-    def __init__(self, name, tablemodel):
+    def __init__(self, name, tablemodel=None, questions=None, grader=None,
+                 distance=0, distractors=10):
         super().__init__()
 
         self.ui = Ui_QuizDialog()
@@ -83,54 +57,26 @@ class QuizDialog(QDialog):
 
         self.questions = []
         self.question = None
+        self.grader = grader
+        self.choiceindex = ChoiceIndex(distractors)
+        # choices of the question, kept when switching answer mode
+        self.choices = (None, None)
         self.results = []
         self.incorrect = 0
 
-        self.buildQuiz(tablemodel)
+        self.buildQuiz(tablemodel, questions)
+        self.grader.distance = distance
         self.ui.progressBar.setMaximum(len(self.questions))
         self.showQuestion()
 
-    def buildQuiz(self, model):
-        data = lambda r, c: model.data(model.index(r, c))
-        # iterate over columns
-        r = model.record()
-        # holds map of questions { c1 |-> { v1 |-> { c2 -> [ v2 ] } } }
-        quiz = {}
-        # holds possible values by column { c |-> [ v ] }
-        values = {}
-        for c1 in range(0, r.count()):
-            c1attr = r.fieldName(c1).split("|")
-            c1name = c1attr.pop(0)
-            for row in range(0, model.rowCount()):
-                c1value = data(row, c1)
-                if c1value != "":
-                    if not values.get(c1name):
-                        values[c1name] = []
-                    if values[c1name].count(c1value) == 0:
-                        values[c1name].append(c1value)
-                    if "AnswerOnly" in c1attr:
-                        continue
-                    for c2 in range(0, r.count()):
-                        if c2 != c1:
-                            c2attr = r.fieldName(c2).split("|")
-                            c2name = c2attr.pop(0)
-                            c2value = data(row, c2)
-                            if c2value != "":
-                                if not quiz.get(c1name):
-                                    quiz[c1name] = {}
-                                if not quiz[c1name].get(c1value):
-                                    quiz[c1name][c1value] = {}
-                                if not quiz[c1name][c1value].get(c2name):
-                                    quiz[c1name][c1value][c2name] = []
-                                if quiz[c1name][c1value][c2name].count(c2value) == 0:
-                                    quiz[c1name][c1value][c2name].append(c2value)
-
-        self.questions = []
-        for c1 in quiz.keys():
-            for v1 in quiz[c1].keys():
-                for c2 in quiz[c1][v1].keys():
-                    self.questions.append((c1,v1,c2,quiz[c1][v1][c2],values[c2]))
-        random.shuffle(self.questions)
+    def buildQuiz(self, model, questions=None):
+        if questions != None:
+            self.questions = questions
+        else:
+            self.questions = QuestionStream(model.headings, model.rows)
+            self.grader = Grader(model.headings)
+        if self.grader == None:
+            self.grader = Grader()
         if len(self.questions) > 0:
             self.question = self.questions.pop()
 
@@ -151,35 +97,32 @@ class QuizDialog(QDialog):
             else:
                 self.ui.listAnswer.setVisible(True)
                 self.ui.textAnswer.setVisible(False)
-                self.ui.listAnswer.setModel(ChoiceModel(self.question[4]))
+                self.ui.listAnswer.setModel(ChoiceModel(self.questionChoices()))
+
+    def questionChoices(self):
+        "The sorted choices of the question, sampled once per question."
+        if self.choices[0] is not self.question:
+            self.choices = (self.question,
+                            self.choiceindex.choices(self.question))
+        return self.choices[1]
 
     def endQuestion(self, fast=False):
         if self.ui.radioFreeText.isChecked():
-            answer = [ normalise(x)
-                       for x in self.ui.textAnswer.toPlainText().split('\n')
-                       if x.strip() != '']
-        else:
-            answer = [ normalise(x)
-                       for x in self.ui.listAnswer.model().selectedItems() ]
-        answer.sort()
-        correctanswers = [ normalise(x) for x in self.question[3] ]
-        correctanswers.sort()
-
-        ok = True
-        if len(answer) == len(correctanswers):
-            for i in range(0,len(answer)):
-                # collapse tokens so that "10 MBPS" == "10MBPS"
-                if "".join(answer[i]) != "".join(correctanswers[i]):
-                    ok = False
-                    break
+            answer = self.ui.textAnswer.toPlainText().split('\n')
         else:
-            ok = False
+            answer = self.ui.listAnswer.model().selectedItems()
+        (ok, answer, correctanswers, nearmiss) = self.grader.grade(
+            self.question, answer)
 
         msg = QMessageBox()
         msg.setStandardButtons(QMessageBox.Ok)
         msg.setIcon(QMessageBox.Information)
         msg.setWindowTitle("Question Result")
         msg.setText("Well Done!\n\nSkip this dialog by using CTRL+Return.")
+        if nearmiss:
+            msg.setText(
+                "Nearly, accepted as a near miss. The correct answer is: \n"
+                "{}".format("\n".join(self.question[3])))
         if not ok:
             msg.setStandardButtons(QMessageBox.Ok | QMessageBox.Ignore)
             msg.setIcon(QMessageBox.Critical)
@@ -189,16 +132,16 @@ class QuizDialog(QDialog):
                 "Select Ignore to not record incorrect answer."
                 "".format("\n".join(self.question[3])))
             self.incorrect += 1
-        else:
+        elif not nearmiss:
             answer = correctanswers[:]
 
-        if (not ok or not fast) and msg.exec() == QMessageBox.Ignore:
+        if (not ok or nearmiss or not fast) and \
+           msg.exec() == QMessageBox.Ignore:
             answer = correctanswers[:]
             self.incorrect -= 1
 
-        answer = [ " ".join(x) for x in answer ]
-        correctanswers = [ " ".join(x) for x in correctanswers ]
-        self.results.append(self.question + (correctanswers,answer,ok))
+        self.results.append(self.question +
+                            (correctanswers,answer,ok,nearmiss))
 
         if len(self.questions) > 0:
             self.question = self.questions.pop()
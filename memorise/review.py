@@ -18,6 +18,7 @@ from PyQt5.QtWidgets import QDialog, QHeaderView, QMenu
 from PyQt5.QtCore import QSortFilterProxyModel
 from functools import partial
 from .questionReview import QuestionReviewDialog
+from .datastore import showloading
 
 class ReviewDialog(QDialog):
     def __init__(self, name, datastore):
@@ -32,7 +33,9 @@ class ReviewDialog(QDialog):
 
         self.ui.tests.header().setSectionResizeMode(
             QHeaderView.ResizeToContents)
-        self.ui.tests.setModel(self.datastore.loadreviewtests(name))
+        tests = self.datastore.loadreviewtests(name)
+        showloading(self.ui.tests, tests)
+        self.ui.tests.setModel(tests)
         self.ui.tests.selectionModel().selectionChanged.connect(self.select)
         self.ui.tests.hideColumn(0)
 
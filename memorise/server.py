@@ -0,0 +1,314 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""HTTP/JSON quiz server, so that quizzes can be taken from a browser
+or script while sharing one database. It is started with the --serve
+option of pymemorise and has the following endpoints:
+
+    GET  /sets                    memory sets and their statistics
+    POST /quiz                    {"name": set} starts a quiz, add
+                                  "session": n to only ask up to n
+                                  questions that are due for review
+    POST /quiz/<id>/answer        {"question": n, "answer": [values]}
+    POST /quiz/<id>/results       saves the answers given to the quiz
+
+Queries run on a pool of read connections, while results are written
+one at a time by a single writer connection.
+
+"""
+
+from .storage import Storage
+from .engine import ChoiceIndex, loadquiz
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import collections
+import itertools
+import json
+import queue
+import sys
+
+# Largest request body accepted.
+maxbody = 1048576
+
+# Number of unfinished quizzes kept, the oldest are discarded first.
+maxquizzes = 10000
+
+# Number of recent tests the statistics of /sets are taken over.
+window = 5
+
+reasons = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Pool:
+    def __init__(self, dbase, profile='safe', readers=4, querylog=None):
+        """Connections to dbase. Reads run on any of readers connections,
+writes are serialised on a single connection.
+
+        """
+        self.writer = Storage(dbase, profile, querylog)
+        self.readers = [Storage(dbase, profile, querylog)
+                        for i in range(readers)]
+        self.idle = queue.Queue()
+
+    def __enter__(self):
+        ## The writer is opened first so that it initialises the database
+        self.writer.__enter__()
+        for storage in self.readers:
+            storage.__enter__()
+            self.idle.put(storage)
+        self.readexecutor = ThreadPoolExecutor(len(self.readers))
+        self.writeexecutor = ThreadPoolExecutor(1)
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.readexecutor.shutdown()
+        self.writeexecutor.shutdown()
+        for storage in self.readers + [self.writer]:
+            storage.__exit__(type, value, tb)
+
+    def _read(self, fn):
+        storage = self.idle.get()
+        try:
+            return fn(storage)
+        finally:
+            self.idle.put(storage)
+
+    async def read(self, fn):
+        "Run fn(storage) on an idle read connection."
+        return await asyncio.get_running_loop().run_in_executor(
+            self.readexecutor, self._read, fn)
+
+    async def write(self, fn):
+        "Run fn(storage) on the writer once earlier writes have finished."
+        return await asyncio.get_running_loop().run_in_executor(
+            self.writeexecutor, fn, self.writer)
+
+class QuizServer:
+    def __init__(self, pool, distance=0, distractors=10):
+        """Serves quizzes from pool, accepting answers within distance edits
+of the correct answers as near misses. Each question offers its correct
+answers and distractors other choices, see engine.ChoiceIndex.
+
+        """
+        self.pool = pool
+        self.distance = distance
+        self.distractors = distractors
+        self.quizzes = collections.OrderedDict()
+        self.ids = itertools.count(1)
+
+    async def handle(self, reader, writer):
+        "Serve the requests of a connection until it is closed."
+        try:
+            while True:
+                try:
+                    request = await readrequest(reader)
+                    if request == None:
+                        break
+                    (method, path, headers, body) = request
+                    (status, result) = await self.dispatch(method, path, body)
+                    close = headers.get("connection", "").lower() == "close"
+                except HTTPError as e:
+                    (status, result) = (e.status, {"error": str(e)})
+                    close = True
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    print("Error: Request failed ({})".format(e),
+                          file=sys.stderr)
+                    (status, result) = (500, {"error": "Request failed"})
+                    close = True
+                writeresponse(writer, status, result, close)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if parts == ["sets"]:
+            expect(method, "GET")
+            return (200, await self.sets())
+        if parts == ["quiz"]:
+            expect(method, "POST")
+            body = parsebody(body)
+            session = None
+            if body.get("session") != None:
+                session = field(body, "session", int)
+                if session < 1:
+                    raise HTTPError(400, "Expected a positive session")
+            return (200, await self.start(field(body, "name"), session))
+        if len(parts) == 3 and parts[0] == "quiz":
+            expect(method, "POST")
+            try:
+                quiz = self.quizzes[int(parts[1])]
+            except (ValueError, KeyError):
+                raise HTTPError(404, "No quiz {}".format(parts[1]))
+            if parts[2] == "answer":
+                return (200, self.answer(quiz, parsebody(body)))
+            if parts[2] == "results":
+                return (200, await self.save(int(parts[1]), quiz))
+        raise HTTPError(404, "No such endpoint {}".format(path))
+
+    async def sets(self):
+        result = await self.pool.read(
+            lambda storage: storage.roottable(window))
+        if result == None:
+            raise HTTPError(500, "Unable to list memory sets")
+        (headings, rows, windows) = result
+        return [dict(zip(headings, row + windows[row[0]][window - 1]))
+                for row in rows]
+
+    async def start(self, name, session=None):
+        result = await self.pool.read(
+            lambda storage: loadquiz(storage, name, session))
+        if result == None:
+            raise HTTPError(404, "No memory set {}".format(name))
+        (grader, questions) = result
+        grader.distance = self.distance
+        quizid = next(self.ids)
+        self.quizzes[quizid] = {"name": name,
+                                "grader": grader,
+                                "questions": questions,
+                                "results": {}}
+        while len(self.quizzes) > maxquizzes:
+            self.quizzes.popitem(last=False)
+        choices = ChoiceIndex(self.distractors)
+        return {"quiz": quizid,
+                "name": name,
+                "questions": [{"question": i,
+                               "column1": q[0],
+                               "value1": q[1],
+                               "column2": q[2],
+                               "choices": choices.choices(q)}
+                              for (i, q) in enumerate(questions)]}
+
+    def answer(self, quiz, body):
+        i = field(body, "question", int)
+        answers = field(body, "answer", list)
+        if i < 0 or i >= len(quiz["questions"]):
+            raise HTTPError(404, "No question {}".format(i))
+        question = quiz["questions"][i]
+        (ok, answer, correctanswers, nearmiss) = quiz["grader"].grade(
+            question, [str(a) for a in answers])
+        if ok and not nearmiss:
+            answer = correctanswers[:]
+        quiz["results"][i] = question + (correctanswers, answer, ok, nearmiss)
+        return {"correct": ok, "nearmiss": nearmiss, "answer": question[3]}
+
+    async def save(self, quizid, quiz):
+        results = [quiz["results"][i] for i in sorted(quiz["results"])]
+        if not results:
+            raise HTTPError(400, "No questions have been answered")
+        ## Close the quiz while it is written so it is only saved once
+        self.quizzes.pop(quizid, None)
+        saved = False
+        try:
+            saved = await self.pool.write(
+                lambda storage: storage.saveresults(quiz["name"], results))
+        finally:
+            if not saved:
+                self.quizzes[quizid] = quiz
+        if not saved:
+            raise HTTPError(500, "Unable to save results")
+        return {"saved": len(results),
+                "incorrect": sum(1 for r in results if not r[7])}
+
+def expect(method, allowed):
+    if method != allowed:
+        raise HTTPError(405, "Use {}".format(allowed))
+
+def parsebody(body):
+    try:
+        result = json.loads(body.decode("utf-8") or "{}")
+    except ValueError as e:
+        raise HTTPError(400, "Invalid JSON: {}".format(e))
+    if not isinstance(result, dict):
+        raise HTTPError(400, "Expected a JSON object")
+    return result
+
+def field(body, name, kind=str):
+    value = body.get(name)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise HTTPError(400, "Expected {} {}".format(kind.__name__, name))
+    return value
+
+async def readrequest(reader):
+    """Returns the method, path, headers and body of the next request on
+reader, or None if the connection was closed.
+
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        (method, path, version) = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Invalid request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        (key, _, value) = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > maxbody:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length > 0 else b""
+    if version == "HTTP/1.0" and \
+       headers.get("connection", "").lower() != "keep-alive":
+        headers["connection"] = "close"
+    return (method, path, headers, body)
+
+def writeresponse(writer, status, result, close=False):
+    body = json.dumps(result).encode("utf-8")
+    writer.write("HTTP/1.1 {} {}\r\n"
+                 "Content-Type: application/json\r\n"
+                 "Content-Length: {}\r\n"
+                 "Connection: {}\r\n"
+                 "\r\n".format(status,
+                               reasons.get(status, ""),
+                               len(body),
+                               "close" if close else "keep-alive"
+                               ).encode("latin-1"))
+    writer.write(body)
+
+async def run(pool, host, port, distance=0, distractors=10):
+    server = QuizServer(pool, distance, distractors)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print("Serving quizzes on http://{}:{}/".format(host, port))
+    async with listener:
+        await listener.serve_forever()
+
+def serve(dbase, profile='safe', host='127.0.0.1', port=8080, readers=4,
+          querylog=None, distance=0, distractors=10):
+    "Serve quizzes from dbase until interrupted."
+    with Pool(dbase, profile, readers, querylog) as pool:
+        try:
+            asyncio.run(run(pool, host, port, distance, distractors))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,248 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Reports across the databases of many learners. The databases are
+attached read only to a single connection in batches, within the limit
+SQLite places on attached databases, and queried together without
+copying their data:
+
+    python3 -m memorise.shards leaderboard alice.db bob.db ...
+    python3 -m memorise.shards hardest --name Acronyms */pymem.db
+
+"""
+
+from .export import writecsv
+from .storage import migrations
+from pathlib import Path
+import argparse
+import sqlite3
+import sys
+
+# Oldest database version with the statistics used by the reports.
+minimumversion = 5
+
+# Tests of each attached database, {shards} is replaced with the
+# UNION ALL of the teststats of each database in the batch.
+leaderboardquery = """
+SELECT S.Shard,
+COUNT(*) AS Tests,
+COALESCE(SUM(S.Wrong == 0), 0) AS `Perfect Runs`,
+COALESCE(SUM(S.Correct), 0) AS `Correct`,
+COALESCE(SUM(S.Wrong), 0) AS `Wrong`
+FROM ({shards}) AS S
+WHERE :name IS NULL OR S.`Memory Set` == :name
+GROUP BY S.Shard
+"""
+
+# Totals of each question over the attached databases, {shards} is
+# replaced with the UNION ALL of their questionstats.
+hardestquery = """
+SELECT Q.Fingerprint, Q.`Memory Set`, Q.Column1, Q.Value1, Q.Column2,
+Q.CorrectAnswer,
+SUM(Q.Asked) AS Asked,
+SUM(Q.Failed) AS Failed,
+COUNT(*) AS Learners
+FROM ({shards}) AS Q
+WHERE :name IS NULL OR Q.`Memory Set` == :name
+GROUP BY Q.Fingerprint
+"""
+
+def attachlimit(db):
+    "Returns the number of databases that can be attached to db."
+    if hasattr(db, "getlimit"):
+        return db.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    ## The compile time default of SQLite
+    return 10
+
+class Shards:
+    def __init__(self, paths):
+        """Reports over the databases at paths. Each is named after its file,
+or its full path when file names are not unique.
+
+        """
+        self.paths = [Path(p) for p in paths]
+        stems = [p.stem for p in self.paths]
+        self.users = [str(p) if stems.count(p.stem) > 1 else p.stem
+                      for p in self.paths]
+        self.db = None
+
+    def __enter__(self):
+        self.db = sqlite3.connect(":memory:", uri=True)
+        self.batchsize = attachlimit(self.db)
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.db.close()
+        self.db = None
+
+    def batches(self):
+        """Attach the databases a batch at a time, yielding a list of the
+index and schema name of each database in the batch. Databases that
+can not be opened or are too old for the reports are skipped with a
+warning.
+
+        """
+        for start in range(0, len(self.paths), self.batchsize):
+            attached = []
+            for i in range(start, min(start + self.batchsize,
+                                      len(self.paths))):
+                schema = "shard{}".format(i - start)
+                if self._attach(i, schema):
+                    attached.append((i, schema))
+            try:
+                if attached:
+                    yield attached
+            finally:
+                for (i, schema) in attached:
+                    self.db.execute("DETACH DATABASE {}".format(schema))
+
+    def _attach(self, i, schema):
+        path = self.paths[i]
+        if not path.is_file():
+            print("Warning: Skipping {}, no such file".format(path),
+                  file=sys.stderr)
+            return False
+        try:
+            self.db.execute("ATTACH DATABASE ? AS {}".format(schema),
+                            (path.resolve().as_uri() + "?mode=ro",))
+        except sqlite3.Error as e:
+            print("Warning: Skipping {}, unable to open ({})".format(path, e),
+                  file=sys.stderr)
+            return False
+        try:
+            version = self.db.execute(
+                "PRAGMA {}.user_version".format(schema)).fetchone()[0]
+        except sqlite3.Error as e:
+            print("Warning: Skipping {}, not a database ({})".format(path, e),
+                  file=sys.stderr)
+            version = None
+        if version == None or version < minimumversion:
+            if version != None:
+                print("Warning: Skipping {}, database version {} is older "
+                      "than {}. Open it with pymemorise to upgrade it."
+                      "".format(path, version, minimumversion),
+                      file=sys.stderr)
+            self.db.execute("DETACH DATABASE {}".format(schema))
+            return False
+        if version > len(migrations):
+            print("Warning: {} is version {} which is newer than "
+                  "supported version {}".format(path, version,
+                                                len(migrations)),
+                  file=sys.stderr)
+        return True
+
+    def _query(self, sql, table, attached, params):
+        shards = " UNION ALL ".join(
+            "SELECT {} AS Shard, T.* FROM {}.`{}` AS T".format(i, schema,
+                                                               table)
+            for (i, schema) in attached)
+        try:
+            return self.db.execute(sql.format(shards=shards),
+                                   params).fetchall()
+        except sqlite3.Error as e:
+            print("Error: Unable to query {} ({})".format(table, e),
+                  file=sys.stderr)
+            return None
+
+    def leaderboard(self, name=None):
+        """Returns the headings and rows of the tests taken by each learner,
+optionally only of memory set name, best accuracy first.
+
+        """
+        totals = {}
+        for attached in self.batches():
+            rows = self._query(leaderboardquery, "teststats", attached,
+                               {"name": name})
+            if rows == None:
+                return None
+            for (i, *row) in rows:
+                totals[i] = row
+            for (i, schema) in attached:
+                totals.setdefault(i, [0, 0, 0, 0])
+        rows = []
+        for (i, (tests, perfect, correct, wrong)) in totals.items():
+            asked = correct + wrong
+            rows.append((self.users[i], tests, perfect, correct, wrong,
+                         round(correct / asked, 4) if asked else None))
+        rows.sort(key=lambda r: (r[5] or 0, r[3]), reverse=True)
+        return (["User", "Tests", "Perfect Runs", "Correct", "Wrong",
+                 "Accuracy"], rows)
+
+    def hardest(self, name=None, count=20, minimum=5):
+        """Returns the headings and rows of the count questions failed most
+often across all learners, optionally only of memory set name.
+Questions asked fewer than minimum times are ignored.
+
+        """
+        totals = {}
+        for attached in self.batches():
+            rows = self._query(hardestquery, "questionstats", attached,
+                               {"name": name})
+            if rows == None:
+                return None
+            ## Merge with the totals of earlier batches
+            for (fingerprint, *question, asked, failed, learners) in rows:
+                total = totals.get(fingerprint)
+                if total:
+                    total[1] += asked
+                    total[2] += failed
+                    total[3] += learners
+                else:
+                    totals[fingerprint] = [question, asked, failed, learners]
+        rows = [tuple(question) + (asked, failed, learners,
+                                   round(failed / asked, 4))
+                for (question, asked, failed, learners) in totals.values()
+                if asked >= max(1, minimum)]
+        rows.sort(key=lambda r: (r[8], r[6]), reverse=True)
+        return (["Memory Set", "Question Column", "Question Value",
+                 "Answer Column", "Correct Answer", "Asked", "Failed",
+                 "Learners", "Failure Rate"], rows[:count])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m memorise.shards",
+        description="Reports across the databases of many learners, "
+        "written as CSV.")
+    parser.add_argument("report", choices=["leaderboard", "hardest"],
+                        help="leaderboard of learners or the hardest "
+                        "questions")
+    parser.add_argument("databases", nargs="+", metavar="database",
+                        help="database of a learner, named after its file")
+    parser.add_argument("--name",
+                        help="only report on this memory set")
+    parser.add_argument("--count", type=int, default=20,
+                        help="number of hardest questions")
+    parser.add_argument("--minimum", type=int, default=5,
+                        help="ignore questions asked fewer times")
+    parser.add_argument("--output", "-o",
+                        help="write the report to file instead of stdout")
+    args = parser.parse_args(argv)
+
+    with Shards(args.databases) as shards:
+        if args.report == "leaderboard":
+            result = shards.leaderboard(args.name)
+        else:
+            result = shards.hardest(args.name, args.count, args.minimum)
+    if result == None:
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writecsv(f, *result)
+    else:
+        writecsv(sys.stdout, *result)
+
+if __name__ == "__main__":
+    main()
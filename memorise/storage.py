@@ -0,0 +1,1523 @@
+# Copyright (C) 2018 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Storage core for pyMemorise built on the standard sqlite3 module.
+
+It has no dependency on Qt so that it can be used from scripts, worker
+threads and other processes. Queries return a tuple of the column names
+and a list of row tuples. Errors and warnings are reported on standard
+error, so they do not mix with the output of scripts.
+
+"""
+
+import hashlib
+import itertools
+import sqlite3
+import sys
+import time
+
+# Oldest SQLite library supported, the first with both upserts (3.24) and
+# window functions (3.25).
+minimumsqlite = (3, 25, 0)
+
+def fingerprint(name, column1, value1, column2, correctanswer):
+    """Stable 64 bit identifier of a question: the memory set, the
+question column and value, the answer column and the correct answer.
+Also available in SQL as fingerprint().
+
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update("\x1f".join([name, column1, value1, column2, correctanswer])
+             .encode("utf-8"))
+    return int.from_bytes(h.digest(), "big", signed=True)
+
+dbschema = ["""
+CREATE TABLE `memtableroot` (
+        `Memory Set`    text NOT NULL,
+        `Created`       INTEGER NOT NULL DEFAULT 0,
+        `Archived`      TEXT,
+        `Revision`      INTEGER NOT NULL,
+        PRIMARY KEY(`Memory Set`)
+)""","""
+CREATE TABLE `tests` (
+        `TestID`        INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+        `Memory Set`    TEXT NOT NULL,
+        `Revision`      INTEGER NOT NULL,
+        `TimeStamp`     INTEGER NOT NULL
+)""","""
+CREATE TABLE `answers` (
+        `TestID`        INTEGER NOT NULL,
+        `QuestionID`    INTEGER NOT NULL,
+        `Column1`       TEXT NOT NULL,
+        `Value1`        TEXT NOT NULL,
+        `Column2`       TEXT NOT NULL,
+        `UserAnswer`    TEXT NOT NULL,
+        `CorrectAnswer` TEXT NOT NULL,
+        PRIMARY KEY(`TestID`,`QuestionID`,`Column1`,`Value1`)
+)""","""
+CREATE VIEW `results` as
+  SELECT t.`Memory Set`,
+         a.TestID,
+         a.Column1,
+         a.Value1,
+         a.Column2,
+         a.UserAnswer,
+         a.CorrectAnswer
+  FROM answers AS a
+  LEFT JOIN tests AS t ON a.TestID == t.TestID
+"""
+]
+
+# Summary tables maintained alongside tests/answers so that the main
+# window does not need to rescan the full history. The trailing
+# statements rebuild the summaries from the history and are used when
+# upgrading a database that predates these tables.
+statsschema = ["""
+CREATE TABLE IF NOT EXISTS `memtablestats` (
+        `Memory Set`    TEXT NOT NULL,
+        `Last Used`     INTEGER,
+        `Times Used`    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(`Memory Set`)
+)""","""
+CREATE TABLE IF NOT EXISTS `teststats` (
+        `TestID`        INTEGER NOT NULL PRIMARY KEY,
+        `Memory Set`    TEXT NOT NULL,
+        `TimeStamp`     INTEGER NOT NULL,
+        `Correct`       INTEGER NOT NULL DEFAULT 0,
+        `Wrong`         INTEGER NOT NULL DEFAULT 0
+)""","""
+CREATE INDEX IF NOT EXISTS `teststats_memoryset`
+  ON `teststats` (`Memory Set`, `TestID`)
+""","""
+DELETE FROM `teststats`
+""","""
+INSERT INTO `teststats`
+  SELECT T.TestID, T.`Memory Set`, T.TimeStamp,
+         COALESCE(SUM(A.UserAnswer == A.CorrectAnswer), 0),
+         COALESCE(SUM(A.UserAnswer != A.CorrectAnswer), 0)
+  FROM tests AS T
+  LEFT JOIN answers AS A ON A.TestID == T.TestID
+  GROUP BY T.TestID
+""","""
+DELETE FROM `memtablestats`
+""","""
+INSERT INTO `memtablestats`
+  SELECT r.`Memory Set`,
+  (
+    SELECT T.TimeStamp FROM teststats AS T
+    WHERE T.`Memory Set` == r.`Memory Set`
+    ORDER BY T.TestID DESC LIMIT 1
+  ),
+  (
+    SELECT COUNT(T.TestID) FROM teststats AS T
+    WHERE T.`Memory Set` == r.`Memory Set`
+  )
+  FROM memtableroot AS r
+"""
+]
+
+# Schema migrations, applied in order to bring a database up to date.
+# The database records how many have been applied in PRAGMA
+# user_version, so a database at version n has migrations[:n] applied.
+# Each migration is run in its own transaction and is a list of SQL
+# statements or callables taking the Storage.
+migrations = [
+    statsschema,
+    ["""
+CREATE INDEX IF NOT EXISTS `tests_memoryset_timestamp`
+  ON `tests` (`Memory Set`, `TimeStamp`)
+""","""
+CREATE INDEX IF NOT EXISTS `answers_question`
+  ON `answers` (`Column1`, `Value1`, `Column2`, `CorrectAnswer`, `UserAnswer`)
+"""],
+    ["""
+CREATE TABLE IF NOT EXISTS `revisions` (
+        `Memory Set`    TEXT NOT NULL,
+        `Revision`      INTEGER NOT NULL,
+        `Base`          INTEGER NOT NULL,
+        PRIMARY KEY(`Memory Set`, `Revision`)
+)""",
+     lambda storage: storage._upgraderevisions()],
+    ["""
+CREATE TABLE IF NOT EXISTS `questionstats` (
+        `Memory Set`    TEXT NOT NULL,
+        `Column1`       TEXT NOT NULL,
+        `Value1`        TEXT NOT NULL,
+        `Column2`       TEXT NOT NULL,
+        `CorrectAnswer` TEXT NOT NULL,
+        `Asked`         INTEGER NOT NULL DEFAULT 0,
+        `Failed`        INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(`Memory Set`, `Column1`, `Value1`, `Column2`,
+                    `CorrectAnswer`)
+)""","""
+DELETE FROM `questionstats`
+""","""
+INSERT INTO `questionstats`
+  SELECT T.`Memory Set`, A.Column1, A.Value1, A.Column2, A.CorrectAnswer,
+         COUNT(*), SUM(A.UserAnswer != A.CorrectAnswer)
+  FROM answers AS A
+  INNER JOIN tests AS T ON T.TestID == A.TestID
+  GROUP BY T.`Memory Set`, A.Column1, A.Value1, A.Column2, A.CorrectAnswer
+"""],
+    ["""
+ALTER TABLE `answers` ADD COLUMN `Fingerprint` INTEGER
+""","""
+UPDATE `answers` SET `Fingerprint` = (
+  SELECT fingerprint(T.`Memory Set`, answers.Column1, answers.Value1,
+                     answers.Column2, answers.CorrectAnswer)
+  FROM tests AS T WHERE T.TestID == answers.TestID)
+""","""
+CREATE INDEX `answers_fingerprint` ON `answers` (`Fingerprint`, `TestID`)
+""","""
+DROP INDEX IF EXISTS `answers_question`
+""","""
+CREATE TABLE `questionstats_new` (
+        `Fingerprint`   INTEGER NOT NULL PRIMARY KEY,
+        `Memory Set`    TEXT NOT NULL,
+        `Column1`       TEXT NOT NULL,
+        `Value1`        TEXT NOT NULL,
+        `Column2`       TEXT NOT NULL,
+        `CorrectAnswer` TEXT NOT NULL,
+        `Asked`         INTEGER NOT NULL DEFAULT 0,
+        `Failed`        INTEGER NOT NULL DEFAULT 0
+)""","""
+INSERT INTO `questionstats_new`
+  SELECT fingerprint(`Memory Set`, Column1, Value1, Column2, CorrectAnswer),
+         `Memory Set`, Column1, Value1, Column2, CorrectAnswer, Asked, Failed
+  FROM `questionstats`
+""","""
+DROP TABLE `questionstats`
+""","""
+ALTER TABLE `questionstats_new` RENAME TO `questionstats`
+""","""
+CREATE INDEX `questionstats_memoryset` ON `questionstats` (`Memory Set`)
+"""],
+    ["""
+ALTER TABLE `tests` ADD COLUMN `Compacted` INTEGER NOT NULL DEFAULT 0
+""","""
+CREATE TABLE IF NOT EXISTS `dailystats` (
+        `Fingerprint`   INTEGER NOT NULL,
+        `Day`           TEXT NOT NULL,
+        `Memory Set`    TEXT NOT NULL,
+        `Asked`         INTEGER NOT NULL DEFAULT 0,
+        `Failed`        INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (`Fingerprint`, `Day`)
+)""","""
+CREATE INDEX IF NOT EXISTS `dailystats_memoryset`
+  ON `dailystats` (`Memory Set`, `Day`)
+"""],
+    ["""
+CREATE TABLE IF NOT EXISTS `schedule` (
+        `Fingerprint`   INTEGER NOT NULL PRIMARY KEY,
+        `Memory Set`    TEXT NOT NULL,
+        `Due`           REAL NOT NULL,
+        `Reviewed`      REAL NOT NULL,
+        `Ease`          REAL NOT NULL,
+        `Streak`        INTEGER NOT NULL DEFAULT 0,
+        `Interval`      REAL NOT NULL DEFAULT 0
+)""","""
+CREATE INDEX IF NOT EXISTS `schedule_due`
+  ON `schedule` (`Memory Set`, `Due`, `Ease`)
+"""],
+    ["""
+ALTER TABLE `answers` ADD COLUMN `NearMiss` INTEGER NOT NULL DEFAULT 0
+"""],
+    ["""
+DELETE FROM `schedule`
+""",
+     lambda storage: storage._replayschedule()],
+    ["""
+CREATE INDEX IF NOT EXISTS `schedule_ease`
+  ON `schedule` (`Memory Set`, `Ease`, `Due`)
+"""],
+]
+
+# Spaced repetition schedule of each question, a simplified SM-2. A
+# correct answer, or a near miss, to a question that is due grows the
+# interval until it is next due from 1 to 6 days and then by its ease,
+# and raises the ease by easebonus. A correct answer before the question
+# is due only moves its due date on by the same interval. A wrong answer
+# makes the question due again at once and lowers its ease by
+# easepenalty, but never below minimumease. Times are Julian days.
+initialease = 2.5
+minimumease = 1.3
+easebonus = 0.1
+easepenalty = 0.2
+
+scheduleupdate = """
+INSERT INTO `schedule`
+SELECT A.Fingerprint, T.`Memory Set`,
+       JULIANDAY(T.TimeStamp) + (A.UserAnswer == A.CorrectAnswer OR
+                                 A.NearMiss),
+       JULIANDAY(T.TimeStamp),
+       MAX(:minimum, :initial + CASE WHEN A.UserAnswer == A.CorrectAnswer OR
+                                          A.NearMiss
+                                THEN :bonus ELSE -:penalty END),
+       A.UserAnswer == A.CorrectAnswer OR A.NearMiss,
+       A.UserAnswer == A.CorrectAnswer OR A.NearMiss
+FROM answers AS A
+INNER JOIN tests AS T ON T.TestID == A.TestID
+WHERE A.TestID == :id
+ON CONFLICT(Fingerprint) DO UPDATE
+SET Interval = CASE WHEN excluded.Streak == 0 THEN 0
+                    WHEN excluded.Reviewed < Due THEN Interval
+                    WHEN Streak == 0 THEN 1
+                    WHEN Streak == 1 THEN 6
+                    ELSE Interval * Ease END,
+    Due = excluded.Reviewed + CASE WHEN excluded.Streak == 0 THEN 0
+                                   WHEN excluded.Reviewed < Due THEN Interval
+                                   WHEN Streak == 0 THEN 1
+                                   WHEN Streak == 1 THEN 6
+                                   ELSE Interval * Ease END,
+    Reviewed = excluded.Reviewed,
+    Ease = CASE WHEN excluded.Streak == 0 THEN MAX(:minimum, Ease - :penalty)
+                WHEN excluded.Reviewed < Due THEN Ease
+                ELSE Ease + :bonus END,
+    Streak = CASE WHEN excluded.Streak == 0 THEN 0
+                  WHEN excluded.Reviewed < Due THEN Streak
+                  ELSE Streak + 1 END
+"""
+
+# Questions of a memory set that are due, most overdue and then weakest
+# first. Only reads the schedule_due index up to :limit rows.
+schedulequery_due = """
+SELECT S.Fingerprint
+FROM schedule AS S
+WHERE S.`Memory Set` == :name AND S.Due <= JULIANDAY(:now)
+ORDER BY S.Due, S.Ease
+LIMIT :limit
+"""
+
+schedulequery_scheduled = """
+SELECT S.Fingerprint
+FROM schedule AS S
+WHERE S.`Memory Set` == :name
+"""
+
+# Questions of a memory set that are not due yet, weakest and then
+# soonest due first. Only reads the schedule_ease index up to :limit
+# rows.
+schedulequery_weakest = """
+SELECT S.Fingerprint
+FROM schedule AS S
+WHERE S.`Memory Set` == :name AND S.Due > JULIANDAY(:now)
+ORDER BY S.Ease, S.Due
+LIMIT :limit
+"""
+
+# Which of a batch of fingerprints are not in the schedule, each is
+# looked up by its primary key. See Storage.unscheduled.
+schedulequery_unscheduled = [
+    """
+CREATE TEMP TABLE IF NOT EXISTS `unscheduled` (
+        `Fingerprint`   INTEGER PRIMARY KEY
+)""","""
+DELETE FROM temp.`unscheduled`
+""","""
+INSERT OR IGNORE INTO temp.`unscheduled` VALUES (?)
+""","""
+SELECT U.Fingerprint
+FROM temp.`unscheduled` AS U
+WHERE NOT EXISTS (
+  SELECT 1 FROM schedule AS S WHERE S.Fingerprint == U.Fingerprint
+)
+"""]
+
+# Compaction of the test history, see Storage.compact. Each batch
+# selects the oldest tests beyond the last :keep of their memory set,
+# folds their answers into dailystats and deletes them.
+compactbatch = [
+    """
+CREATE TEMP TABLE IF NOT EXISTS `compactbatch` (
+        `TestID`        INTEGER PRIMARY KEY
+)""","""
+DELETE FROM temp.`compactbatch`
+""","""
+INSERT INTO temp.`compactbatch`
+SELECT C.TestID FROM
+(
+  SELECT T.TestID, T.Compacted,
+  ROW_NUMBER() OVER (PARTITION BY T.`Memory Set` ORDER BY T.TestID DESC) AS N
+  FROM tests AS T
+) AS C
+WHERE C.N > :keep AND C.Compacted == 0
+ORDER BY C.TestID
+LIMIT :batch
+""","""
+INSERT INTO `dailystats`
+SELECT A.Fingerprint, DATE(T.TimeStamp), T.`Memory Set`,
+       COUNT(*), SUM(A.UserAnswer != A.CorrectAnswer AND NOT A.NearMiss)
+FROM answers AS A
+INNER JOIN tests AS T ON T.TestID == A.TestID
+WHERE A.TestID IN (SELECT TestID FROM temp.`compactbatch`)
+GROUP BY A.Fingerprint, DATE(T.TimeStamp)
+ON CONFLICT(Fingerprint, Day) DO UPDATE
+SET Asked = Asked + excluded.Asked, Failed = Failed + excluded.Failed
+""","""
+DELETE FROM answers
+WHERE TestID IN (SELECT TestID FROM temp.`compactbatch`)
+""","""
+UPDATE tests SET Compacted = 1
+WHERE TestID IN (SELECT TestID FROM temp.`compactbatch`)
+""",
+]
+
+compactquery_count = """
+SELECT COUNT(*) FROM
+(
+  SELECT T.Compacted,
+  ROW_NUMBER() OVER (PARTITION BY T.`Memory Set` ORDER BY T.TestID DESC) AS N
+  FROM tests AS T
+) AS C
+WHERE C.N > :keep AND C.Compacted == 0
+"""
+
+# Revisions of a memory set are stored as deltas against a base
+# snapshot. When the delta of a revision has more rows than this
+# fraction of the table, a new base snapshot is taken instead so that
+# reconstructing old revisions stays cheap.
+rebaseratio = 0.25
+
+# Connection tuning profiles, applied as pragmas when the database is
+# opened. The "safe" profile uses the SQLite defaults. The "fast"
+# profile uses a write ahead log with relaxed syncing which greatly
+# reduces the number of fsyncs, however WAL mode does not work on
+# network file systems.
+dbprofiles = {
+    "safe": [
+        ("journal_mode", "DELETE"),
+        ("synchronous", "FULL"),
+        ("cache_size", "-2000"),
+        ("mmap_size", "0"),
+        ("temp_store", "DEFAULT"),
+    ],
+    "fast": [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("cache_size", "-32000"),
+        ("mmap_size", "268435456"),
+        ("temp_store", "MEMORY"),
+    ],
+}
+
+mainwindowquery = """
+SELECT r.`Memory Set`,
+s.`Last Used`,
+COALESCE(s.`Times Used`, 0) AS `Times Used`,
+r.`Created`,
+r.`Revision`
+FROM `memtableroot` AS r
+LEFT JOIN `memtablestats` AS s ON s.`Memory Set` == r.`Memory Set`
+ORDER BY r.`Archived`
+"""
+
+# Statistics of the last N tests of each memory set, for every N up to
+# :limit. Row N of a memory set is the running total over its N most
+# recent tests.
+mainwindowquery_windows = """
+SELECT W.`Memory Set`,
+W.N,
+SUM(W.`Wrong` == 0) OVER win AS `Perfect Runs in Window`,
+SUM(W.`Correct`) OVER win AS `Correct Answers in Window`,
+SUM(W.`Wrong`) OVER win AS `Incorrect Answers in Window`
+FROM
+(
+  SELECT T.`Memory Set`, T.`Correct`, T.`Wrong`,
+  ROW_NUMBER() OVER (PARTITION BY T.`Memory Set` ORDER BY T.`TestID` DESC) AS N
+  FROM `teststats` AS T
+) AS W
+WHERE W.N <= :limit
+WINDOW win AS (PARTITION BY W.`Memory Set` ORDER BY W.N)
+ORDER BY W.`Memory Set`, W.N
+"""
+
+reviewdialogquery_tests = """
+SELECT T.TestID, T.Revision, T.TimeStamp as `Time`,
+COALESCE(S.Correct, 0) AS `Correct`,
+COALESCE(S.Wrong, 0) AS `Wrong`
+FROM tests as T
+LEFT JOIN teststats AS S ON S.TestID == T.TestID
+WHERE T.`Memory Set` == :name AND
+(:after IS NULL OR (T.TimeStamp, T.TestID) < (:time, :after))
+ORDER BY T.TimeStamp DESC, T.TestID DESC
+LIMIT :limit
+"""
+
+reviewdialogquery_answers = """
+SELECT
+A.TestID,
+A.QuestionID,
+A.Column1 AS `Question Column`,
+A.Value1 AS `Question Value`,
+A.Column2 AS `Answer Column`,
+(
+  CASE WHEN A.NearMiss THEN 'NEAR MISS'
+  WHEN A.CorrectAnswer != A.UserAnswer THEN 'FAIL'
+  ELSE 'PASS' END
+) AS Result,
+COALESCE(Q.Asked, 0) AS `Times Asked`,
+COALESCE(Q.Failed, 0) AS `Times Failed`
+FROM `answers` as A
+LEFT JOIN questionstats AS Q ON Q.Fingerprint == A.Fingerprint
+WHERE A.TestID == :testid
+"""
+
+# Every answer given to a question followed by the daily totals of its
+# compacted answers, which are all older. Rows of daily totals have no
+# TestID, so pages continue after the TestID of the last answer or, once
+# past the answers, after the :day of the last daily total.
+reviewquestiondialogquery = """
+WITH F AS
+(
+  SELECT B.Fingerprint
+  FROM answers AS B
+  WHERE B.TestID == :testid AND B.QuestionID == :questionid
+)
+SELECT * FROM
+(
+  SELECT * FROM
+  (
+    SELECT
+    A.Column1,
+    A.Value1,
+    A.Column2,
+    A.CorrectAnswer,
+    A.UserAnswer,
+    A.TestID,
+    A.QuestionID,
+    T.TimeStamp AS Time,
+    (
+      CASE WHEN A.NearMiss THEN 'NEAR MISS'
+      WHEN A.CorrectAnswer != A.UserAnswer THEN 'FAIL'
+      ELSE 'PASS' END
+    ) AS Result
+    FROM answers AS A INNER JOIN tests AS T ON A.TestID == T.TestID
+    WHERE A.Fingerprint == (SELECT Fingerprint FROM F) AND
+    :day IS NULL AND (:after IS NULL OR A.TestID < :after)
+    ORDER BY A.TestID DESC
+    LIMIT :limit
+  )
+  UNION ALL
+  SELECT * FROM
+  (
+    SELECT
+    Q.Column1,
+    Q.Value1,
+    Q.Column2,
+    Q.CorrectAnswer,
+    PRINTF('%d of %d answers correct', D.Asked - D.Failed, D.Asked),
+    NULL,
+    NULL,
+    D.Day,
+    'DAILY TOTAL'
+    FROM dailystats AS D
+    INNER JOIN questionstats AS Q ON Q.Fingerprint == D.Fingerprint
+    WHERE D.Fingerprint == (SELECT Fingerprint FROM F) AND
+    (:day IS NULL OR D.Day < :day)
+    ORDER BY D.Day DESC
+    LIMIT :limit
+  )
+) AS R
+ORDER BY R.TestID IS NULL, R.TestID DESC, R.Time DESC
+LIMIT :limit
+"""
+
+def queryname(sql):
+    """Name of the module level constant holding sql, otherwise its
+first line.
+
+    """
+    for (name, value) in globals().items():
+        if value is sql and not name.startswith("_"):
+            return name
+    return " ".join(sql.split())[:60]
+
+class Storage:
+    def __init__(self, dbase='pymem.db', profile='safe', querylog=None):
+        """Storage of the database dbase, tuned with profile. If querylog is
+given, every query is timed and recorded to it, see querylog.QueryLog.
+
+        """
+        self.dbase = dbase
+        self.profile = profile
+        self.querylog = querylog
+        self.db = None
+
+    def __enter__(self):
+        if sqlite3.sqlite_version_info < minimumsqlite:
+            print("Error: SQLite {} is too old, version {} or newer is "
+                  "required".format(sqlite3.sqlite_version,
+                                    ".".join(map(str, minimumsqlite))),
+                  file=sys.stderr)
+            sys.exit(1)
+        try:
+            # Transactions are managed explicitly, see transaction.
+            self.db = sqlite3.connect(self.dbase,
+                                      isolation_level=None,
+                                      check_same_thread=False)
+        except sqlite3.Error as e:
+            print("Error: Unable to open database: {}".format(e),
+                  file=sys.stderr)
+            sys.exit(1)
+        try:
+            self.db.create_function("fingerprint", 5, fingerprint,
+                                    deterministic=True)
+        except TypeError:
+            # deterministic is only accepted from Python 3.8
+            self.db.create_function("fingerprint", 5, fingerprint)
+        for (pragma, value) in dbprofiles[self.profile]:
+            if self._execute("PRAGMA {} = {}".format(pragma, value),
+                             error="Unable to set {}".format(pragma)) == None:
+                print("Warning: Unable to set {} to {}".format(pragma, value),
+                      file=sys.stderr)
+        result = self._select("SELECT name FROM sqlite_master "
+                              "WHERE type == 'table' AND "
+                              "      name == 'memtableroot'",
+                              error="Unable to read database schema")
+        if result == None:
+            sys.exit(1)
+        if result[1] == []:
+            print("Warning: Initilising database.", file=sys.stderr)
+            ## A new database is brought to the latest version in the
+            ## same transaction, there is nothing to report upgrading
+            def initialise():
+                if any([self._execute(q) == None for q in dbschema]):
+                    return False
+                return self._migrate(quiet=True)
+            if not self.transaction(initialise):
+                print("Error: Unable to initilise database", file=sys.stderr)
+                sys.exit(1)
+        elif not self._migrate():
+            sys.exit(1)
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.db.close()
+        self.db = None
+
+    def _execute(self, sql, params=(), error=None, log=True):
+        """Execute a statement and return the cursor, or None if it
+failed. A failure is reported with error, if given.
+
+Statements that return rows are not recorded in the query log as their
+rows have not been fetched yet, use _select or stream to read them.
+
+        """
+        start = time.perf_counter()
+        try:
+            cur = self.db.execute(sql, params)
+        except sqlite3.Error as e:
+            print("Error: {} ({})".format(error or "Query failed", e),
+                  file=sys.stderr)
+            return None
+        if log and self.querylog and cur.description == None:
+            self._record(sql, params, time.perf_counter() - start,
+                         cur.rowcount)
+        return cur
+
+    def _executemany(self, sql, seq, error=None):
+        start = time.perf_counter()
+        try:
+            cur = self.db.executemany(sql, seq)
+        except sqlite3.Error as e:
+            print("Error: {} ({})".format(error or "Query failed", e),
+                  file=sys.stderr)
+            return None
+        if self.querylog:
+            self._record(sql, None, time.perf_counter() - start,
+                         cur.rowcount)
+        return cur
+
+    def _select(self, sql, params=(), error=None):
+        "Returns a tuple of the column names and rows of a query."
+        start = time.perf_counter()
+        cur = self._execute(sql, params, error, log=False)
+        if cur == None:
+            return None
+        try:
+            rows = cur.fetchall()
+        except sqlite3.Error as e:
+            print("Error: {} ({})".format(error or "Query failed", e),
+                  file=sys.stderr)
+            return None
+        if self.querylog:
+            self._record(sql, params, time.perf_counter() - start, len(rows))
+        return ([d[0] for d in cur.description], rows)
+
+    def stream(self, sql, params=(), error=None, size=1000):
+        """Returns a tuple of the column names of a query and an iterator
+over its rows. Rows are fetched from the cursor in batches of size, so
+large results are never held in memory.
+
+        """
+        start = time.perf_counter()
+        cur = self._execute(sql, params, error, log=False)
+        if cur == None:
+            return None
+        elapsed = time.perf_counter() - start
+        def rows():
+            nonlocal elapsed
+            count = 0
+            while True:
+                start = time.perf_counter()
+                batch = cur.fetchmany(size)
+                elapsed += time.perf_counter() - start
+                if not batch:
+                    break
+                count += len(batch)
+                yield from batch
+            if self.querylog:
+                self._record(sql, params, elapsed, count)
+        return ([d[0] for d in cur.description], rows())
+
+    def _record(self, sql, params, seconds, rows):
+        self.querylog.record(self, queryname(sql), sql, params, seconds, rows)
+
+    def queryplan(self, sql, params=()):
+        "Returns the steps of the query plan of sql, or None."
+        try:
+            plan = self.db.execute("EXPLAIN QUERY PLAN " + sql,
+                                   params or ()).fetchall()
+        except sqlite3.Error:
+            return None
+        ## Indent each step below its parent
+        depth = {0: 0}
+        steps = []
+        for (node, parent, _, detail) in plan:
+            depth[node] = depth.get(parent, 0) + 1
+            steps.append("  " * (depth[node] - 1) + detail)
+        return steps
+
+    def _migrate(self, quiet=False):
+        """Apply any outstanding schema migrations to the database. Each
+upgrade is reported unless quiet is set.
+
+        """
+        result = self._select("PRAGMA user_version",
+                              error="Unable to read database version")
+        if result == None:
+            return False
+        version = result[1][0][0]
+        if version > len(migrations):
+            print("Warning: Database version {} is newer than supported "
+                  "version {}".format(version, len(migrations)),
+                  file=sys.stderr)
+            return True
+
+        for target in range(version + 1, len(migrations) + 1):
+            if not quiet:
+                print("Warning: Upgrading database to version {}"
+                      "".format(target), file=sys.stderr)
+            def apply():
+                for q in migrations[target - 1]:
+                    if callable(q):
+                        if not q(self):
+                            return False
+                    elif self._execute(q) == None:
+                        return False
+                return self._execute(
+                    "PRAGMA user_version = {}".format(target)) != None
+            if not self.transaction(apply):
+                print("Error: Unable to upgrade database to version {}"
+                      "".format(target), file=sys.stderr)
+                return False
+        return True
+
+    def transaction(self, fn):
+        """Run fn inside a database transaction. The transaction is
+committed if fn returns a value other than None or False, otherwise it
+is rolled back. The result of fn is returned.
+
+If a transaction is already open, fn is run as part of it.
+
+        """
+        if self.db.in_transaction:
+            return fn()
+        if self._execute("BEGIN", error="Unable to start transaction") == None:
+            return None
+        try:
+            result = fn()
+        except Exception:
+            self.db.rollback()
+            raise
+        if result is None or result is False:
+            self.db.rollback()
+        elif self._execute("COMMIT",
+                           error="Unable to commit transaction") == None:
+            self.db.rollback()
+            return None
+        return result
+
+    def roottable(self, maxwindow=10):
+        """Returns the headings and rows of the memory sets shown in the main
+window, along with their statistics over the last N tests for every N
+up to maxwindow. The latter is a dict mapping each memory set to a list
+of (perfect runs, correct answers, incorrect answers) indexed by N - 1.
+
+        """
+        root = self._select(mainwindowquery,
+                            error="could not load main table query")
+        if root == None:
+            return None
+        result = self._select(mainwindowquery_windows,
+                              {"limit": maxwindow},
+                              "could not load main table statistics")
+        if result == None:
+            return None
+        (headings, rows) = root
+        windows = {row[0]: [] for row in rows}
+        for (name, n, *stats) in result[1]:
+            windows.setdefault(name, []).append(tuple(stats))
+        ## Sets with fewer tests than the window keep their last totals
+        for stats in windows.values():
+            last = stats[-1] if stats else (0, 0, 0)
+            stats.extend([last] * (maxwindow - len(stats)))
+        return (headings + result[0][2:], rows, windows)
+
+    def reviewtests(self, name, after=None, limit=-1):
+        """Returns the tests of memory set name, newest first. The results
+are paged with limit rows continuing after the (Time, TestID) of the
+last row of the previous page.
+
+        """
+        (time, testid) = after if after else (None, None)
+        return self._select(reviewdialogquery_tests,
+                            {"name": name,
+                             "time": time,
+                             "after": testid,
+                             "limit": limit},
+                            "could not load test data for {}".format(name))
+
+    def reviewanswers(self, testid):
+        return self._select(reviewdialogquery_answers,
+                            {"testid": testid},
+                            "could not load answers for "
+                            "testid {}".format(testid))
+
+    def reviewanswersdetail(self, testid, questionid, after=None, limit=-1):
+        """Returns every answer given to the question, newest first, then
+the daily totals of its compacted answers. The results are paged with
+limit rows continuing after the (TestID, Time) of the last row of the
+previous page.
+
+        """
+        (after, day) = after if after else (None, None)
+        return self._select(reviewquestiondialogquery,
+                            {"testid": testid,
+                             "questionid": questionid,
+                             "after": after,
+                             "day": day if after == None else None,
+                             "limit": limit},
+                            "could not load answers for testid {}, "
+                            "questionid {}".format(testid, questionid))
+
+    def revisionstatus(self, name):
+        """Returns a tuple of whether the current revision of table name
+has been used in a test and the current revision.
+
+        """
+        result = self._select(
+            "SELECT COUNT(t.`Revision`) > 0 AS Used,r.`Revision` "
+            "FROM memtableroot AS r "
+            "  LEFT JOIN tests AS t ON "
+            "    r.`Memory Set` == t.`Memory Set` AND "
+            "    r.`Revision` == t.`Revision` "
+            "WHERE r.`Memory Set` == :name",
+            {"name": name},
+            "Failed to check if table {} is registered".format(name))
+        if result == None:
+            return None
+        if result[1] == []:
+            # Should not occour due to use of COUNT
+            print("Error: Failed to retreive result.", file=sys.stderr)
+            return None
+        row = result[1][0]
+        if row[1] == None:
+            print("Error: Table {} does not exist".format(name),
+                  file=sys.stderr)
+            return None
+        return (row[0] > 0, row[1])
+
+    def headings(self, name):
+        "Returns the column headings of table name."
+        result = self._select("PRAGMA table_info(`_{}_head`)".format(name),
+                              error="Unable to read table info for _{}_head"
+                              "".format(name))
+        if result == None:
+            return None
+        return [row[1] for row in result[1]]
+
+    def table(self, name, revision=None):
+        """Returns the headings and rows of a memory set. By default the
+current revision is returned, an earlier revision can be selected with
+revision. It is reconstructed from its base snapshot and delta.
+
+        """
+        status = self.revisionstatus(name)
+        if status == None:
+            return None
+        if revision == None or revision == status[1]:
+            return self._select("SELECT * FROM `_{}_head`".format(name),
+                                error="Unable to load table {}".format(name))
+
+        sql = self._revisionquery(name, revision)
+        if sql == None:
+            return None
+        return self._select(sql,
+                            error="Unable to load revision {} of table {}"
+                            "".format(revision, name))
+
+    def _revisionquery(self, name, revision):
+        """Returns a query that reconstructs an earlier revision of a table
+from its base snapshot and delta.
+
+        """
+        result = self._select("SELECT Base FROM revisions "
+                              "WHERE `Memory Set` == :name AND "
+                              "      Revision == :rev",
+                              {"name": name, "rev": revision},
+                              "Failed to lookup revision {} of table {}"
+                              "".format(revision, name))
+        if result == None:
+            return None
+        if result[1] == []:
+            print("Error: Revision {} of table {} does not exist"
+                  "".format(revision, name), file=sys.stderr)
+            return None
+        base = result[1][0][0]
+
+        if base == revision:
+            return "SELECT * FROM `_{}_{}`".format(name, revision)
+
+        headings = self.headings(name)
+        if headings == None:
+            return None
+        return ("SELECT {cols} FROM `_{name}_{base}` "
+                "WHERE `{key}` NOT IN ( "
+                "  SELECT `{key}` FROM `_{name}_delta` "
+                "  WHERE `|Revision` == {rev}) "
+                "UNION ALL "
+                "SELECT {cols} FROM `_{name}_delta` "
+                "WHERE `|Revision` == {rev} AND NOT `|Deleted`"
+                "".format(name=name,
+                          base=base,
+                          rev=int(revision),
+                          key=headings[0],
+                          cols=", ".join("`{}`".format(hd)
+                                         for hd in headings)))
+
+    def createtable(self, name, headings=None):
+        """Creates a database table.
+
+If the table already exits, the current contents are recorded as a
+revision and the revision is incremented.
+
+If table does not exist, table is created from the headings specified
+in headings.
+
+        """
+        return self.transaction(lambda: self._createtable(name, headings))
+
+    def _createtable(self, name, headings):
+        ## First: Check if table is already registerd and determine
+        ## revision of table.
+        result = self._select("SELECT Revision "
+                              "FROM memtableroot "
+                              "WHERE `Memory Set` == :name",
+                              {"name": name},
+                              "Failed to check if table {} is registered"
+                              "".format(name))
+        if result == None:
+            return None
+        revision = 1
+        if result[1] != []:
+            revision = result[1][0][0] + 1
+        if revision == 1 and headings == None:
+            print("Error: Table and headings are undefined", file=sys.stderr)
+            return None
+
+        ## Second: Register table revision
+        registersql = """
+            INSERT INTO memtableroot (`Memory Set`, `Created`, `Revision`)
+            VALUES (:name, DATETIME(), :rev)
+        """
+        if revision != 1:
+            registersql = """
+                UPDATE memtableroot SET `Revision` = :rev
+                WHERE `Memory Set` == :name
+            """
+        if self._execute(registersql,
+                         {"name": name, "rev": revision},
+                         "Failed to register table {}".format(name)) == None:
+            return None
+
+        if revision == 1:
+            if self._execute("INSERT OR IGNORE INTO memtablestats "
+                             "(`Memory Set`) VALUES (:name)",
+                             {"name": name},
+                             "Failed to register statistics for table {}"
+                             "".format(name)) == None:
+                return None
+
+        ## Third: Create table, or record the previous revision
+        if revision == 1:
+            if self._execute(self._tabledef("_{}_head".format(name),
+                                            headings),
+                             error="Unable to create table {}"
+                             "".format(name)) == None:
+                return None
+            if self._execute(self._deltadef(name, headings),
+                             error="Unable to create delta table for {}"
+                             "".format(name)) == None:
+                return None
+        else:
+            headings = self.headings(name)
+            if headings == None:
+                return None
+            if not self._freezerevision(name, revision - 1,
+                                        "_{}_head".format(name), headings):
+                return None
+        return True
+
+    def _tabledef(self, table, headings):
+        q = ("CREATE TABLE `{}` ("
+             "  `{}` TEXT PRIMARY KEY NOT NULL"
+             "".format(table, headings[0]))
+        for hd in headings[1:]:
+            q = q + ", `{}` TEXT".format(hd)
+        return q + ")"
+
+    def _deltadef(self, name, headings):
+        # Headings can not contain "|" other than as an attribute
+        # separator, so the bookkeeping columns can not clash.
+        q = ("CREATE TABLE `_{}_delta` ("
+             "  `|Revision` INTEGER NOT NULL,"
+             "  `|Deleted` INTEGER NOT NULL DEFAULT 0,"
+             "  `{}` TEXT NOT NULL"
+             "".format(name, headings[0]))
+        for hd in headings[1:]:
+            q = q + ", `{}` TEXT".format(hd)
+        return q + ", PRIMARY KEY(`|Revision`, `{}`))".format(headings[0])
+
+    def _freezerevision(self, name, revision, source, headings):
+        """Record the contents of the table source as revision of the
+memory set name. The revision is stored as the rows added, changed or
+deleted relative to the latest base snapshot. If there is no base
+snapshot, or the delta is large relative to the table, a new base
+snapshot is taken instead. Returns the base of the revision.
+
+        """
+        ## First: Find the latest base snapshot
+        result = self._select("SELECT MAX(Base) FROM revisions "
+                              "WHERE `Memory Set` == :name",
+                              {"name": name},
+                              "Failed to find base revision of {}"
+                              "".format(name))
+        if result == None:
+            return False
+        base = result[1][0][0]
+
+        ## Second: Attempt to store as delta
+        if base != None:
+            key = headings[0]
+            changed = " AND ".join("S.`{0}` IS B.`{0}`".format(hd)
+                                   for hd in headings[1:]) or "1"
+            cur = self._execute(
+                "INSERT INTO `_{name}_delta` "
+                "SELECT {rev}, 0, S.* "
+                "FROM `{source}` AS S "
+                "LEFT JOIN `_{name}_{base}` AS B "
+                "  ON B.`{key}` == S.`{key}` "
+                "WHERE B.`{key}` IS NULL OR NOT ({changed}) "
+                "UNION ALL "
+                "SELECT {rev}, 1, B.`{key}`{nulls} "
+                "FROM `_{name}_{base}` AS B "
+                "WHERE B.`{key}` NOT IN (SELECT `{key}` FROM `{source}`)"
+                "".format(name=name,
+                          rev=int(revision),
+                          source=source,
+                          base=base,
+                          key=key,
+                          changed=changed,
+                          nulls=", NULL" * (len(headings) - 1)),
+                error="Unable to record delta for revision {} of {}"
+                "".format(revision, name))
+            if cur == None:
+                return False
+            deltasize = cur.rowcount
+
+            result = self._select("SELECT COUNT(*) FROM `{}`".format(source),
+                                  error="Unable to count rows of {}"
+                                  "".format(source))
+            if result == None:
+                return False
+            if deltasize > rebaseratio * result[1][0][0]:
+                if self._execute("DELETE FROM `_{}_delta` "
+                                 "WHERE `|Revision` == {}"
+                                 "".format(name, int(revision)),
+                                 error="Unable to discard delta for "
+                                 "revision {} of {}"
+                                 "".format(revision, name)) == None:
+                    return False
+                base = None
+
+        ## Third: Otherwise take a new base snapshot
+        if base == None:
+            base = revision
+            snapshot = "_{}_{}".format(name, revision)
+            if source != snapshot:
+                error = ("Unable to snapshot revision {} of {}"
+                         "".format(revision, name))
+                if self._execute(self._tabledef(snapshot, headings),
+                                 error=error) == None or \
+                   self._execute("INSERT INTO `{}` SELECT * FROM `{}`"
+                                 "".format(snapshot, source),
+                                 error=error) == None:
+                    return False
+
+        ## Forth: Register revision
+        if self._execute("INSERT INTO revisions "
+                         "(`Memory Set`, `Revision`, `Base`) "
+                         "VALUES (:name, :rev, :base)",
+                         {"name": name, "rev": revision, "base": base},
+                         "Unable to register revision {} of {}"
+                         "".format(revision, name)) == None:
+            return False
+        return base
+
+    def _upgraderevisions(self):
+        """Convert tables from the old storage scheme, which held a full
+copy of every revision, into a head table with base snapshots and
+deltas.
+
+        """
+        result = self._select("SELECT `Memory Set`, Revision "
+                              "FROM memtableroot",
+                              error="Unable to list tables")
+        if result == None:
+            return False
+
+        for (name, revision) in result[1]:
+            if self._execute("ALTER TABLE `_{0}_{1}` RENAME TO `_{0}_head`"
+                             "".format(name, revision),
+                             error="Unable to rename table _{}_{}"
+                             "".format(name, revision)) == None:
+                return False
+            headings = self.headings(name)
+            if headings == None or \
+               self._execute(self._deltadef(name, headings),
+                             error="Unable to create delta table for {}"
+                             "".format(name)) == None:
+                return False
+            for rev in range(1, revision):
+                legacy = "_{}_{}".format(name, rev)
+                base = self._freezerevision(name, rev, legacy, headings)
+                if not base:
+                    return False
+                if base != rev and \
+                   self._execute("DROP TABLE `{}`".format(legacy),
+                                 error="Unable to drop table {}"
+                                 "".format(legacy)) == None:
+                    return False
+        return True
+
+    def writetable(self, name, rows):
+        """Replace the contents of the current revision of table name with
+rows. Nothing is written when rows are unchanged. Otherwise, if the
+current revision has been used in a test it is recorded and the
+revision incremented before the changes are written.
+
+        """
+        return self.transaction(lambda: self._writetable(name, rows))
+
+    def _writetable(self, name, rows):
+        current = self.table(name)
+        if current == None:
+            return None
+        (headings, old) = current
+        old = {row[0]: tuple(row) for row in old}
+        new = {}
+        for row in rows:
+            if row[0] in new:
+                print("Error: Duplicate key {} in table {}"
+                      "".format(row[0], name), file=sys.stderr)
+                return None
+            new[row[0]] = tuple(row)
+
+        deleted = [(k,) for k in old if k not in new]
+        changed = [row for (k, row) in new.items() if old.get(k) != row]
+        if not deleted and not changed:
+            return True
+
+        ## First: Start a new revision if needed
+        status = self.revisionstatus(name)
+        if status == None:
+            return None
+        if status[0] and not self._createtable(name, None):
+            return None
+
+        ## Second: Write changes
+        if self._executemany("DELETE FROM `_{}_head` WHERE `{}` == ?"
+                             "".format(name, headings[0]),
+                             deleted,
+                             "Unable to delete rows from {}"
+                             "".format(name)) == None:
+            return None
+        if self._executemany("INSERT OR REPLACE INTO `_{}_head` "
+                             "VALUES ({})".format(name,
+                                                  ", ".join(["?"] *
+                                                            len(headings))),
+                             changed,
+                             "Unable to write rows to {}"
+                             "".format(name)) == None:
+            return None
+        return True
+
+    def importtable(self, name, headings, rows, chunksize=1000,
+                    progress=None):
+        """Create the memory set name and fill it from the iterable rows in
+a single transaction. Rows are consumed in chunks of chunksize so that
+memory use does not depend on the number of rows. After each chunk,
+progress is called with the number of rows imported so far. Returns
+the number of rows imported.
+
+        """
+        def fill():
+            if not self._createtable(name, headings):
+                return None
+            sql = ("INSERT INTO `_{}_head` VALUES ({})"
+                   "".format(name, ", ".join(["?"] * len(headings))))
+            count = 0
+            it = iter(rows)
+            while True:
+                chunk = list(itertools.islice(it, chunksize))
+                if not chunk:
+                    break
+                if self._executemany(sql, chunk,
+                                     "Unable to import rows into {}"
+                                     "".format(name)) == None:
+                    return None
+                count += len(chunk)
+                if progress:
+                    progress(count)
+            return count
+        return self.transaction(fill)
+
+    def tablenames(self):
+        "Returns the names of the registered tables, or None on failure."
+        result = self._select("SELECT `Memory Set` FROM memtableroot",
+                              error="Unable to list tables")
+        if result == None:
+            return None
+        return [row[0] for row in result[1]]
+
+    def droptable(self, name):
+        "Drops and unregisters a table and all its revisions."
+        return self.transaction(lambda: self._droptable(name))
+
+    def _droptable(self, name):
+        ## First: Check if table is registerd.
+        result = self._select("SELECT Revision "
+                              "FROM memtableroot "
+                              "WHERE `Memory Set` == :name",
+                              {"name": name},
+                              "Failed to check if table {} is registered"
+                              "".format(name))
+        if result == None:
+            return None
+        if result[1] == []:
+            print("Error: Can not drop unregistered table {}".format(name),
+                  file=sys.stderr)
+            return None
+
+        ## Second: Unregister table
+        if self._execute("DELETE FROM memtableroot "
+                         "WHERE `Memory Set` == :name",
+                         {"name": name},
+                         "Unable to unregister table {}"
+                         "".format(name)) == None:
+            return None
+
+        ## Third: Drop all revisions
+        result = self._select("SELECT DISTINCT Base FROM revisions "
+                              "WHERE `Memory Set` == :name",
+                              {"name": name},
+                              "Unable to list revisions of {}".format(name))
+        if result == None:
+            return None
+        tables = ["_{}_head".format(name), "_{}_delta".format(name)] + \
+                 ["_{}_{}".format(name, row[0]) for row in result[1]]
+        for tbl in tables:
+            if self._execute("DROP TABLE `{}`".format(tbl)) == None:
+                print("Warning: Unable to drop table {}".format(tbl),
+                      file=sys.stderr)
+
+        ## Forth: Clear tests
+        if self._execute("DELETE FROM answers "
+                         "WHERE answers.TestID IN ( "
+                         "    SELECT TestID "
+                         "    FROM tests "
+                         "    WHERE tests.`Memory Set` == :name "
+                         ")",
+                         {"name": name}) == None:
+            print("Warning: Unable to delete answers for {}".format(name),
+                  file=sys.stderr)
+        if self._execute("DELETE FROM tests "
+                         "WHERE `Memory Set` == :name",
+                         {"name": name}) == None:
+            print("Warning: Unable to delete tests for {}".format(name),
+                  file=sys.stderr)
+
+        ## Fifth: Clear statistics and revisions
+        for tbl in ["teststats", "memtablestats", "questionstats",
+                    "dailystats", "schedule", "revisions"]:
+            if self._execute("DELETE FROM `{}` "
+                             "WHERE `Memory Set` == :name".format(tbl),
+                             {"name": name}) == None:
+                print("Warning: Unable to delete {} for {}".format(tbl, name),
+                      file=sys.stderr)
+
+        return True
+
+    def compact(self, keep=100, batch=100, vacuum=True, progress=None):
+        """Fold the answers of all but the last keep tests of each memory
+set into per question and day totals in dailystats, and delete them.
+The tests and their summary statistics are kept, so the main window
+and the question totals of the review dialogs are unchanged. The daily
+totals are listed after the answers of a question when it is reviewed
+and can be exported.
+
+Tests are compacted batch at a time, each batch in its own transaction,
+so an interrupted compaction continues where it stopped when run again.
+progress, if given, is called with the number of tests compacted so
+far and the total after each batch. If vacuum is set, the database is
+rebuilt afterwards to return the freed space to the file system,
+otherwise it is kept for reuse by the database.
+
+Returns a tuple of the number of tests compacted, answers deleted and
+bytes freed, or None on failure.
+
+        """
+        used = self._usedbytes()
+        result = self._select(compactquery_count,
+                              {"keep": keep},
+                              "Unable to count tests to compact")
+        if used == None or result == None:
+            return None
+        total = result[1][0][0]
+        params = {"keep": keep, "batch": batch}
+        def step():
+            counts = []
+            for q in compactbatch:
+                cur = self._execute(q, params, "Unable to compact tests")
+                if cur == None:
+                    return None
+                counts.append(cur.rowcount)
+            ## Tests selected and answers deleted
+            return (counts[2], counts[4])
+
+        (tests, answers) = (0, 0)
+        while tests < total:
+            result = self.transaction(step)
+            if result == None:
+                return None
+            if result[0] <= 0:
+                break
+            tests += result[0]
+            answers += result[1]
+            if progress:
+                progress(tests, total)
+
+        if vacuum and self._execute("VACUUM",
+                                    error="Unable to vacuum database") == None:
+            return None
+        remaining = self._usedbytes()
+        if remaining == None:
+            return None
+        return (tests, answers, used - remaining)
+
+    def _usedbytes(self):
+        "Returns the bytes of the database file in use."
+        try:
+            (pages, free, size) = [self.db.execute("PRAGMA " + p).fetchone()[0]
+                                   for p in ["page_count",
+                                             "freelist_count",
+                                             "page_size"]]
+        except sqlite3.Error as e:
+            print("Error: Unable to read database size ({})".format(e),
+                  file=sys.stderr)
+            return None
+        return (pages - free) * size
+
+    def saveresults(self, name, results):
+        """Record the results of a test. The test, its answers and the
+summary statistics are all written in a single transaction. A result
+is a question followed by the normalised correct answers, the answers
+given, whether they were correct and optionally whether they were
+accepted as a near miss.
+
+        """
+        return bool(self.transaction(
+            lambda: self._saveresults(name, results)))
+
+    def _saveresults(self, name, results):
+        cur = self._execute("INSERT INTO TESTS (`Memory Set`, "
+                            "                   `TimeStamp`, "
+                            "                   `Revision`) "
+                            "SELECT r.`Memory Set`, "
+                            "       DATETIME() AS TimeStamp, "
+                            "       r.`Revision` "
+                            "FROM memtableroot AS r "
+                            "WHERE r.`Memory Set` == :name",
+                            {"name": name},
+                            "Failed to create test entry.")
+        if cur == None:
+            return False
+        if cur.rowcount != 1:
+            print("Error: Table {} is not registered".format(name),
+                  file=sys.stderr)
+            return False
+        testId = cur.lastrowid
+
+        ## Insert all answers with a single prepared statement
+        def answers():
+            for (i, r) in enumerate(results):
+                correct = "\n".join(r[5])
+                yield (testId, i, r[0], r[1], r[2], "\n".join(r[6]), correct,
+                       fingerprint(name, r[0], r[1], r[2], correct),
+                       len(r) > 8 and bool(r[8]))
+        if self._executemany("INSERT INTO `answers` "
+                             "(`TestID`, `QuestionID`, `Column1`, `Value1`,"
+                             " `Column2`, `UserAnswer`, `CorrectAnswer`,"
+                             " `Fingerprint`, `NearMiss`) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             answers(),
+                             "Failed to create answer entries.") == None:
+            return False
+
+        ## Update summary statistics
+        for q in ["INSERT INTO teststats "
+                  "SELECT T.TestID, T.`Memory Set`, T.TimeStamp, "
+                  "       COALESCE(SUM(A.UserAnswer == A.CorrectAnswer OR "
+                  "                    A.NearMiss), 0), "
+                  "       COALESCE(SUM(A.UserAnswer != A.CorrectAnswer AND "
+                  "                    NOT A.NearMiss), 0) "
+                  "FROM tests AS T "
+                  "LEFT JOIN answers AS A ON A.TestID == T.TestID "
+                  "WHERE T.TestID == :id "
+                  "GROUP BY T.TestID",
+                  "INSERT INTO questionstats "
+                  "SELECT A.Fingerprint, T.`Memory Set`, "
+                  "       A.Column1, A.Value1, A.Column2, A.CorrectAnswer, "
+                  "       COUNT(*), SUM(A.UserAnswer != A.CorrectAnswer AND "
+                  "                     NOT A.NearMiss) "
+                  "FROM answers AS A "
+                  "INNER JOIN tests AS T ON T.TestID == A.TestID "
+                  "WHERE A.TestID == :id "
+                  "GROUP BY A.Fingerprint "
+                  "ON CONFLICT(Fingerprint) DO UPDATE "
+                  "SET Asked = Asked + excluded.Asked, "
+                  "    Failed = Failed + excluded.Failed",
+                  scheduleupdate,
+                  "INSERT OR IGNORE INTO memtablestats (`Memory Set`) "
+                  "SELECT `Memory Set` FROM tests WHERE TestID == :id",
+                  "UPDATE memtablestats "
+                  "SET `Times Used` = `Times Used` + 1, "
+                  "    `Last Used` = ( "
+                  "      SELECT TimeStamp FROM tests WHERE TestID == :id) "
+                  "WHERE `Memory Set` == ( "
+                  "  SELECT `Memory Set` FROM tests WHERE TestID == :id)"]:
+            if self._execute(q, self._scheduleparams(id=testId),
+                             "Failed to update statistics.") == None:
+                return False
+        return True
+
+    def _scheduleparams(self, **params):
+        return dict(params,
+                    initial=initialease,
+                    minimum=minimumease,
+                    bonus=easebonus,
+                    penalty=easepenalty)
+
+    def _replayschedule(self):
+        """Build the schedule by replaying the answers of every test that
+has not been compacted, in the order they were taken.
+
+        """
+        result = self._select("SELECT TestID FROM tests WHERE Compacted == 0 "
+                              "ORDER BY TestID",
+                              error="Unable to list tests")
+        if result == None:
+            return False
+        for (testid,) in result[1]:
+            if self._execute(scheduleupdate,
+                             self._scheduleparams(id=testid),
+                             "Unable to schedule test {}".format(testid)
+                             ) == None:
+                return False
+        return True
+
+    def duequestions(self, name, limit=-1, now="now"):
+        """Returns the fingerprints of up to limit questions of memory set
+name that are due at now, most overdue first.
+
+        """
+        result = self._select(schedulequery_due,
+                              {"name": name, "now": now, "limit": limit},
+                              "could not load due questions of {}"
+                              "".format(name))
+        if result == None:
+            return None
+        return [row[0] for row in result[1]]
+
+    def weakestquestions(self, name, limit=-1, now="now"):
+        """Returns the fingerprints of up to limit questions of memory set
+name that are not due at now, lowest ease first.
+
+        """
+        result = self._select(schedulequery_weakest,
+                              {"name": name, "now": now, "limit": limit},
+                              "could not load weakest questions of {}"
+                              "".format(name))
+        if result == None:
+            return None
+        return [row[0] for row in result[1]]
+
+    def unscheduled(self, fingerprints):
+        """Returns the set of fingerprints that are not in the schedule, or
+None if they can not be looked up.
+
+        """
+        (create, clear, insert, query) = schedulequery_unscheduled
+        def lookup():
+            if self._execute(create) == None or self._execute(clear) == None:
+                return None
+            if self._executemany(insert, [(f,) for f in fingerprints],
+                                 "could not look up schedule") == None:
+                return None
+            return self._select(query, error="could not look up schedule")
+        result = self.transaction(lookup)
+        if not result:
+            return None
+        return {row[0] for row in result[1]}
+
+    def scheduled(self, name):
+        "Returns the set of fingerprints of the scheduled questions of name."
+        result = self._select(schedulequery_scheduled,
+                              {"name": name},
+                              "could not load schedule of {}".format(name))
+        if result == None:
+            return None
+        return {row[0] for row in result[1]}
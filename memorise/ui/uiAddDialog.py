@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'memorise/ui/AddDialog.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_AddDialog(object):
+    def setupUi(self, AddDialog):
+        AddDialog.setObjectName("AddDialog")
+        AddDialog.setWindowModality(QtCore.Qt.WindowModal)
+        AddDialog.resize(411, 306)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(AddDialog.sizePolicy().hasHeightForWidth())
+        AddDialog.setSizePolicy(sizePolicy)
+        self.verticalLayout = QtWidgets.QVBoxLayout(AddDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.widget = QtWidgets.QWidget(AddDialog)
+        self.widget.setObjectName("widget")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.widget)
+        self.horizontalLayout.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.label = QtWidgets.QLabel(self.widget)
+        self.label.setObjectName("label")
+        self.horizontalLayout.addWidget(self.label)
+        self.lineName = QtWidgets.QLineEdit(self.widget)
+        self.lineName.setObjectName("lineName")
+        self.horizontalLayout.addWidget(self.lineName)
+        self.verticalLayout.addWidget(self.widget)
+        self.label_2 = QtWidgets.QLabel(AddDialog)
+        self.label_2.setObjectName("label_2")
+        self.verticalLayout.addWidget(self.label_2)
+        self.treeHeadings = QtWidgets.QTreeView(AddDialog)
+        self.treeHeadings.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.treeHeadings.setRootIsDecorated(False)
+        self.treeHeadings.setItemsExpandable(False)
+        self.treeHeadings.setHeaderHidden(False)
+        self.treeHeadings.setExpandsOnDoubleClick(False)
+        self.treeHeadings.setObjectName("treeHeadings")
+        self.verticalLayout.addWidget(self.treeHeadings)
+        self.buttonBox = QtWidgets.QDialogButtonBox(AddDialog)
+        self.buttonBox.setEnabled(True)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+        self.actionInsertColumnHeader = QtWidgets.QAction(AddDialog)
+        self.actionInsertColumnHeader.setObjectName("actionInsertColumnHeader")
+        self.actionRemoveColumnHeader = QtWidgets.QAction(AddDialog)
+        self.actionRemoveColumnHeader.setObjectName("actionRemoveColumnHeader")
+
+        self.retranslateUi(AddDialog)
+        self.buttonBox.accepted.connect(AddDialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(AddDialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(AddDialog)
+
+    def retranslateUi(self, AddDialog):
+        _translate = QtCore.QCoreApplication.translate
+        AddDialog.setWindowTitle(_translate("AddDialog", "Specify New Table"))
+        self.label.setText(_translate("AddDialog", "Table Name:"))
+        self.lineName.setText(_translate("AddDialog", "MemorySet1"))
+        self.label_2.setText(_translate("AddDialog", "Table Headings:"))
+        self.actionInsertColumnHeader.setText(_translate("AddDialog", "Insert Column Header"))
+        self.actionRemoveColumnHeader.setText(_translate("AddDialog", "Remove Column Header"))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'memorise/ui/EditDialog.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_EditDialog(object):
+    def setupUi(self, EditDialog):
+        EditDialog.setObjectName("EditDialog")
+        EditDialog.resize(400, 300)
+        self.verticalLayout = QtWidgets.QVBoxLayout(EditDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.table = QtWidgets.QTableView(EditDialog)
+        self.table.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.table.setObjectName("table")
+        self.verticalLayout.addWidget(self.table)
+        self.buttonBox = QtWidgets.QDialogButtonBox(EditDialog)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+        self.actionAddRow = QtWidgets.QAction(EditDialog)
+        self.actionAddRow.setObjectName("actionAddRow")
+        self.actionRemoveRow = QtWidgets.QAction(EditDialog)
+        self.actionRemoveRow.setObjectName("actionRemoveRow")
+
+        self.retranslateUi(EditDialog)
+        self.buttonBox.accepted.connect(EditDialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(EditDialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(EditDialog)
+
+    def retranslateUi(self, EditDialog):
+        _translate = QtCore.QCoreApplication.translate
+        EditDialog.setWindowTitle(_translate("EditDialog", "Edit Table Data"))
+        self.actionAddRow.setText(_translate("EditDialog", "Add Row"))
+        self.actionAddRow.setToolTip(_translate("EditDialog", "Add Row"))
+        self.actionRemoveRow.setText(_translate("EditDialog", "Remove Row"))
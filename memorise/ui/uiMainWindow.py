@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'memorise/ui/MainWindow.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(675, 333)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.centralwidget)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.table = QtWidgets.QTreeView(self.centralwidget)
+        self.table.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.table.setRootIsDecorated(False)
+        self.table.setItemsExpandable(False)
+        self.table.setSortingEnabled(True)
+        self.table.setObjectName("table")
+        self.table.header().setCascadingSectionResizes(False)
+        self.verticalLayout.addWidget(self.table)
+        self.frame = QtWidgets.QFrame(self.centralwidget)
+        self.frame.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame.setObjectName("frame")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.frame)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.label_2 = QtWidgets.QLabel(self.frame)
+        self.label_2.setObjectName("label_2")
+        self.horizontalLayout.addWidget(self.label_2)
+        self.sliderWindow = QtWidgets.QSlider(self.frame)
+        self.sliderWindow.setMinimum(1)
+        self.sliderWindow.setMaximum(10)
+        self.sliderWindow.setPageStep(2)
+        self.sliderWindow.setProperty("value", 5)
+        self.sliderWindow.setSliderPosition(5)
+        self.sliderWindow.setOrientation(QtCore.Qt.Horizontal)
+        self.sliderWindow.setObjectName("sliderWindow")
+        self.horizontalLayout.addWidget(self.sliderWindow)
+        self.labelWindow = QtWidgets.QLabel(self.frame)
+        self.labelWindow.setObjectName("labelWindow")
+        self.horizontalLayout.addWidget(self.labelWindow)
+        self.label_3 = QtWidgets.QLabel(self.frame)
+        self.label_3.setObjectName("label_3")
+        self.horizontalLayout.addWidget(self.label_3)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem)
+        self.label_4 = QtWidgets.QLabel(self.frame)
+        self.label_4.setObjectName("label_4")
+        self.horizontalLayout.addWidget(self.label_4)
+        self.sliderColour = QtWidgets.QSlider(self.frame)
+        self.sliderColour.setMinimum(1)
+        self.sliderColour.setMaximum(30)
+        self.sliderColour.setProperty("value", 20)
+        self.sliderColour.setOrientation(QtCore.Qt.Horizontal)
+        self.sliderColour.setObjectName("sliderColour")
+        self.horizontalLayout.addWidget(self.sliderColour)
+        self.labelColour = QtWidgets.QLabel(self.frame)
+        self.labelColour.setObjectName("labelColour")
+        self.horizontalLayout.addWidget(self.labelColour)
+        self.verticalLayout.addWidget(self.frame)
+        self.frame_2 = QtWidgets.QFrame(self.centralwidget)
+        self.frame_2.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame_2.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame_2.setObjectName("frame_2")
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(self.frame_2)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.buttonAdd = QtWidgets.QPushButton(self.frame_2)
+        self.buttonAdd.setObjectName("buttonAdd")
+        self.horizontalLayout_2.addWidget(self.buttonAdd)
+        self.buttonImport = QtWidgets.QPushButton(self.frame_2)
+        self.buttonImport.setObjectName("buttonImport")
+        self.horizontalLayout_2.addWidget(self.buttonImport)
+        spacerItem1 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem1)
+        self.label = QtWidgets.QLabel(self.frame_2)
+        self.label.setObjectName("label")
+        self.horizontalLayout_2.addWidget(self.label)
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem2)
+        self.buttonClose = QtWidgets.QPushButton(self.frame_2)
+        self.buttonClose.setCheckable(False)
+        self.buttonClose.setChecked(False)
+        self.buttonClose.setFlat(False)
+        self.buttonClose.setObjectName("buttonClose")
+        self.horizontalLayout_2.addWidget(self.buttonClose)
+        self.verticalLayout.addWidget(self.frame_2)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.actionBeginTest = QtWidgets.QAction(MainWindow)
+        self.actionBeginTest.setObjectName("actionBeginTest")
+        self.actionBeginSession = QtWidgets.QAction(MainWindow)
+        self.actionBeginSession.setObjectName("actionBeginSession")
+        self.actionEditMemorySet = QtWidgets.QAction(MainWindow)
+        self.actionEditMemorySet.setObjectName("actionEditMemorySet")
+        self.actionReviewPreviousAnswers = QtWidgets.QAction(MainWindow)
+        self.actionReviewPreviousAnswers.setObjectName("actionReviewPreviousAnswers")
+        self.actionRemoveMemorySet = QtWidgets.QAction(MainWindow)
+        self.actionRemoveMemorySet.setObjectName("actionRemoveMemorySet")
+        self.actionAddNewMemorySet = QtWidgets.QAction(MainWindow)
+        self.actionAddNewMemorySet.setObjectName("actionAddNewMemorySet")
+        self.actionImportMemorySet = QtWidgets.QAction(MainWindow)
+        self.actionImportMemorySet.setObjectName("actionImportMemorySet")
+        self.actionCompactHistory = QtWidgets.QAction(MainWindow)
+        self.actionCompactHistory.setObjectName("actionCompactHistory")
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "pyMemoriser"))
+        self.label_2.setText(_translate("MainWindow", "Window Size:"))
+        self.labelWindow.setText(_translate("MainWindow", "5"))
+        self.label_3.setText(_translate("MainWindow", "Runs"))
+        self.label_4.setText(_translate("MainWindow", "Colour Weighting:"))
+        self.labelColour.setText(_translate("MainWindow", "<html><head/><body><p><span style=\" font-style:italic;\">x</span><span style=\" font-style:italic; vertical-align:super;\">yy</span></p></body></html>"))
+        self.buttonAdd.setText(_translate("MainWindow", "Add"))
+        self.buttonImport.setText(_translate("MainWindow", "Import"))
+        self.label.setText(_translate("MainWindow", "(C) Karim Kanso 2019"))
+        self.buttonClose.setText(_translate("MainWindow", "Close"))
+        self.actionBeginTest.setText(_translate("MainWindow", "Begin Test"))
+        self.actionBeginSession.setText(_translate("MainWindow", "Begin Review Session"))
+        self.actionEditMemorySet.setText(_translate("MainWindow", "Edit Memory Set"))
+        self.actionReviewPreviousAnswers.setText(_translate("MainWindow", "Review Previous Answers"))
+        self.actionRemoveMemorySet.setText(_translate("MainWindow", "Remove Memory Set"))
+        self.actionAddNewMemorySet.setText(_translate("MainWindow", "Add New Memory Set"))
+        self.actionImportMemorySet.setText(_translate("MainWindow", "Import Memory Set"))
+        self.actionCompactHistory.setText(_translate("MainWindow", "Compact Test History"))
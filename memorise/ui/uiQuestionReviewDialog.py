@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'memorise/ui/QuestionReviewDialog.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_QuestionReviewDialog(object):
+    def setupUi(self, QuestionReviewDialog):
+        QuestionReviewDialog.setObjectName("QuestionReviewDialog")
+        QuestionReviewDialog.resize(709, 419)
+        self.verticalLayout = QtWidgets.QVBoxLayout(QuestionReviewDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.questions = QtWidgets.QTreeView(QuestionReviewDialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(12)
+        sizePolicy.setHeightForWidth(self.questions.sizePolicy().hasHeightForWidth())
+        self.questions.setSizePolicy(sizePolicy)
+        self.questions.setObjectName("questions")
+        self.verticalLayout.addWidget(self.questions)
+        self.labelQuestion = QtWidgets.QLabel(QuestionReviewDialog)
+        self.labelQuestion.setObjectName("labelQuestion")
+        self.verticalLayout.addWidget(self.labelQuestion)
+        self.frame = QtWidgets.QFrame(QuestionReviewDialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(8)
+        sizePolicy.setHeightForWidth(self.frame.sizePolicy().hasHeightForWidth())
+        self.frame.setSizePolicy(sizePolicy)
+        self.frame.setMinimumSize(QtCore.QSize(0, 100))
+        self.frame.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame.setObjectName("frame")
+        self.gridLayout = QtWidgets.QGridLayout(self.frame)
+        self.gridLayout.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout.setObjectName("gridLayout")
+        self.correctAnswer = QtWidgets.QPlainTextEdit(self.frame)
+        self.correctAnswer.setUndoRedoEnabled(False)
+        self.correctAnswer.setReadOnly(True)
+        self.correctAnswer.setBackgroundVisible(True)
+        self.correctAnswer.setObjectName("correctAnswer")
+        self.gridLayout.addWidget(self.correctAnswer, 0, 1, 1, 1)
+        self.userAnswer = QtWidgets.QPlainTextEdit(self.frame)
+        self.userAnswer.setUndoRedoEnabled(False)
+        self.userAnswer.setReadOnly(True)
+        self.userAnswer.setBackgroundVisible(True)
+        self.userAnswer.setObjectName("userAnswer")
+        self.gridLayout.addWidget(self.userAnswer, 0, 4, 1, 1)
+        self.label = QtWidgets.QLabel(self.frame)
+        self.label.setObjectName("label")
+        self.gridLayout.addWidget(self.label, 0, 3, 1, 1, QtCore.Qt.AlignTop)
+        self.label_2 = QtWidgets.QLabel(self.frame)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout.addWidget(self.label_2, 0, 0, 1, 1, QtCore.Qt.AlignTop)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem, 0, 2, 1, 1)
+        self.verticalLayout.addWidget(self.frame)
+        self.buttonBox = QtWidgets.QDialogButtonBox(QuestionReviewDialog)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Close)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+
+        self.retranslateUi(QuestionReviewDialog)
+        self.buttonBox.accepted.connect(QuestionReviewDialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(QuestionReviewDialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(QuestionReviewDialog)
+
+    def retranslateUi(self, QuestionReviewDialog):
+        _translate = QtCore.QCoreApplication.translate
+        QuestionReviewDialog.setWindowTitle(_translate("QuestionReviewDialog", "Question Review"))
+        self.labelQuestion.setText(_translate("QuestionReviewDialog", "Select a question."))
+        self.label.setText(_translate("QuestionReviewDialog", "User Answer:"))
+        self.label_2.setText(_translate("QuestionReviewDialog", "Correct Answer:"))
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'memorise/ui/QuizDialog.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_QuizDialog(object):
+    def setupUi(self, QuizDialog):
+        QuizDialog.setObjectName("QuizDialog")
+        QuizDialog.resize(400, 397)
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout(QuizDialog)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.progressBar = QtWidgets.QProgressBar(QuizDialog)
+        self.progressBar.setProperty("value", 24)
+        self.progressBar.setTextVisible(False)
+        self.progressBar.setInvertedAppearance(False)
+        self.progressBar.setObjectName("progressBar")
+        self.verticalLayout_3.addWidget(self.progressBar)
+        self.widget_6 = QtWidgets.QWidget(QuizDialog)
+        self.widget_6.setObjectName("widget_6")
+        self.horizontalLayout_5 = QtWidgets.QHBoxLayout(self.widget_6)
+        self.horizontalLayout_5.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout_5.setObjectName("horizontalLayout_5")
+        self.label = QtWidgets.QLabel(self.widget_6)
+        self.label.setObjectName("label")
+        self.horizontalLayout_5.addWidget(self.label)
+        self.labelHeading1 = QtWidgets.QLabel(self.widget_6)
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.labelHeading1.setFont(font)
+        self.labelHeading1.setObjectName("labelHeading1")
+        self.horizontalLayout_5.addWidget(self.labelHeading1)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_5.addItem(spacerItem)
+        self.verticalLayout_3.addWidget(self.widget_6)
+        self.widget_4 = QtWidgets.QWidget(QuizDialog)
+        self.widget_4.setObjectName("widget_4")
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(self.widget_4)
+        self.horizontalLayout_3.setContentsMargins(25, 0, 0, 0)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.label_2 = QtWidgets.QLabel(self.widget_4)
+        self.label_2.setObjectName("label_2")
+        self.horizontalLayout_3.addWidget(self.label_2)
+        self.labelDataFrom1 = QtWidgets.QLabel(self.widget_4)
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.labelDataFrom1.setFont(font)
+        self.labelDataFrom1.setObjectName("labelDataFrom1")
+        self.horizontalLayout_3.addWidget(self.labelDataFrom1)
+        spacerItem1 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_3.addItem(spacerItem1)
+        self.verticalLayout_3.addWidget(self.widget_4)
+        self.widget_7 = QtWidgets.QWidget(QuizDialog)
+        self.widget_7.setObjectName("widget_7")
+        self.horizontalLayout_6 = QtWidgets.QHBoxLayout(self.widget_7)
+        self.horizontalLayout_6.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout_6.setObjectName("horizontalLayout_6")
+        self.label_3 = QtWidgets.QLabel(self.widget_7)
+        self.label_3.setObjectName("label_3")
+        self.horizontalLayout_6.addWidget(self.label_3)
+        self.labelHeading2 = QtWidgets.QLabel(self.widget_7)
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.labelHeading2.setFont(font)
+        self.labelHeading2.setObjectName("labelHeading2")
+        self.horizontalLayout_6.addWidget(self.labelHeading2)
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_6.addItem(spacerItem2)
+        self.verticalLayout_3.addWidget(self.widget_7)
+        self.widget_5 = QtWidgets.QWidget(QuizDialog)
+        self.widget_5.setObjectName("widget_5")
+        self.horizontalLayout_4 = QtWidgets.QHBoxLayout(self.widget_5)
+        self.horizontalLayout_4.setContentsMargins(25, 0, 0, 0)
+        self.horizontalLayout_4.setObjectName("horizontalLayout_4")
+        self.textAnswer = QtWidgets.QPlainTextEdit(self.widget_5)
+        self.textAnswer.setObjectName("textAnswer")
+        self.horizontalLayout_4.addWidget(self.textAnswer)
+        self.listAnswer = QtWidgets.QListView(self.widget_5)
+        self.listAnswer.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.listAnswer.setObjectName("listAnswer")
+        self.horizontalLayout_4.addWidget(self.listAnswer)
+        self.verticalLayout_3.addWidget(self.widget_5)
+        self.widget_3 = QtWidgets.QWidget(QuizDialog)
+        self.widget_3.setObjectName("widget_3")
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(self.widget_3)
+        self.horizontalLayout_2.setContentsMargins(0, -1, 0, 0)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.groupBox = QtWidgets.QGroupBox(self.widget_3)
+        self.groupBox.setObjectName("groupBox")
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.groupBox)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.radioSelection = QtWidgets.QRadioButton(self.groupBox)
+        self.radioSelection.setChecked(False)
+        self.radioSelection.setObjectName("radioSelection")
+        self.verticalLayout.addWidget(self.radioSelection)
+        self.radioFreeText = QtWidgets.QRadioButton(self.groupBox)
+        self.radioFreeText.setChecked(True)
+        self.radioFreeText.setObjectName("radioFreeText")
+        self.verticalLayout.addWidget(self.radioFreeText)
+        self.horizontalLayout_2.addWidget(self.groupBox)
+        spacerItem3 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem3)
+        self.widget = QtWidgets.QWidget(self.widget_3)
+        self.widget.setObjectName("widget")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.widget)
+        self.verticalLayout_2.setContentsMargins(-1, -1, 0, 0)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.widget_2 = QtWidgets.QWidget(self.widget)
+        self.widget_2.setObjectName("widget_2")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.widget_2)
+        self.horizontalLayout.setContentsMargins(-1, -1, 0, -1)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        spacerItem4 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem4)
+        self.buttonNext = QtWidgets.QPushButton(self.widget_2)
+        self.buttonNext.setObjectName("buttonNext")
+        self.horizontalLayout.addWidget(self.buttonNext)
+        self.verticalLayout_2.addWidget(self.widget_2)
+        self.buttonBox = QtWidgets.QDialogButtonBox(self.widget)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Close)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout_2.addWidget(self.buttonBox)
+        self.horizontalLayout_2.addWidget(self.widget)
+        self.verticalLayout_3.addWidget(self.widget_3)
+
+        self.retranslateUi(QuizDialog)
+        self.buttonBox.accepted.connect(QuizDialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(QuizDialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(QuizDialog)
+
+    def retranslateUi(self, QuizDialog):
+        _translate = QtCore.QCoreApplication.translate
+        QuizDialog.setWindowTitle(_translate("QuizDialog", "Quiz"))
+        self.label.setText(_translate("QuizDialog", "Item Heading: "))
+        self.labelHeading1.setText(_translate("QuizDialog", "HEADING1"))
+        self.label_2.setText(_translate("QuizDialog", "Item value:"))
+        self.labelDataFrom1.setText(_translate("QuizDialog", "TextLabel"))
+        self.label_3.setText(_translate("QuizDialog", "Corresponding Item From Heading:"))
+        self.labelHeading2.setText(_translate("QuizDialog", "HEADING2"))
+        self.groupBox.setTitle(_translate("QuizDialog", "Mode"))
+        self.radioSelection.setText(_translate("QuizDialog", "Se&lection Box"))
+        self.radioFreeText.setText(_translate("QuizDialog", "Free Te&xt"))
+        self.buttonNext.setText(_translate("QuizDialog", "Next"))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'memorise/ui/ReviewDialog.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_ReviewDialog(object):
+    def setupUi(self, ReviewDialog):
+        ReviewDialog.setObjectName("ReviewDialog")
+        ReviewDialog.resize(811, 511)
+        self.verticalLayout = QtWidgets.QVBoxLayout(ReviewDialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.tests = QtWidgets.QTreeView(ReviewDialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.tests.sizePolicy().hasHeightForWidth())
+        self.tests.setSizePolicy(sizePolicy)
+        self.tests.setMaximumSize(QtCore.QSize(16777215, 16777215))
+        self.tests.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tests.setRootIsDecorated(False)
+        self.tests.setItemsExpandable(False)
+        self.tests.setObjectName("tests")
+        self.verticalLayout.addWidget(self.tests)
+        self.questions = QtWidgets.QTreeView(ReviewDialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(100)
+        sizePolicy.setHeightForWidth(self.questions.sizePolicy().hasHeightForWidth())
+        self.questions.setSizePolicy(sizePolicy)
+        self.questions.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.questions.setRootIsDecorated(False)
+        self.questions.setItemsExpandable(False)
+        self.questions.setSortingEnabled(True)
+        self.questions.setObjectName("questions")
+        self.verticalLayout.addWidget(self.questions)
+        self.buttonBox = QtWidgets.QDialogButtonBox(ReviewDialog)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Close)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+        self.actionViewQuestionDetails = QtWidgets.QAction(ReviewDialog)
+        self.actionViewQuestionDetails.setObjectName("actionViewQuestionDetails")
+
+        self.retranslateUi(ReviewDialog)
+        self.buttonBox.accepted.connect(ReviewDialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(ReviewDialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(ReviewDialog)
+
+    def retranslateUi(self, ReviewDialog):
+        _translate = QtCore.QCoreApplication.translate
+        ReviewDialog.setWindowTitle(_translate("ReviewDialog", "Review"))
+        self.actionViewQuestionDetails.setText(_translate("ReviewDialog", "View Question Details"))
@@ -0,0 +1,79 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Rules for memory set names and column headings, shared by the add
+dialog and the importer. Each check returns a description of the
+problem, or None if the value is acceptable.
+
+"""
+
+from .normalise import attributes
+import re
+
+headingpattern = re.compile(r"^[a-zA-Z0-9_\- ]+$")
+
+def nameerror(name, existing=()):
+    "Check a memory set name."
+    if name == "":
+        return "No table name"
+
+    if name.startswith("_"):
+        return "Tablename starts with underscore"
+
+    # The table name needs to be constrained, otherwise the table can
+    # not be referenced in queries.
+    for c in name:
+        if not c.isalnum() and not c in "_":
+            return "Invalid char in table name"
+
+    for tbl in existing:
+        if tbl == name:
+            return "Duplicate table name"
+
+    return None
+
+def headingerror(heading):
+    "Check a single heading, without its attributes."
+    if not headingpattern.match(heading):
+        return "Invalid chars in heading"
+    return None
+
+def headingserror(headings):
+    """Check a full list of headings, where each heading may be followed
+by the |AnswerOnly attribute and the attributes of normalise.attributes.
+
+    """
+    if len(headings) < 2:
+        return "Not enough row headers"
+
+    seen = set()
+    allanswers = True
+    for hd in headings:
+        attrs = hd.split("|")
+        name = attrs.pop(0).strip()
+        err = headingerror(name)
+        if err:
+            return "{}: {}".format(err, name)
+        if name in seen:
+            return "Duplicate heading: {}".format(name)
+        seen.add(name)
+        for attr in attrs:
+            if attr != "AnswerOnly" and attr not in attributes:
+                return "Unknown attribute {} of heading {}".format(attr, name)
+        allanswers = allanswers and "AnswerOnly" in attrs
+
+    if allanswers:
+        return "All answer only"
+    return None
@@ -0,0 +1,139 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Runs storage requests away from the GUI thread. Requests are
+executed one at a time by a worker thread on its own database
+connection, and their results are passed back to the GUI thread.
+
+"""
+
+from .storage import Storage
+from PyQt5.QtCore import QEventLoop, QObject, QThread, pyqtSignal
+import threading
+import sys
+
+class Request:
+    "A call of fn(storage) whose result is passed to callback."
+    def __init__(self, fn, callback=None, key=None):
+        self.fn = fn
+        self.callback = callback
+        self.key = key
+        self.cancelled = False
+
+class Worker(QObject):
+    "Executes requests on the thread it is moved to."
+    finished = pyqtSignal(object, object)
+
+    def __init__(self, storage):
+        super().__init__()
+        self.storage = storage
+        self.lock = threading.Lock()
+        self.current = None
+
+    def run(self, request):
+        with self.lock:
+            if not request.cancelled:
+                self.current = request
+        result = None
+        if self.current is request:
+            try:
+                result = request.fn(self.storage)
+            except Exception as e:
+                print("Error: Request failed ({})".format(e), file=sys.stderr)
+            finally:
+                with self.lock:
+                    self.current = None
+        self.finished.emit(request, result)
+
+    def cancel(self, request):
+        """Flag request as cancelled. If it is being executed, the running
+query is interrupted.
+
+        """
+        with self.lock:
+            request.cancelled = True
+            if self.current is request:
+                self.storage.db.interrupt()
+
+class Requests(QObject):
+    """Queue of requests for a worker thread. busy is emitted with True
+when the first request is queued and with False once all requests have
+completed, so that views can show that they are loading.
+
+On exit, keyed requests are cancelled as their results are no longer
+wanted, but other requests such as saving results are completed before
+the worker thread is stopped. Their callbacks are not called.
+
+    """
+    submitted = pyqtSignal(object)
+    busy = pyqtSignal(bool)
+
+    def __init__(self, dbase, profile='safe', querylog=None):
+        super().__init__()
+        self.storage = Storage(dbase, profile, querylog)
+        self.pending = {}
+        self.outstanding = 0
+        self.closing = False
+        self.thread = None
+
+    def __enter__(self):
+        self.storage.__enter__()
+        self.worker = Worker(self.storage)
+        self.thread = QThread()
+        self.worker.moveToThread(self.thread)
+        self.submitted.connect(self.worker.run)
+        self.worker.finished.connect(self._finished)
+        self.thread.start()
+        return self
+
+    def __exit__(self, type, value, tb):
+        for request in list(self.pending.values()):
+            self.worker.cancel(request)
+        self.closing = True
+        if self.outstanding > 0:
+            ## Results are delivered through the event loop of this thread
+            loop = QEventLoop()
+            self.busy.connect(lambda busy: busy or loop.quit())
+            loop.exec()
+        self.thread.quit()
+        self.thread.wait()
+        self.thread = None
+        self.storage.__exit__(type, value, tb)
+
+    def request(self, fn, callback=None, key=None):
+        """Queue fn(storage) to be run on the worker thread, callback is
+then called with the result on the GUI thread. When key is given, any
+earlier request with the same key that has not completed is cancelled.
+
+        """
+        if key != None and key in self.pending:
+            self.worker.cancel(self.pending[key])
+        request = Request(fn, callback, key)
+        if key != None:
+            self.pending[key] = request
+        self.outstanding += 1
+        if self.outstanding == 1:
+            self.busy.emit(True)
+        self.submitted.emit(request)
+        return request
+
+    def _finished(self, request, result):
+        if request.key != None and self.pending.get(request.key) is request:
+            del self.pending[request.key]
+        self.outstanding -= 1
+        if self.outstanding == 0:
+            self.busy.emit(False)
+        if not request.cancelled and request.callback and not self.closing:
+            request.callback(result)
@@ -0,0 +1,206 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+import pytest
+
+from memorise.engine import (ChoiceIndex, QuestionStream, buildquestions,
+                             buildsession, questionfingerprint)
+from memorise.normalise import natural_keys
+from memorise.storage import Storage
+
+def randomtable(rnd):
+    "A small table with repeated values, empty cells and AnswerOnly columns."
+    columns = rnd.randint(1, 4)
+    headings = ["C{}{}".format(c, "|AnswerOnly" if rnd.random() < 0.2 else "")
+                for c in range(columns)]
+    rows = [tuple(rnd.choice(["", None, "a", "b", "c", "d"])
+                  for c in range(columns))
+            for r in range(rnd.randint(0, 8))]
+    return (headings, rows)
+
+def oldbuildquestions(headings, rows):
+    """The questions built by QuizDialog.buildQuiz before the engine,
+without the shuffle.
+
+    """
+    data = lambda r, c: rows[r][c] or ""
+    # holds map of questions { c1 |-> { v1 |-> { c2 -> [ v2 ] } } }
+    quiz = {}
+    # holds possible values by column { c |-> [ v ] }
+    values = {}
+    for c1 in range(0, len(headings)):
+        c1attr = headings[c1].split("|")
+        c1name = c1attr.pop(0)
+        for row in range(0, len(rows)):
+            c1value = data(row, c1)
+            if c1value != "":
+                if not values.get(c1name):
+                    values[c1name] = []
+                if values[c1name].count(c1value) == 0:
+                    values[c1name].append(c1value)
+                if "AnswerOnly" in c1attr:
+                    continue
+                for c2 in range(0, len(headings)):
+                    if c2 != c1:
+                        c2attr = headings[c2].split("|")
+                        c2name = c2attr.pop(0)
+                        c2value = data(row, c2)
+                        if c2value != "":
+                            answers = quiz.setdefault(c1name, {}) \
+                                          .setdefault(c1value, {}) \
+                                          .setdefault(c2name, [])
+                            if answers.count(c2value) == 0:
+                                answers.append(c2value)
+
+    questions = []
+    for c1 in quiz.keys():
+        for v1 in quiz[c1].keys():
+            for c2 in quiz[c1][v1].keys():
+                questions.append((c1, v1, c2, quiz[c1][v1][c2], values[c2]))
+    return questions
+
+def test_buildquestions_matches_old_quiz():
+    ## Languages and countries with several values per cell of the other
+    headings = ["Language", "Country", "Continent|AnswerOnly"]
+    rows = [("French", "France", "Europe"),
+            ("French", "Belgium", "Europe"),
+            ("Dutch", "Belgium", "Europe"),
+            ("French", "Canada", "America"),
+            ("English", "Canada", ""),
+            ("German", "", "Europe"),
+            ("", "Peru", "America")]
+    questions = buildquestions(headings, rows)
+    assert questions == oldbuildquestions(headings, rows)
+    assert ("Language", "French", "Country",
+            ["France", "Belgium", "Canada"],
+            ["France", "Belgium", "Canada", "Peru"]) in questions
+    assert ("Country", "Canada", "Continent", ["America"],
+            ["Europe", "America"]) in questions
+
+@pytest.mark.parametrize("seed", range(200))
+def test_buildquestions_matches_old_quiz_random(seed):
+    (headings, rows) = randomtable(random.Random(seed))
+    assert buildquestions(headings, rows) == oldbuildquestions(headings, rows)
+
+@pytest.mark.parametrize("seed", range(200))
+def test_stream_draws_every_question_once(seed):
+    rnd = random.Random(seed)
+    (headings, rows) = randomtable(rnd)
+    expected = buildquestions(headings, rows)
+    stream = QuestionStream(headings, rows, rnd)
+    assert len(stream) == len(expected)
+    drawn = []
+    while len(stream) > 0:
+        drawn.append(stream.pop())
+        assert len(stream) == len(expected) - len(drawn)
+    assert sorted(drawn) == sorted(expected)
+    with pytest.raises(IndexError):
+        stream.pop()
+
+def test_stream_draws_every_order():
+    headings = ["Country", "Capital"]
+    rows = [("France", "Paris"), ("Italy", "Rome")]
+    orders = set()
+    rnd = random.Random(0)
+    for i in range(200):
+        orders.add(tuple(q[1] for q in QuestionStream(headings, rows, rnd)))
+    ## 4 questions can be drawn in 24 orders
+    assert len(orders) == 24
+
+@pytest.mark.parametrize("seed", range(200))
+def test_choices_include_correct_answers(seed):
+    rnd = random.Random(seed)
+    (headings, rows) = randomtable(rnd)
+    distractors = rnd.randint(0, 4)
+    index = ChoiceIndex(distractors, rnd)
+    for question in buildquestions(headings, rows):
+        choices = index.choices(question)
+        assert len(set(choices)) == len(choices)
+        assert choices == sorted(choices, key=natural_keys)
+        assert set(question[3]) <= set(choices) <= set(question[4])
+        others = set(choices) - set(question[3])
+        if distractors == 0:
+            assert set(choices) == set(question[4])
+        else:
+            assert len(others) <= distractors
+
+def test_choices_of_large_column():
+    values = ["v{}".format(i) for i in range(100)]
+    question = ("Q", "q", "A", ["v7", "v42", "v99"], values)
+    index = ChoiceIndex(5, random.Random(0))
+    for i in range(100):
+        choices = index.choices(question)
+        assert len(set(choices)) == len(choices) == 8
+        assert {"v7", "v42", "v99"} <= set(choices)
+
+capitals = (["Country", "Capital"],
+            [("France", "Paris"),
+             ("Germany", "Berlin"),
+             ("Italy", "Rome"),
+             ("Spain", "Madrid"),
+             ("Sweden", "Stockholm")])
+
+@pytest.fixture
+def db():
+    with Storage(":memory:") as s:
+        assert s.importtable("capitals", *capitals)
+        yield s
+
+def schedule(db, question, days, ease, fingerprint=None):
+    "Schedule a question of capitals to be due in days with ease."
+    if fingerprint == None:
+        fingerprint = questionfingerprint("capitals", question)
+    db._execute("INSERT INTO schedule VALUES "
+                "(:f, 'capitals', JULIANDAY('now', :days || ' days'), "
+                " JULIANDAY('now'), :ease, 1, 1)",
+                {"f": fingerprint, "days": days, "ease": ease})
+
+def session(db, size):
+    return buildsession(db, "capitals", *capitals, size, random.Random(0))
+
+def test_session_fills_with_weakest_questions(db):
+    questions = buildquestions(*capitals)
+    ## Every question is scheduled and none is due
+    for (i, question) in enumerate(questions):
+        schedule(db, question, 10 - i, 1.3 + i / 10)
+    assert sorted(session(db, 3)) == sorted(questions[:3])
+
+def test_session_order(db):
+    questions = buildquestions(*capitals)
+    schedule(db, questions[0], -1, 2.5)
+    ## questions[1] and questions[2] have never been answered
+    for (i, question) in enumerate(questions[3:]):
+        schedule(db, question, 1, 2.5 - i / 10)
+    assert sorted(session(db, 4)) == \
+        sorted(questions[:3] + [questions[-1]])
+    assert sorted(session(db, 3)) == sorted(questions[:3])
+
+def test_session_skips_questions_no_longer_in_table(db):
+    questions = buildquestions(*capitals)
+    for question in questions:
+        schedule(db, question, 1, 2.5)
+    ## More questions than the session size are due before questions[0]
+    ## but are no longer in the table
+    for f in range(5):
+        schedule(db, None, -10, 2.5, fingerprint=f)
+    db._execute("UPDATE schedule SET Due = JULIANDAY('now', '-1 days'), "
+                "                    Ease = 1.3 "
+                "WHERE Fingerprint == :f",
+                {"f": questionfingerprint("capitals", questions[0])})
+    drawn = session(db, 2)
+    assert len(drawn) == 2
+    assert questions[0] in drawn
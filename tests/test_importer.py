@@ -0,0 +1,89 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from memorise import importer
+from memorise.storage import Storage
+
+rows = [("France", "Paris"),
+        ("Germany", "Berlin"),
+        ("Italy", "Rome"),
+        ("Spain", "Madrid"),
+        ("Sweden", "Stockholm")]
+
+@pytest.fixture
+def db():
+    with Storage(":memory:") as s:
+        yield s
+
+def write(tmp_path, lines, filename="capitals.csv"):
+    path = tmp_path / filename
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_import(db, tmp_path):
+    path = write(tmp_path, ["Country, Capital | AnswerOnly"] +
+                 [",".join(row) for row in rows])
+    assert importer.importfile(db, path) == 5
+    assert db.tablenames() == ["capitals"]
+    assert db.headings("capitals") == ["Country", "Capital|AnswerOnly"]
+    assert sorted(db.table("capitals")[1]) == sorted(rows)
+
+def test_import_tsv_pads_short_lines(db, tmp_path):
+    path = write(tmp_path, ["Country\tCapital\tContinent", "",
+                            "France\tParis\tEurope", "Peru\tLima"],
+                 "capitals.tsv")
+    assert importer.importfile(db, path, "places") == 2
+    assert sorted(db.table("places")[1]) == \
+        [("France", "Paris", "Europe"), ("Peru", "Lima", "")]
+
+def test_import_streams_rows_in_chunks(db, tmp_path):
+    path = write(tmp_path, ["Country,Capital"] +
+                 [",".join(row) for row in rows])
+    counts = []
+    assert importer.importfile(db, path, chunksize=2,
+                               progress=counts.append) == 5
+    assert counts == [2, 4, 5]
+
+@pytest.mark.parametrize("line,error", [
+    ("Peru,Lima,Peru", "Line 7: too many values"),
+    (",Lima", "Line 7: no value in first column"),
+])
+def test_import_rejects_malformed_lines(db, tmp_path, capsys, line, error):
+    path = write(tmp_path, ["Country,Capital"] +
+                 [",".join(row) for row in rows] + [line])
+    ## The rows of the chunks before the malformed line are not kept
+    assert importer.importfile(db, path, chunksize=2) == None
+    assert error in capsys.readouterr().err
+    assert db.tablenames() == []
+
+def test_import_rejects_unknown_attributes(db, tmp_path, capsys):
+    path = write(tmp_path, ["Country,Capital|Shouting"] +
+                 [",".join(row) for row in rows])
+    assert importer.importfile(db, path) == None
+    assert "Unknown attribute Shouting of heading Capital" in \
+        capsys.readouterr().err
+    assert db.tablenames() == []
+
+def test_import_rejects_duplicate_names(db, tmp_path, capsys):
+    path = write(tmp_path, ["Country,Capital"] +
+                 [",".join(row) for row in rows])
+    assert importer.importfile(db, path) == 5
+    assert importer.importfile(db, path) == None
+    assert "Duplicate table name" in capsys.readouterr().err
+    ## The first import is left as it was
+    assert db._select("SELECT Revision FROM memtableroot")[1] == [(1,)]
+    assert sorted(db.table("capitals")[1]) == sorted(rows)
@@ -0,0 +1,80 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+import pytest
+
+from memorise.normalise import Grader, Normaliser, editdistance, nearmiss
+
+def levenshtein(a, b):
+    "Reference edit distance by dynamic programming."
+    previous = list(range(len(b) + 1))
+    for (i, ca) in enumerate(a, 1):
+        current = [i]
+        for (j, cb) in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def randomword(rnd, alphabet="abcd", size=12):
+    return "".join(rnd.choice(alphabet) for i in range(rnd.randint(0, size)))
+
+@pytest.mark.parametrize("seed", range(20))
+def test_editdistance_matches_reference(seed):
+    rnd = random.Random(seed)
+    for i in range(200):
+        (a, b) = (randomword(rnd), randomword(rnd))
+        expected = levenshtein(a, b)
+        assert editdistance(a, b) == expected
+        limit = rnd.randint(0, 4)
+        assert editdistance(a, b, limit) == min(expected, limit + 1)
+
+def test_editdistance_long_strings():
+    rnd = random.Random(1)
+    a = randomword(rnd, size=200)
+    b = randomword(rnd, size=200)
+    assert editdistance(a, b) == levenshtein(a, b)
+
+def test_nearmiss():
+    assert nearmiss("MISSISIPPI", "MISSISSIPPI", 1)
+    assert not nearmiss("MISSISIPI", "MISSISSIPPI", 1)
+    ## Short answers must be exact
+    assert not nearmiss("CAT", "CAR", 2)
+    ## Numbers must match
+    assert not nearmiss("ROUTE 67", "ROUTE 66", 1)
+
+def test_grader_nearmiss():
+    grader = Grader(["Country", "Capital"], distance=1)
+    question = ("Country", "Sweden", "Capital", ["Stockholm"], ["Stockholm"])
+    assert grader.grade(question, ["stockholm"]) == \
+        (True, ["STOCKHOLM"], ["STOCKHOLM"], False)
+    assert grader.grade(question, ["stokholm"]) == \
+        (True, ["STOKHOLM"], ["STOCKHOLM"], True)
+    assert grader.grade(question, ["stokolm"])[0] == False
+
+def test_grader_nearmiss_matches_exact_answers_first():
+    grader = Grader(["City", "Near"], distance=1)
+    question = ("City", "P", "Near", ["Paris", "Parma"], ["Paris", "Parma"])
+    ## PARMS nearly misses both, PARIS must still be matched to PARIS
+    assert Normaliser()._nearmisses(["PARMS", "PARIS"], ["PARIS", "PARMA"], 1)
+    assert grader.grade(question, ["parms", "paris"]) == \
+        (True, ["PARIS", "PARMS"], ["PARIS", "PARMA"], True)
+    ## PARIA is drawn first and nearly misses both
+    assert grader.grade(question, ["paris", "paria"]) == \
+        (True, ["PARIA", "PARIS"], ["PARIS", "PARMA"], True)
+    assert grader.grade(question, ["parms", "rome"])[0] == False
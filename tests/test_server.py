@@ -0,0 +1,85 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import json
+
+import pytest
+
+from memorise.server import HTTPError, Pool, QuizServer
+
+def post(server, path, body=None):
+    return asyncio.run(server.dispatch("POST", path,
+                                       json.dumps(body or {}).encode()))[1]
+
+@pytest.fixture
+def server(tmp_path):
+    with Pool(str(tmp_path / "pymem.db"), readers=1) as pool:
+        assert pool.writer.importtable("capitals", ["Country", "Capital"],
+                                       [("France", "Paris"),
+                                        ("Italy", "Rome")])
+        yield QuizServer(pool)
+
+def test_failed_save_keeps_quiz(server, monkeypatch):
+    quiz = post(server, "/quiz", {"name": "capitals"})
+    path = "/quiz/{}/".format(quiz["quiz"])
+    post(server, path + "answer", {"question": 0, "answer": ["x"]})
+
+    monkeypatch.setattr(server.pool.writer, "saveresults",
+                        lambda name, results: False)
+    with pytest.raises(HTTPError) as e:
+        post(server, path + "results")
+    assert e.value.status == 500
+    assert quiz["quiz"] in server.quizzes
+
+    monkeypatch.undo()
+    assert post(server, path + "results") == {"saved": 1, "incorrect": 1}
+    with pytest.raises(HTTPError) as e:
+        post(server, path + "results")
+    assert e.value.status == 404
+
+def test_nearmiss_records_typed_answer(server):
+    server.distance = 1
+    quiz = post(server, "/quiz", {"name": "capitals"})
+    path = "/quiz/{}/".format(quiz["quiz"])
+    typed = {"France": "Pariss", "Paris": "Frnce",
+             "Italy": "rome", "Rome": "Italy"}
+    for q in quiz["questions"]:
+        reply = post(server, path + "answer",
+                     {"question": q["question"],
+                      "answer": [typed[q["value1"]]]})
+        assert reply["correct"]
+        assert reply["nearmiss"] == (q["value1"] in ["France", "Paris"])
+    assert post(server, path + "results") == {"saved": 4, "incorrect": 0}
+    assert sorted(server.pool.writer._select(
+        "SELECT UserAnswer, CorrectAnswer, NearMiss FROM answers")[1]) == \
+        [("FRNCE", "FRANCE", 1), ("ITALY", "ITALY", 0),
+         ("PARISS", "PARIS", 1), ("ROME", "ROME", 0)]
+
+def test_concurrent_saves_save_once(server):
+    quiz = post(server, "/quiz", {"name": "capitals"})
+    path = "/quiz/{}/".format(quiz["quiz"])
+    post(server, path + "answer", {"question": 0, "answer": ["x"]})
+
+    async def save():
+        return await asyncio.gather(
+            *[server.dispatch("POST", path + "results", b"")
+              for i in range(2)],
+            return_exceptions=True)
+    results = asyncio.run(save())
+    assert sorted(type(r).__name__ for r in results) == \
+        ["HTTPError", "tuple"]
+    assert server.pool.writer._select("SELECT COUNT(*) FROM tests")[1] == \
+        [(1,)]
@@ -0,0 +1,77 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from memorise.shards import Shards
+from memorise.storage import Storage
+
+headings = ["Country", "Capital"]
+rows = [("France", "Paris"),
+        ("Italy", "Rome")]
+
+def result(value, answer, correct):
+    "A result as recorded by the quiz dialog."
+    return ("Country", value, "Capital", [correct], [], [correct], [answer],
+            answer == correct, False)
+
+@pytest.fixture
+def learners(tmp_path):
+    """Five learner databases, learner i took one test and failed Rome i
+times out of i + 1.
+
+    """
+    paths = []
+    for i in range(5):
+        path = str(tmp_path / "learner{}.db".format(i))
+        with Storage(path) as db:
+            assert db.importtable("capitals", headings, rows)
+            assert db.saveresults("capitals",
+                                  [result("Italy", "ROME", "ROME")] +
+                                  [result("Italy", "PARIS", "ROME")] * i)
+        paths.append(path)
+    return paths
+
+def attached(shards):
+    "Schema names of the databases attached to shards."
+    return [row[1] for row in shards.db.execute("PRAGMA database_list")
+            if row[1] not in ("main", "temp")]
+
+def test_batches_detach_every_database(learners):
+    with Shards(learners) as shards:
+        shards.batchsize = 2
+        batches = []
+        for batch in shards.batches():
+            assert attached(shards) == [schema for (i, schema) in batch]
+            batches.append([i for (i, schema) in batch])
+        assert batches == [[0, 1], [2, 3], [4]]
+        assert attached(shards) == []
+
+        ## Stopping part way through still detaches the batch
+        for batch in shards.batches():
+            break
+        assert attached(shards) == []
+
+def test_reports_merge_batches(learners):
+    with Shards(learners) as shards:
+        shards.batchsize = 2
+        (names, board) = shards.leaderboard()
+        (names, hardest) = shards.hardest(minimum=1)
+        assert attached(shards) == []
+    assert [(row[0], row[1], row[3], row[4]) for row in board] == \
+        [("learner{}".format(i), 1, 1, i) for i in range(5)]
+    ## Rome was asked 15 times, failed 10 times, by all 5 learners
+    assert [row[1:] for row in hardest] == \
+        [("Country", "Italy", "Capital", "ROME", 15, 10, 5, 0.6667)]
@@ -0,0 +1,345 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+
+import pytest
+
+from memorise import export, storage
+from memorise.querylog import QueryLog
+from memorise.storage import Storage
+
+headings = ["Country", "Capital"]
+rows = [("France", "Paris"),
+        ("Germany", "Berlin"),
+        ("Italy", "Rome"),
+        ("Spain", "Madrid"),
+        ("Sweden", "Stockholm")]
+
+def result(question, answer, correct, nearmiss=False):
+    "A result as recorded by the quiz dialog."
+    return (question[0], question[1], question[2], [correct], [],
+            [correct], [answer], answer == correct or nearmiss, nearmiss)
+
+def scans(plan, *tables):
+    "Steps of a query plan that read the whole of one of tables."
+    return [step for step in plan
+            if step.split()[0] == "SCAN" and set(step.split()) & set(tables)]
+
+@pytest.fixture
+def db():
+    with Storage(":memory:") as s:
+        yield s
+
+def test_reviewtests_uses_index(db):
+    plan = db.queryplan(storage.reviewdialogquery_tests,
+                        {"name": "x", "time": None, "after": None,
+                         "limit": 10})
+    assert any("USING INDEX tests_memoryset_timestamp" in step
+               for step in plan)
+    assert scans(plan, "T", "S") == []
+
+def test_reviewanswersdetail_uses_index(db):
+    plan = db.queryplan(storage.reviewquestiondialogquery,
+                        {"testid": 1, "questionid": 0, "after": None,
+                         "day": None, "limit": 10})
+    assert any("USING INDEX answers_fingerprint" in step for step in plan)
+    assert scans(plan, "A", "B", "T", "D", "Q") == []
+
+def test_weakestquestions_uses_index(db):
+    plan = db.queryplan(storage.schedulequery_weakest,
+                        {"name": "x", "now": "now", "limit": 10})
+    assert any("USING COVERING INDEX schedule_ease" in step for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan)
+
+def test_writetable_records_revisions(db):
+    assert db.createtable("capitals", headings)
+    assert db.writetable("capitals", rows)
+    ## Unused revisions are written in place
+    assert db.writetable("capitals", rows[:-1])
+    assert db.revisionstatus("capitals") == (False, 1)
+
+    assert db.saveresults("capitals",
+                          [result(("Country", "Italy", "Capital"),
+                                  "Rome", "Rome")])
+    changed = [("France", "Paris"), ("Germany", "Bonn"), ("Italy", "Rome"),
+               ("Spain", "Madrid")]
+    assert db.writetable("capitals", changed)
+    assert db.revisionstatus("capitals") == (False, 2)
+
+    assert db.saveresults("capitals",
+                          [result(("Country", "Spain", "Capital"),
+                                  "Madrid", "Madrid")])
+    assert db.writetable("capitals", changed + [("Norway", "Oslo")])
+    assert db.revisionstatus("capitals") == (False, 3)
+
+    assert sorted(db.table("capitals", 1)[1]) == sorted(rows[:-1])
+    assert sorted(db.table("capitals", 2)[1]) == sorted(changed)
+    assert sorted(db.table("capitals")[1]) == \
+        sorted(changed + [("Norway", "Oslo")])
+    assert db.table("capitals", 4) == None
+
+def test_writetable_rebases_large_changes(db):
+    assert db.importtable("capitals", headings, rows) == len(rows)
+    for revision in range(1, 4):
+        assert db.saveresults("capitals",
+                              [result(("Country", "Italy", "Capital"),
+                                      "Rome", "Rome")])
+        changed = [(k, "{}{}".format(v, revision)) for (k, v) in rows]
+        assert db.writetable("capitals", changed)
+    assert db._select("SELECT Revision, Base FROM revisions "
+                      "ORDER BY Revision")[1] == [(1, 1), (2, 2), (3, 3)]
+    assert sorted(db.table("capitals", 2)[1]) == \
+        sorted((k, v + "1") for (k, v) in rows)
+
+def test_writetable_rejects_duplicate_keys(db):
+    assert db.importtable("capitals", headings, rows)
+    assert not db.writetable("capitals", rows + rows[:1])
+    assert sorted(db.table("capitals")[1]) == sorted(rows)
+
+def taketests(db, count):
+    "Take count tests of two questions, failing Spain in every third."
+    for i in range(count):
+        assert db.saveresults(
+            "capitals",
+            [result(("Country", "Italy", "Capital"), "Rome", "Rome"),
+             result(("Country", "Spain", "Capital"),
+                    "Rome" if i % 3 == 0 else "Madrid", "Madrid")])
+
+def test_compact(db):
+    assert db.importtable("capitals", headings, rows)
+    taketests(db, 10)
+    before = db._select("SELECT * FROM teststats")
+    (tests, answers, freed) = db.compact(keep=4, batch=4)
+    assert (tests, answers) == (6, 12)
+    assert freed != None
+    assert db._select("SELECT * FROM teststats") == before
+    assert db._select("SELECT COUNT(*) FROM answers")[1] == [(8,)]
+    assert db._select("SELECT Q.Value1, D.Asked, D.Failed "
+                      "FROM dailystats AS D INNER JOIN questionstats AS Q "
+                      "ON Q.Fingerprint == D.Fingerprint "
+                      "ORDER BY Q.Value1")[1] == \
+        [("Italy", 6, 0), ("Spain", 6, 2)]
+    ## Nothing more to compact
+    assert db.compact(keep=4)[:2] == (0, 0)
+
+def test_compact_reports_size_failure(db, monkeypatch):
+    assert db.importtable("capitals", headings, rows)
+    taketests(db, 3)
+    sizes = iter([4096, None])
+    monkeypatch.setattr(db, "_usedbytes", lambda: next(sizes))
+    assert db.compact(keep=1) == None
+
+def test_reviewanswersdetail_includes_daily_totals(db):
+    assert db.importtable("capitals", headings, rows)
+    taketests(db, 5)
+    assert db.compact(keep=2)[:2] == (3, 6)
+    (testid, questionid) = db._select("SELECT MAX(TestID), 1 FROM answers"
+                                      )[1][0]
+    (names, detail) = db.reviewanswersdetail(testid, questionid)
+    assert [row[names.index("Result")] for row in detail] == \
+        ["PASS", "FAIL", "DAILY TOTAL"]
+    assert detail[-1][names.index("UserAnswer")] == \
+        "2 of 3 answers correct"
+
+    ## Pages continue from the answers into the daily totals
+    pages = []
+    after = None
+    while True:
+        page = db.reviewanswersdetail(testid, questionid, after, 1)[1]
+        if page == []:
+            break
+        pages.extend(page)
+        after = (page[-1][5], page[-1][7])
+    assert pages == detail
+
+def test_export_daily_totals(db, tmp_path):
+    assert db.importtable("capitals", headings, rows)
+    taketests(db, 5)
+    assert db.compact(keep=2)
+    path = tmp_path / "daily.csv"
+    assert export.exportfile(db, str(path), "daily", name="capitals") == 2
+    lines = path.read_text().splitlines()
+    assert lines[0].split(",")[-2:] == ["Asked", "Failed"]
+    assert sorted(line.split(",")[-2:] for line in lines[1:]) == \
+        [["3", "0"], ["3", "1"]]
+
+def answerdaily(db, answers, start="2019-01-01 10:00:00"):
+    """Answer Italy once a day from start with each of answers, in place
+of any earlier tests, and replay the schedule. Returns the schedule of
+the question.
+
+    """
+    db._execute("DELETE FROM answers")
+    db._execute("DELETE FROM tests")
+    for (day, answer) in enumerate(answers):
+        cur = db._execute("INSERT INTO tests (`Memory Set`, Revision, "
+                          "                   TimeStamp) "
+                          "VALUES ('capitals', 1, "
+                          "        DATETIME(:start, :days || ' days'))",
+                          {"start": start, "days": day})
+        db._execute("INSERT INTO answers VALUES "
+                    "(:id, 0, 'Country', 'Italy', 'Capital', :answer, "
+                    " 'Rome', fingerprint('capitals', 'Country', 'Italy', "
+                    "                     'Capital', 'Rome'), 0)",
+                    {"id": cur.lastrowid, "answer": answer})
+    db._execute("DELETE FROM schedule")
+    assert db._replayschedule()
+    return db._select("SELECT Interval, Streak, ROUND(Ease, 2), "
+                      "       DATE(Due), DATE(Reviewed) "
+                      "FROM schedule")[1]
+
+def test_schedule_grows_interval_when_due(db):
+    assert db.importtable("capitals", headings, rows)
+    ## Answers before the question is due do not grow the interval
+    assert answerdaily(db, ["Rome"] * 7) == \
+        [(6, 2, 2.7, "2019-01-13", "2019-01-07")]
+    ## Answered each time it is due
+    assert answerdaily(db, ["Rome"] * 2) == \
+        [(6, 2, 2.7, "2019-01-08", "2019-01-02")]
+
+def test_schedule_resets_on_wrong_answer(db):
+    assert db.importtable("capitals", headings, rows)
+    assert answerdaily(db, ["Rome", "Rome", "Paris"]) == \
+        [(0, 0, 2.5, "2019-01-03", "2019-01-03")]
+    assert answerdaily(db, ["Rome", "Rome", "Paris", "Rome"]) == \
+        [(1, 1, 2.6, "2019-01-05", "2019-01-04")]
+
+def test_nearmiss_counts_as_correct(db):
+    assert db.importtable("capitals", headings, rows)
+    assert db.saveresults("capitals",
+                          [result(("Country", "Sweden", "Capital"),
+                                  "STOKHOLM", "STOCKHOLM", True),
+                           result(("Country", "Spain", "Capital"),
+                                  "ROME", "MADRID")])
+    assert db._select("SELECT Correct, Wrong FROM teststats")[1] == [(1, 1)]
+    assert db._select("SELECT Value1, Asked, Failed FROM questionstats "
+                      "ORDER BY Value1")[1] == \
+        [("Spain", 1, 1), ("Sweden", 1, 0)]
+    assert db._select("SELECT Streak FROM schedule ORDER BY Due")[1] == \
+        [(0,), (1,)]
+    (names, answers) = db.reviewanswers(1)
+    assert [row[names.index("Result")] for row in answers] == \
+        ["NEAR MISS", "FAIL"]
+    (names, detail) = db.reviewanswersdetail(1, 0)
+    assert [(row[names.index("UserAnswer")], row[names.index("Result")])
+            for row in detail] == [("STOKHOLM", "NEAR MISS")]
+
+    taketests(db, 1)
+    assert db.compact(keep=1)[:2] == (1, 2)
+    assert db._select("SELECT Q.Value1, D.Asked, D.Failed "
+                      "FROM dailystats AS D INNER JOIN questionstats AS Q "
+                      "ON Q.Fingerprint == D.Fingerprint "
+                      "ORDER BY Q.Value1")[1] == \
+        [("Spain", 1, 1), ("Sweden", 1, 0)]
+
+def test_roottable_window_statistics(db):
+    ## (correct, wrong) answers of each test, oldest first
+    tests = {"capitals": [(2, 0), (1, 1), (0, 2), (2, 0)],
+             "cities": [(1, 0)],
+             "empty": []}
+    question = ("Country", "Italy", "Capital")
+    for (name, results) in tests.items():
+        assert db.importtable(name, headings, rows)
+        for (correct, wrong) in results:
+            answers = [result(question, "ROME", "ROME")] * correct + \
+                [result(question, "PARIS", "ROME")] * wrong
+            assert db.saveresults(name, answers)
+
+    (names, root, windows) = db.roottable(maxwindow=6)
+    assert sorted(windows) == sorted(tests)
+    for (name, results) in tests.items():
+        ## Totals over the last n tests, computed by hand
+        expected = []
+        for n in range(1, 7):
+            window = results[::-1][:n]
+            expected.append((sum(wrong == 0 for (_, wrong) in window),
+                             sum(correct for (correct, _) in window),
+                             sum(wrong for (_, wrong) in window)))
+        assert windows[name] == expected
+    assert windows["capitals"][:3] == [(1, 2, 0), (1, 2, 2), (1, 3, 3)]
+
+def test_querylog_counts_fetched_rows():
+    log = QueryLog()
+    with Storage(":memory:", querylog=log) as db:
+        assert db.importtable("capitals", headings, rows)
+        log.records.clear()
+        assert db.revisionstatus("capitals") == (False, 1)
+        assert db.headings("capitals") == headings
+        assert len(db.table("capitals")[1]) == len(rows)
+    assert [r.rows for r in log.records] == [1, 2, 1, len(rows)]
+
+def baseline(path):
+    """Create a database in the format used before the storage core,
+with every revision of a table held as a full copy.
+
+    """
+    db = sqlite3.connect(str(path))
+    for q in storage.dbschema:
+        db.execute(q)
+    db.execute("INSERT INTO memtableroot VALUES ('capitals', 0, NULL, 2)")
+    for revision in (1, 2):
+        db.execute(Storage(None)._tabledef("_capitals_{}".format(revision),
+                                           headings))
+    db.executemany("INSERT INTO _capitals_1 VALUES (?, ?)", rows)
+    db.executemany("INSERT INTO _capitals_2 VALUES (?, ?)",
+                   rows[:-1] + [("Norway", "Oslo")])
+    db.execute("INSERT INTO tests VALUES "
+               "(1, 'capitals', 1, '2019-01-01 10:00:00')")
+    db.executemany("INSERT INTO answers VALUES (1, ?, ?, ?, ?, ?, ?)",
+                   [(0, "Country", "Italy", "Capital", "Rome", "Rome"),
+                    (1, "Country", "Spain", "Capital", "Rome", "Madrid")])
+    db.commit()
+    db.close()
+
+def test_migrate_baseline(tmp_path):
+    path = tmp_path / "pymem.db"
+    baseline(path)
+    with Storage(str(path)) as db:
+        assert db._select("PRAGMA user_version")[1] == \
+            [(len(storage.migrations),)]
+        assert db.headings("capitals") == headings
+        assert sorted(db.table("capitals", 1)[1]) == sorted(rows)
+        assert sorted(db.table("capitals")[1]) == \
+            sorted(rows[:-1] + [("Norway", "Oslo")])
+        assert db._select("SELECT TestID, Correct, Wrong FROM teststats"
+                          )[1] == [(1, 1, 1)]
+        assert db._select("SELECT Fingerprint FROM answers "
+                          "ORDER BY QuestionID")[1] == \
+            [(storage.fingerprint("capitals", "Country", "Italy",
+                                  "Capital", "Rome"),),
+             (storage.fingerprint("capitals", "Country", "Spain",
+                                  "Capital", "Madrid"),)]
+        assert db._select("SELECT Asked, Failed FROM questionstats "
+                          "ORDER BY Value1")[1] == [(1, 0), (1, 1)]
+        assert len(db.scheduled("capitals")) == 2
+
+    ## Opening again finds nothing to migrate
+    with Storage(str(path)) as db:
+        assert sorted(db.table("capitals")[1]) == \
+            sorted(rows[:-1] + [("Norway", "Oslo")])
+
+def test_new_database_is_created_at_latest_version(tmp_path, capsys):
+    with Storage(str(tmp_path / "pymem.db")) as db:
+        assert db._select("PRAGMA user_version")[1] == \
+            [(len(storage.migrations),)]
+    assert capsys.readouterr().err == "Warning: Initilising database.\n"
+
+def test_old_sqlite_is_rejected(monkeypatch, capsys):
+    monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 22, 0))
+    with pytest.raises(SystemExit):
+        with Storage(":memory:"):
+            pass
+    assert "3.25.0 or newer is required" in capsys.readouterr().err
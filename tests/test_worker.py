@@ -0,0 +1,59 @@
+# Copyright (C) 2019 Karim Kanso. All Rights Reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from memorise.datastore import Datastore
+from memorise.worker import Requests
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or \
+        QtCore.QCoreApplication([])
+
+def test_exit_completes_queued_requests(app, tmp_path):
+    done = []
+    def slow(storage):
+        time.sleep(0.1)
+        done.append("slow")
+        return True
+    def save(storage):
+        done.append("save")
+        return True
+    called = []
+    with Requests(str(tmp_path / "pymem.db")) as requests:
+        requests.request(slow, called.append, key="table")
+        requests.request(save, called.append)
+    assert "save" in done
+    assert requests.outstanding == 0
+    assert called == []
+
+def test_import_runs_in_background(app, tmp_path):
+    path = tmp_path / "capitals.csv"
+    path.write_text("Country,Capital\nFrance,Paris\nItaly,Rome\n")
+    called = []
+    with Datastore(str(tmp_path / "pymem.db")) as datastore:
+        datastore.importfile(str(path), "capitals", called.append)
+        ## The result is passed back through the event loop
+        assert called == []
+        deadline = time.monotonic() + 5
+        while called == [] and time.monotonic() < deadline:
+            app.processEvents()
+        assert called == [2]
+        assert datastore.storage.tablenames() == ["capitals"]